@@ -0,0 +1,77 @@
+""" Benchmark of completing search prefixes to titles and names.
+
+Run from the project root with:
+
+    python -m benchmarks.bench_autocomplete [--rows 1000000] [--repeat 1000]
+
+Builds Completions over the given number of synthetic movies, whose titles and names are drawn from the words and
+names of the movies CSV file, and reports the build time and the median latency of completing prefixes of every
+length, from a single letter (the largest ranges) to a whole word.
+"""
+import argparse
+import os
+import random
+import statistics
+import time
+
+from cs235flix.adapters.memory_repository import read_csv_file
+from cs235flix.adapters.prefix_index import Completions
+
+DATA_PATH = os.path.join('cs235flix', 'adapters', 'data', 'Data1000Movies.csv')
+
+PREFIXES = ['s', 'th', 'star', 'chris', 'chris p', 'dark kn', 'zq']
+
+
+def make_movies(count: int, seed: int = 235):
+    # Yields (title, director, actors, rank) for count movies. Titles are made of words of titles and names of the
+    # first and last names of the people in the CSV file, so that names are shared by many movies.
+    title_words, first_names, last_names = [], [], []
+    for row in read_csv_file(DATA_PATH):
+        title_words.extend(row[1].split())
+        for name in [row[4]] + row[5].split(","):
+            parts = name.split()
+            if len(parts) > 1:
+                first_names.append(parts[0])
+                last_names.append(parts[-1])
+
+    generator = random.Random(seed)
+
+    def person():
+        return generator.choice(first_names) + " " + generator.choice(last_names)
+
+    for rank in range(1, count + 1):
+        yield (" ".join(generator.choices(title_words, k=generator.randint(1, 4))), person(),
+               [person() for i in range(4)], rank)
+
+
+def median_seconds(completions: Completions, prefix: str, repeat: int):
+    timings = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        completions.complete(prefix)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--repeat', type=int, default=1000)
+    arguments = parser.parse_args()
+
+    movies = list(make_movies(arguments.rows))
+    start = time.perf_counter()
+    completions = Completions(((title, rank) for title, director, actors, rank in movies),
+                              ((director, rank) for title, director, actors, rank in movies),
+                              ((actor, rank) for title, director, actors, rank in movies for actor in actors))
+    print('%d movies, completions built in %.1fs' % (arguments.rows, time.perf_counter() - start))
+
+    print('  %-12s %10s  %s' % ('prefix', 'median', 'best completion'))
+    for prefix in PREFIXES:
+        best = completions.complete(prefix, limit=1)
+        print('  %-12r %8.1fus  %s' % (prefix, median_seconds(completions, prefix, arguments.repeat) * 1e6,
+                                       best[0][1] if best else '-'))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+""" Benchmark of worker processes sharing a memory-mapped catalog file.
+
+Run from the project root with:
+
+    python -m benchmarks.bench_catalog_file [--rows 1000000] [--workers 4] [--path /tmp/movies.catalog]
+
+Writes a catalog file of synthetic movies, then starts the given number of fresh worker processes, each of which maps
+the file and runs a set of typical queries over the whole catalog. Reports how long each worker took to map the
+catalog, and its resident (RSS), proportional (PSS) and private memory afterwards, read from
+/proc/self/smaps_rollup (so Linux only). Pages of the file are shared, so PSS and private memory stay small however
+many workers there are.
+"""
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+
+from benchmarks.bench_load import make_movies
+from cs235flix.adapters import catalog_file
+from cs235flix.adapters.columnar_catalog import ColumnarCatalog, movie_record
+from cs235flix.adapters.movie_filter import MovieFilter
+
+SOURCE_HASH = 'benchmark'
+
+
+def memory_usage():
+    # Returns the RSS, PSS and private memory of this process in bytes.
+    usage = dict()
+    with open('/proc/self/smaps_rollup') as infile:
+        for line in infile:
+            fields = line.split()
+            if len(fields) == 3 and fields[2] == 'kB':
+                usage[fields[0].rstrip(':')] = int(fields[1]) * 1024
+    return usage['Rss'], usage['Pss'], usage['Private_Clean'] + usage['Private_Dirty']
+
+
+def worker(path: str, results):
+    before = memory_usage()[2]
+    start = time.perf_counter()
+    catalog = catalog_file.map_catalog(path, SOURCE_HASH)
+    seconds = time.perf_counter() - start
+
+    catalog.numeric_columns.select(MovieFilter({'rating': (7.5, None)}, 'votes', True), 0, 10)
+    catalog.title_index.search('moon blood')
+    catalog.actors.search('Actor 4242')
+    catalog.genre_bitmaps.slots('Western, Musical, -Drama')
+    for row in range(0, len(catalog), max(1, len(catalog) // 1000)):
+        catalog.record(row)
+
+    rss, pss, private = memory_usage()
+    results.put((os.getpid(), seconds, rss, pss, private - before))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--path', default=os.path.join(tempfile.gettempdir(), 'movies.catalog'))
+    arguments = parser.parse_args()
+
+    start = time.perf_counter()
+    catalog = ColumnarCatalog.build(movie_record(movie) for movie in make_movies(arguments.rows))
+    catalog_file.save_catalog(arguments.path, catalog, SOURCE_HASH)
+    del catalog
+    print('%d movies: wrote %.1f MB in %.1fs' % (arguments.rows, os.path.getsize(arguments.path) / 2 ** 20,
+                                                 time.perf_counter() - start))
+
+    # Fresh interpreters, so that no worker inherits pages from this process.
+    context = multiprocessing.get_context('spawn')
+    results = context.Queue()
+    workers = [context.Process(target=worker, args=(arguments.path, results)) for i in range(arguments.workers)]
+    for process in workers:
+        process.start()
+    rows = [results.get() for process in workers]
+    for process in workers:
+        process.join()
+
+    print('  %-8s %10s %10s %10s %12s' % ('worker', 'map', 'RSS', 'PSS', 'private*'))
+    for pid, seconds, rss, pss, private in rows:
+        print('  %-8d %8.1fms %8.1fMB %8.1fMB %10.1fMB' % (pid, seconds * 1e3, rss / 2 ** 20, pss / 2 ** 20,
+                                                       private / 2 ** 20))
+    print('  * private memory allocated after the interpreter and modules were loaded')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+""" Benchmark of the ColumnarRepository against the MemoryRepository.
+
+Run from the project root with:
+
+    python -m benchmarks.bench_columnar [--rows 100000 1000000] [--repeat 20]
+
+For each number of synthetic movies, reports the memory each repository holds once loaded (measured with tracemalloc,
+after the Movie objects used to load them have been released) and the median latency of a set of typical queries.
+"""
+import argparse
+import gc
+import statistics
+import time
+import tracemalloc
+
+from benchmarks.bench_load import make_movies
+from cs235flix.adapters.columnar_catalog import movie_record
+from cs235flix.adapters.columnar_repository import ColumnarRepository
+from cs235flix.adapters.memory_repository import MemoryRepository
+
+QUERIES = [
+    ('get_movie', lambda repo: repo.get_movie(12345)),
+    ('get_movies_by_rank, 10', lambda repo: repo.get_movies_by_rank(range(5000, 5010))),
+    ('search actor, exact', lambda repo: repo.get_movie_by_type('Actor 4242', 'actor')),
+    ('search actor, words', lambda repo: repo.get_movie_by_type('4242', 'actor')),
+    ('search director, typo', lambda repo: repo.get_movie_by_type('Drector 77', 'director')),
+    ('search genres', lambda repo: repo.get_movie_by_type('Western, Musical, -Drama', 'genres')),
+    ('count genres', lambda repo: repo.get_number_of_movies_by_genres('Action|Comedy, -Horror')),
+    ('search title, substring', lambda repo: repo.get_movie_by_type('moon blood', 'movie')),
+    ('year navigation', lambda repo: repo.get_year_navigation()),
+]
+
+
+def load(repository_class, rows: int):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    repo = repository_class()
+    if repository_class is ColumnarRepository:
+        records = [movie_record(movie) for movie in make_movies(rows)]
+        repo.add_records(records)
+        del records
+    else:
+        repo.add_movies(make_movies(rows))
+    seconds = time.perf_counter() - start
+    gc.collect()
+    allocated = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return repo, allocated, seconds
+
+
+def median_seconds(query, repo, repeat: int):
+    timings = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        query(repo)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def run(rows: int, repeat: int):
+    # Only one repository is loaded at a time, so that each is measured on its own.
+    latencies = dict()
+    print('%d movies' % rows)
+    for repository_class in [MemoryRepository, ColumnarRepository]:
+        repo, allocated, seconds = load(repository_class, rows)
+        print('  %-18s %8.1f MB, loaded in %.1fs' % (repository_class.__name__, allocated / 2 ** 20, seconds))
+        latencies[repository_class] = [median_seconds(query, repo, repeat) for name, query in QUERIES]
+        del repo
+
+    print('  %-26s %12s %12s' % ('query (median)', 'memory', 'columnar'))
+    for index, (name, query) in enumerate(QUERIES):
+        print('  %-26s %10.1fus %10.1fus' % (name, latencies[MemoryRepository][index] * 1e6,
+                                            latencies[ColumnarRepository][index] * 1e6))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[100000])
+    parser.add_argument('--repeat', type=int, default=20)
+    arguments = parser.parse_args()
+
+    for rows in arguments.rows:
+        run(rows, arguments.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+""" Benchmark of filtering and sorting movies by their numeric fields.
+
+Run from the project root with:
+
+    python -m benchmarks.bench_filter [--rows 1000000] [--repeat 20]
+
+Builds NumericColumns for the given number of synthetic movies and reports the median latency of a set of typical
+browse queries (a page of 10 movies) with NumPy and with the pure-Python fallback.
+"""
+import argparse
+import math
+import random
+import statistics
+import time
+from array import array
+
+from cs235flix.adapters import movie_filter
+from cs235flix.adapters.movie_filter import MovieFilter, NumericColumns, MISSING
+
+QUERIES = [
+    ('rating >= 7.5, by votes', MovieFilter({'rating': (7.5, None)}, 'votes', True)),
+    ('rating >= 7.5, runtime 90-120, by votes',
+     MovieFilter({'rating': (7.5, None), 'runtime': (90, 120)}, 'votes', True)),
+    ('year 2000-2010, metascore >= 80', MovieFilter({'year': (2000, 2010), 'metascore': (80, None)})),
+    ('all movies, by rating', MovieFilter(sort_by='rating', descending=True)),
+]
+
+
+def make_columns(count: int, seed: int = 235):
+    # Roughly the distributions of the movies CSV file, with a few values missing.
+    generator = random.Random(seed)
+    return NumericColumns({
+        'rank': array('q', range(1, count + 1)),
+        'year': array('h', (generator.randint(1950, 2020) for i in range(count))),
+        'runtime': array('i', (generator.randint(66, 191) for i in range(count))),
+        'rating': array('d', (round(min(max(generator.gauss(6.7, 0.95), 1.9), 9.0), 1) for i in range(count))),
+        'votes': array('q', (int(generator.expovariate(1 / 170000)) for i in range(count))),
+        'revenue': array('d', (math.nan if generator.random() < 0.13 else round(generator.expovariate(1 / 82), 2)
+                               for i in range(count))),
+        'metascore': array('h', (MISSING if generator.random() < 0.06 else generator.randint(11, 100)
+                                 for i in range(count))),
+    })
+
+
+def median_seconds(columns: NumericColumns, query: MovieFilter, repeat: int):
+    timings = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        columns.select(query, 0, 10)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--repeat', type=int, default=20)
+    arguments = parser.parse_args()
+
+    columns = make_columns(arguments.rows)
+    numpy = movie_filter.numpy
+    print('%d movies' % arguments.rows)
+    print('  %-42s %10s %10s' % ('query (median)', 'numpy', 'python'))
+    for name, query in QUERIES:
+        with_numpy = median_seconds(columns, query, arguments.repeat) if numpy is not None else math.nan
+        movie_filter.numpy = None
+        try:
+            without_numpy = median_seconds(columns, query, max(1, arguments.repeat // 10))
+        finally:
+            movie_filter.numpy = numpy
+        print('  %-42s %8.2fms %8.0fms' % (name, with_numpy * 1e3, without_numpy * 1e3))
+
+
+if __name__ == '__main__':
+    main()
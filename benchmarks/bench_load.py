@@ -0,0 +1,71 @@
+""" Benchmark of loading movies into a MemoryRepository.
+
+Run from the project root with:
+
+    python -m benchmarks.bench_load [--rows 1000 100000 1000000] [--incremental-limit 100000]
+
+For each number of synthetic movies, times the bulk add_movies load and, up to the incremental limit, adding the
+same movies one at a time with add_movie.
+"""
+import argparse
+import random
+import time
+
+from cs235flix.adapters.memory_repository import MemoryRepository
+from cs235flix.domain.model import Actor, Director, Genre, Movie
+
+GENRES = ['Action', 'Adventure', 'Animation', 'Biography', 'Comedy', 'Crime', 'Drama', 'Family', 'Fantasy', 'History',
+          'Horror', 'Music', 'Musical', 'Mystery', 'Romance', 'Sci-Fi', 'Sport', 'Thriller', 'War', 'Western']
+WORDS = ['the', 'last', 'night', 'dark', 'city', 'love', 'star', 'lost', 'river', 'king', 'war', 'house', 'secret',
+         'road', 'fire', 'game', 'world', 'moon', 'blood', 'dream']
+
+
+def make_movies(count: int, seed: int = 235):
+    # Movies shaped like the CSV reader's output: shared Actor, Director and Genre instances, and about one distinct
+    # person for every movie.
+    generator = random.Random(seed)
+    people = max(10, count // 2)
+    actors = [Actor('Actor %d' % i) for i in range(people)]
+    directors = [Director('Director %d' % i) for i in range(max(10, count // 5))]
+    genres = [Genre(name) for name in GENRES]
+
+    movies = []
+    for rank in range(1, count + 1):
+        title = ' '.join(generator.choice(WORDS) for i in range(3)) + ' %d' % rank
+        movies.append(Movie(title.title(), generator.randint(1950, 2020), rank, '', generator.choice(directors),
+                            generator.sample(actors, 4), generator.sample(genres, 3)))
+    return movies
+
+
+def time_load(load, movies):
+    repo = MemoryRepository()
+    start = time.perf_counter()
+    load(repo, movies)
+    return time.perf_counter() - start
+
+
+def add_one_at_a_time(repo: MemoryRepository, movies):
+    for movie in movies:
+        repo.add_movie(movie)
+
+
+def run(count: int, incremental_limit: int):
+    movies = make_movies(count)
+    print('%d movies' % count)
+    print('  add_movies:          %8.2fs' % time_load(MemoryRepository.add_movies, movies))
+    if count <= incremental_limit:
+        print('  add_movie each:      %8.2fs' % time_load(add_one_at_a_time, movies))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 100000, 1000000])
+    parser.add_argument('--incremental-limit', type=int, default=100000)
+    arguments = parser.parse_args()
+
+    for count in arguments.rows:
+        run(count, arguments.incremental_limit)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+""" Benchmark of the memory taken by the domain model.
+
+Run from the project root with:
+
+    python -m benchmarks.bench_model [--rows 1000000] [--instances 100000]
+
+Reports the average number of bytes allocated for one instance of each domain model class, including any containers the
+instance owns, and the memory allocated for a synthetic catalog of the given number of movies, first for the Movie,
+Actor, Director and Genre objects alone and then for a MovieCatalog indexing them.
+"""
+import argparse
+import gc
+import time
+import tracemalloc
+from datetime import datetime
+
+from benchmarks.bench_load import make_movies
+from cs235flix.adapters.movie_catalog import MovieCatalog
+from cs235flix.domain.model import Actor, Director, Genre, Movie, Review, User, WatchList
+
+
+def allocated_per_call(make, instances: int):
+    # Average bytes still allocated after each call of make, with the arguments it uses created beforehand.
+    gc.collect()
+    tracemalloc.start()
+    objects = [make(i) for i in range(instances)]
+    allocated = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    # The list holding the objects is not part of their footprint.
+    return (allocated - len(objects) * 8) / instances
+
+
+def per_object(instances: int):
+    names = ['Name %d' % i for i in range(instances)]
+    director = Director('Director')
+    actors = [Actor('Actor')]
+    genres = [Genre('Action')]
+    user = User('user', 'password')
+    movie = Movie('Movie', 2016, 1, 'Description', director, actors, genres)
+    timestamp = datetime.today()
+
+    return [
+        ('Actor', allocated_per_call(lambda i: Actor(names[i]), instances)),
+        ('Director', allocated_per_call(lambda i: Director(names[i]), instances)),
+        ('Genre', allocated_per_call(lambda i: Genre(names[i]), instances)),
+        ('User', allocated_per_call(lambda i: User(names[i], 'password'), instances)),
+        ('Movie', allocated_per_call(lambda i: Movie(names[i], 2016, i + 1, 'Description', director, actors, genres),
+                                     instances)),
+        ('Review', allocated_per_call(lambda i: Review(user, movie, names[i], 5, timestamp), instances)),
+        ('WatchList', allocated_per_call(lambda i: WatchList(user), instances)),
+    ]
+
+
+def whole_catalog(rows: int):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    movies = make_movies(rows)
+    model_bytes = tracemalloc.get_traced_memory()[0]
+    catalog = MovieCatalog.build(movies)
+    catalog_bytes = tracemalloc.get_traced_memory()[0]
+    seconds = time.perf_counter() - start
+    tracemalloc.stop()
+    return model_bytes, catalog_bytes, seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--instances', type=int, default=100000)
+    arguments = parser.parse_args()
+
+    print('Bytes per object')
+    for name, size in per_object(arguments.instances):
+        print('  %-10s %6.0f' % (name, size))
+
+    model_bytes, catalog_bytes, seconds = whole_catalog(arguments.rows)
+    print('%d movies (%.1fs)' % (arguments.rows, seconds))
+    print('  model objects:     %8.1f MB' % (model_bytes / 2 ** 20))
+    print('  with catalog:      %8.1f MB' % (catalog_bytes / 2 ** 20))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+""" Benchmark of building pages of movies.
+
+Run from the project root with:
+
+    python -m benchmarks.bench_movie_page [--rows 100000] [--repeat 200]
+
+For each number of synthetic movies and each repository, reports the median time of fetching a page of five movies
+of a year, and of a list of ranks, with the chain of repository calls the pages made before (movies of the year,
+their ranks, the movies of the page by rank, the neighbouring years and the watchlist flags) and with one call to
+get_movie_page.
+"""
+import argparse
+import statistics
+import time
+
+from benchmarks.bench_search_refinement import load
+from cs235flix.adapters.columnar_repository import ColumnarRepository
+from cs235flix.adapters.memory_repository import MemoryRepository
+from cs235flix.adapters.page_query import PageQuery
+
+MOVIES_PER_PAGE = 5
+
+CURSOR = 100
+
+
+def year_chain(repo, year: int, ranks, username: str):
+    movies = repo.get_movies_by_date(year)
+    repo.get_date_of_previous_movie(movies[0])
+    repo.get_date_of_next_movie(movies[0])
+    page_ranks = repo.get_movie_ranks_for_type(movies)[CURSOR:CURSOR + MOVIES_PER_PAGE]
+    repo.get_movies_by_rank(page_ranks)
+    repo.check_if_added_many(username, page_ranks)
+
+
+def ranks_chain(repo, year: int, ranks, username: str):
+    page_ranks = list(ranks[CURSOR:CURSOR + MOVIES_PER_PAGE])
+    repo.get_movies_by_rank(page_ranks)
+    repo.check_if_added_many(username, page_ranks)
+
+
+def year_page(repo, year: int, ranks, username: str):
+    repo.get_movie_page(PageQuery.by_year(year), CURSOR, MOVIES_PER_PAGE, username)
+
+
+def ranks_page(repo, year: int, ranks, username: str):
+    repo.get_movie_page(PageQuery.by_ranks(ranks), CURSOR, MOVIES_PER_PAGE, username)
+
+
+def median_seconds(build_page, repo, year: int, ranks, repeat: int):
+    timings = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        build_page(repo, year, ranks, 'user')
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[100000])
+    parser.add_argument('--repeat', type=int, default=200)
+    arguments = parser.parse_args()
+
+    for rows in arguments.rows:
+        print('%d movies' % rows)
+        print('  %-18s %-8s %12s %12s' % ('repository', 'page', 'call chain', 'page query'))
+        for repository_class in [MemoryRepository, ColumnarRepository]:
+            repo = load(repository_class, rows)
+            years = repo.years_list()
+            year = years[len(years) // 2]
+            ranks = repo.get_movie_ranks_for_type(repo.get_movie_by_type('Action', 'genres'))
+            repo.add_to_watchlist('user', repo.get_movie(ranks[CURSOR]))
+            for name, chain, page in [('year', year_chain, year_page), ('ranks', ranks_chain, ranks_page)]:
+                print('  %-18s %-8s %10.1fus %10.1fus' % (
+                    repository_class.__name__, name, median_seconds(chain, repo, year, ranks, arguments.repeat) * 1e6,
+                    median_seconds(page, repo, year, ranks, arguments.repeat) * 1e6))
+            del repo
+
+
+if __name__ == '__main__':
+    main()
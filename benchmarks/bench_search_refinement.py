@@ -0,0 +1,75 @@
+""" Benchmark of refining searches as the user types.
+
+Run from the project root with:
+
+    python -m benchmarks.bench_search_refinement [--rows 100000 1000000] [--repeat 5]
+
+For each number of synthetic movies and each repository, types titles and an actor's name one letter at a time
+and reports the total time of the searches made, each searching the whole catalog and each refined from the previous
+search of the session by a SearchRefinementCache.
+"""
+import argparse
+import gc
+import statistics
+import time
+
+from benchmarks.bench_load import make_movies
+from cs235flix.adapters.columnar_catalog import movie_record
+from cs235flix.adapters.columnar_repository import ColumnarRepository
+from cs235flix.adapters.memory_repository import MemoryRepository
+from cs235flix.adapters.search_refinement import SearchRefinementCache
+
+TYPED = [('movie', 'moon blood dr'), ('movie', 'night king 4'), ('actor', 'actor')]
+
+
+def load(repository_class, rows: int):
+    repo = repository_class()
+    if repository_class is ColumnarRepository:
+        repo.add_records(movie_record(movie) for movie in make_movies(rows))
+    else:
+        repo.add_movies(make_movies(rows))
+    gc.collect()
+    return repo
+
+
+def type_search(repo, search_type: str, text: str, cache: SearchRefinementCache = None):
+    # Searches for every prefix of text, as a user typing it would, and returns how long that took.
+    start = time.perf_counter()
+    for length in range(1, len(text) + 1):
+        search = text[:length]
+        if cache is None:
+            repo.get_movie_by_type(search, search_type)
+        else:
+            cache.search('session', search, search_type, repo.get_catalog_version(),
+                         lambda: repo.get_movie_by_type(search, search_type))
+    return time.perf_counter() - start
+
+
+def median_seconds(repo, search_type: str, text: str, refined: bool, repeat: int):
+    timings = []
+    for i in range(repeat):
+        timings.append(type_search(repo, search_type, text, SearchRefinementCache() if refined else None))
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[100000])
+    parser.add_argument('--repeat', type=int, default=5)
+    arguments = parser.parse_args()
+
+    for rows in arguments.rows:
+        print('%d movies' % rows)
+        print('  %-18s %-26s %12s %12s' % ('repository', 'typed (total of searches)', 'catalog', 'refined'))
+        for repository_class in [MemoryRepository, ColumnarRepository]:
+            repo = load(repository_class, rows)
+            for search_type, text in TYPED:
+                catalog = median_seconds(repo, search_type, text, False, arguments.repeat)
+                refined = median_seconds(repo, search_type, text, True, arguments.repeat)
+                print('  %-18s %-26s %10.1fms %10.1fms' % (repository_class.__name__, '%s %r' % (search_type, text),
+                                                          catalog * 1e3, refined * 1e3))
+            del repo
+
+
+if __name__ == '__main__':
+    main()
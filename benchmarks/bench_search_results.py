@@ -0,0 +1,67 @@
+""" Benchmark of paging through search results.
+
+Run from the project root with:
+
+    python -m benchmarks.bench_search_results [--rows 100000] [--pages 20] [--repeat 5]
+
+For each number of synthetic movies and each repository, pages through the results of a few searches five movies at a
+time, as the search results page does, and reports the total time taken when every page searches the catalog again
+and when the pages slice the ranks cached by a SearchResultCache.
+"""
+import argparse
+import statistics
+import time
+
+from benchmarks.bench_search_refinement import load
+from cs235flix.adapters.columnar_repository import ColumnarRepository
+from cs235flix.adapters.memory_repository import MemoryRepository
+from cs235flix.adapters.result_cache import SearchResultCache
+
+SEARCHES = [('movie', 'moon'), ('actor', 'ctor 12'), ('genres', 'Action')]
+
+MOVIES_PER_PAGE = 5
+
+
+def page_through(repo, search_type: str, search: str, pages: int, cache: SearchResultCache = None):
+    # Fetches the movies of the first pages of results, and returns how long that took.
+    start = time.perf_counter()
+    for page in range(pages):
+        cursor = page * MOVIES_PER_PAGE
+        if cache is None:
+            ranks = repo.get_movie_ranks_for_type(repo.get_movie_by_type(search, search_type))
+        else:
+            ranks = cache.ranks(search, search_type, repo.get_catalog_version(),
+                                lambda: repo.get_movie_ranks_for_type(repo.get_movie_by_type(search, search_type)))
+        repo.get_movies_by_rank(list(ranks[cursor:cursor + MOVIES_PER_PAGE]))
+    return time.perf_counter() - start
+
+
+def median_seconds(repo, search_type: str, search: str, pages: int, cached: bool, repeat: int):
+    timings = []
+    for i in range(repeat):
+        timings.append(page_through(repo, search_type, search, pages, SearchResultCache() if cached else None))
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[100000])
+    parser.add_argument('--pages', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=5)
+    arguments = parser.parse_args()
+
+    for rows in arguments.rows:
+        print('%d movies, %d pages' % (rows, arguments.pages))
+        print('  %-18s %-20s %12s %12s' % ('repository', 'search', 'catalog', 'cached'))
+        for repository_class in [MemoryRepository, ColumnarRepository]:
+            repo = load(repository_class, rows)
+            for search_type, search in SEARCHES:
+                catalog = median_seconds(repo, search_type, search, arguments.pages, False, arguments.repeat)
+                cached = median_seconds(repo, search_type, search, arguments.pages, True, arguments.repeat)
+                print('  %-18s %-20s %10.1fms %10.1fms' % (repository_class.__name__, '%s %r' % (search_type, search),
+                                                          catalog * 1e3, cached * 1e3))
+            del repo
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+""" Benchmark of populating a MemoryRepository at startup.
+
+Run from the project root with:
+
+    python -m benchmarks.bench_startup [--users 100000] [--hash-sample 200]
+
+Writes a users seed file with the given number of users next to the test movies file, and reports the timings that
+populate returns for each way of storing seed passwords: hashing plaintext passwords while loading, keeping them
+until each user's first login, and reading passwords that are already hashed in the file. Hashing every password takes
+hours for large seed files, so that mode loads only a sample of the users and its time is scaled up.
+"""
+import argparse
+import os
+import shutil
+import tempfile
+
+from werkzeug.security import generate_password_hash
+
+from cs235flix.adapters import memory_repository
+from cs235flix.adapters.memory_repository import MemoryRepository
+
+TEST_DATA_PATH = os.path.abspath('cs235flix/tests/data')
+
+
+def write_seed_data(data_path: str, user_count: int, hashed: bool):
+    shutil.copy(os.path.join(TEST_DATA_PATH, 'Data1000Movies.csv'), data_path)
+
+    # Pre-hashed seed files are made offline; one hash is shared by every user here so that making the file is quick.
+    password_hash = generate_password_hash('password')
+    with open(os.path.join(data_path, 'users.csv'), 'w') as outfile:
+        outfile.write('username,password\n')
+        for i in range(user_count):
+            outfile.write('user%d,%s\n' % (i, password_hash if hashed else 'password%d' % i))
+
+
+def populate(user_count: int, password_mode: str, hashed: bool = False):
+    with tempfile.TemporaryDirectory() as data_path:
+        write_seed_data(data_path, user_count, hashed)
+        return memory_repository.populate(data_path, MemoryRepository(), password_mode=password_mode)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=100000)
+    parser.add_argument('--hash-sample', type=int, default=200)
+    arguments = parser.parse_args()
+
+    sample = min(arguments.users, arguments.hash_sample)
+    runs = [
+        ('hash at startup', populate(sample, 'hash'), arguments.users / sample),
+        ('lazy', populate(arguments.users, 'lazy'), 1),
+        ('pre-hashed file', populate(arguments.users, 'hash', hashed=True), 1),
+    ]
+
+    print('%d seed users' % arguments.users)
+    for name, timings, scale in runs:
+        users_seconds = timings['users'] * scale
+        print('  %-16s movies %7.3fs  users %9.3fs%s  total %9.3fs' % (
+            name, timings['movies'], users_seconds, ' (estimated)' if scale != 1 else '            ',
+            timings['movies'] + users_seconds))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+""" Benchmark of full-text searches over movie titles and descriptions.
+
+Run from the project root with:
+
+    python -m benchmarks.bench_text_search [--rows 1000000] [--repeat 20]
+
+Indexes the given number of synthetic movies, whose titles and descriptions are drawn from the words of the movies
+CSV file with its word frequencies, and reports the build time and the median latency of a set of typical searches
+(the best 100 matches) with NumPy and with the pure-Python fallback.
+"""
+import argparse
+import math
+import os
+import random
+import statistics
+import time
+
+from cs235flix.adapters import text_index
+from cs235flix.adapters.memory_repository import read_csv_file
+from cs235flix.adapters.text_index import TextIndex, TEXT_SEARCH_LIMIT
+
+DATA_PATH = os.path.join('cs235flix', 'adapters', 'data', 'Data1000Movies.csv')
+
+QUERIES = ['intergalactic criminals', 'love', 'a young woman falls in love', 'zombie apocalypse survivors',
+           'detective investigates murder in a small town']
+
+
+def make_documents(count: int, seed: int = 235):
+    # Words are drawn with the frequencies they have in the CSV file, so common words have long posting lists.
+    words = []
+    for row in read_csv_file(DATA_PATH):
+        words.extend(row[3].split())
+    generator = random.Random(seed)
+    for i in range(count):
+        yield (" ".join(generator.choices(words, k=generator.randint(1, 4))),
+               " ".join(generator.choices(words, k=generator.randint(15, 40))))
+
+
+def median_seconds(index: TextIndex, query: str, repeat: int):
+    timings = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        index.search(query, TEXT_SEARCH_LIMIT)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--repeat', type=int, default=20)
+    arguments = parser.parse_args()
+
+    documents = list(make_documents(arguments.rows))
+    start = time.perf_counter()
+    index = TextIndex()
+    index.add_many(documents)
+    print('%d movies, %d terms, indexed in %.1fs' % (arguments.rows, len(index.terms()), time.perf_counter() - start))
+
+    numpy = text_index.numpy
+    print('  %-48s %10s %10s' % ('search (median)', 'numpy', 'python'))
+    for query in QUERIES:
+        with_numpy = median_seconds(index, query, arguments.repeat) if numpy is not None else math.nan
+        text_index.numpy = None
+        try:
+            without_numpy = median_seconds(index, query, max(1, arguments.repeat // 10))
+        finally:
+            text_index.numpy = numpy
+        print('  %-48s %8.2fms %8.0fms' % (query, with_numpy * 1e3, without_numpy * 1e3))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+""" Benchmark of MemoryRepository user lookups.
+
+Run from the project root with:
+
+    python -m benchmarks.bench_users [--users 10000 1000000] [--lookups 100000]
+
+For each store size, times get_user for registered names, has_user for free names with and without a Bloom filter,
+and, for comparison, the linear scan over the user list that get_user used to do.
+"""
+import argparse
+import time
+
+from cs235flix.adapters.bloom_filter import BloomFilter
+from cs235flix.adapters.memory_repository import MemoryRepository
+from cs235flix.domain.model import User
+
+
+def make_repository(user_count: int, user_filter: BloomFilter = None):
+    repo = MemoryRepository(user_filter)
+    for i in range(user_count):
+        repo.add_user(User('user%d' % i, 'hash'))
+    return repo
+
+
+def time_per_call(function, arguments):
+    start = time.perf_counter()
+    for argument in arguments:
+        function(argument)
+    return (time.perf_counter() - start) / len(arguments)
+
+
+def linear_get_user(repo: MemoryRepository, username: str):
+    return next((user for user in repo.users if user.username == username), None)
+
+
+def run(user_count: int, lookups: int):
+    start = time.perf_counter()
+    repo = make_repository(user_count)
+    load_seconds = time.perf_counter() - start
+    filtered_repo = make_repository(user_count, BloomFilter(user_count))
+
+    taken = ['USER%d' % (i * 7919 % user_count) for i in range(lookups)]
+    free = ['free%d' % i for i in range(lookups)]
+
+    print('%d users (loaded in %.2fs)' % (user_count, load_seconds))
+    print('  get_user, registered name:     %8.3f us' % (time_per_call(repo.get_user, taken) * 1e6))
+    print('  has_user, free name:           %8.3f us' % (time_per_call(repo.has_user, free) * 1e6))
+    print('  has_user, free name, filtered: %8.3f us' % (time_per_call(filtered_repo.has_user, free) * 1e6))
+
+    # The scan is far slower, so time fewer calls of it.
+    scanned = ['user%d' % (user_count - 1)] * max(1, min(lookups, 10 ** 7 // user_count))
+    print('  linear scan, last name:        %8.3f us' %
+          (time_per_call(lambda username: linear_get_user(repo, username), scanned) * 1e6))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, nargs='+', default=[10000, 1000000])
+    parser.add_argument('--lookups', type=int, default=100000)
+    arguments = parser.parse_args()
+
+    for user_count in arguments.users:
+        run(user_count, arguments.lookups)
+
+
+if __name__ == '__main__':
+    main()
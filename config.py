@@ -20,4 +20,58 @@ class Config:
     SQLALCHEMY_ECHO = True
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
-    REPOSITORY = environ.get('REPOSITORY')
\ No newline at end of file
+    REPOSITORY = environ.get('REPOSITORY')
+
+    # Poster cache configuration. Without a path, posters are only cached in memory.
+    POSTER_CACHE_PATH = environ.get('POSTER_CACHE_PATH')
+    POSTER_CACHE_SIZE = int(environ.get('POSTER_CACHE_SIZE', 1024))
+
+    # Posters for a page are looked up concurrently; any not found within the deadline (in seconds) are shown as a
+    # placeholder.
+    POSTER_RESOLVER_WORKERS = int(environ.get('POSTER_RESOLVER_WORKERS', 8))
+    POSTER_BATCH_DEADLINE = float(environ.get('POSTER_BATCH_DEADLINE', 2.0))
+    OMDB_API_URL = environ.get('OMDB_API_URL')
+
+    # OMDb requests taking longer than OMDB_TIMEOUT seconds fail. Once OMDB_BREAKER_FAILURE_RATE of the last
+    # OMDB_BREAKER_WINDOW requests have failed, lookups are skipped for OMDB_BREAKER_RESET_TIMEOUT seconds before a
+    # single probe request is let through.
+    OMDB_TIMEOUT = float(environ.get('OMDB_TIMEOUT', 3.0))
+    OMDB_BREAKER_FAILURE_RATE = float(environ.get('OMDB_BREAKER_FAILURE_RATE', 0.5))
+    OMDB_BREAKER_WINDOW = int(environ.get('OMDB_BREAKER_WINDOW', 20))
+    OMDB_BREAKER_MINIMUM_CALLS = int(environ.get('OMDB_BREAKER_MINIMUM_CALLS', 5))
+    OMDB_BREAKER_RESET_TIMEOUT = float(environ.get('OMDB_BREAKER_RESET_TIMEOUT', 30.0))
+
+    # How long (in seconds) browsers may cache the redirect served by /poster/<rank>.
+    POSTER_MAX_AGE = int(environ.get('POSTER_MAX_AGE', 7 * 24 * 60 * 60))
+
+    # Optional background job that fills the poster cache for the whole catalog at startup. The checkpoint file lets
+    # a restarted job carry on where the previous one stopped, and is only used with a POSTER_CACHE_PATH; without
+    # one, POSTER_CACHE_SIZE should be at least the number of movies. The rate limit is in OMDb requests per second.
+    POSTER_PREFETCH = environ.get('POSTER_PREFETCH') == 'True'
+    POSTER_PREFETCH_CHECKPOINT = environ.get('POSTER_PREFETCH_CHECKPOINT')
+    POSTER_PREFETCH_WORKERS = int(environ.get('POSTER_PREFETCH_WORKERS', 4))
+    POSTER_PREFETCH_RATE = float(environ.get('POSTER_PREFETCH_RATE', 5.0))
+
+    # Sizing a Bloom filter for the expected number of users lets registration rule out free usernames without a
+    # database query. Zero disables the filter.
+    USER_BLOOM_FILTER_CAPACITY = int(environ.get('USER_BLOOM_FILTER_CAPACITY', 0))
+
+    # Optional file in which the in-memory repository keeps a snapshot of the loaded movies and their indexes. It is
+    # reused at startup while the movies CSV file is unchanged, and rebuilt otherwise.
+    MOVIE_SNAPSHOT_PATH = environ.get('MOVIE_SNAPSHOT_PATH')
+
+    # Optional catalog file from which the columnar repository maps the movies read-only, so that worker processes
+    # share one copy of them through the page cache. It is written from the movies CSV file when missing or stale.
+    MOVIE_CATALOG_PATH = environ.get('MOVIE_CATALOG_PATH')
+
+    # The most candidate movies kept, across every session, for refining a search from the previous search of its
+    # session as the user types. The least recently used sessions' candidates are evicted beyond it.
+    SEARCH_REFINEMENT_CACHE_SIZE = int(environ.get('SEARCH_REFINEMENT_CACHE_SIZE', 100000))
+
+    # The most movie ranks kept, across every cached search result, for paging through results without searching
+    # again. The least recently used results are evicted beyond it.
+    SEARCH_RESULT_CACHE_SIZE = int(environ.get('SEARCH_RESULT_CACHE_SIZE', 1000000))
+
+    # How plaintext passwords in the users seed file are stored: 'hash' hashes them all at startup, 'lazy' hashes each
+    # one when its user first logs in. Passwords already hashed in the seed file are used as they are.
+    SEED_PASSWORD_MODE = environ.get('SEED_PASSWORD_MODE', 'hash')
@@ -9,7 +9,14 @@ from sqlalchemy.orm import sessionmaker, clear_mappers
 from sqlalchemy.pool import NullPool
 
 import cs235flix.adapters.repository as repo
-from cs235flix.adapters import memory_repository, database_repository
+import cs235flix.adapters.omdb_client as omdb_client
+import cs235flix.adapters.poster_cache as poster_cache
+import cs235flix.adapters.poster_prefetch as poster_prefetch
+import cs235flix.adapters.poster_resolver as poster_resolver
+import cs235flix.adapters.result_cache as result_cache
+import cs235flix.adapters.search_refinement as search_refinement
+from cs235flix.adapters import columnar_repository, memory_repository, database_repository
+from cs235flix.adapters.bloom_filter import BloomFilter
 from cs235flix.adapters.memory_repository import MemoryRepository, populate
 from cs235flix.adapters.orm import metadata, map_model_to_tables
 
@@ -29,10 +36,51 @@ def create_app(test_config=None):
         app.config.from_mapping(test_config)
         data_path = app.config['TEST_DATA_PATH']
 
+    # Posters looked up from OMDb are shared by both repository implementations.
+    poster_cache.cache_instance = poster_cache.PosterCache(app.config.get('POSTER_CACHE_PATH'),
+                                                           max_entries=app.config.get('POSTER_CACHE_SIZE', 1024))
+    poster_resolver.resolver_instance.shutdown(wait_for_lookups=False)
+    poster_resolver.resolver_instance = poster_resolver.PosterResolver(
+        max_workers=app.config.get('POSTER_RESOLVER_WORKERS', 8),
+        deadline=app.config.get('POSTER_BATCH_DEADLINE', 2.0),
+        placeholder=app.static_url_path + '/images/poster_placeholder.svg')
+    omdb_client.configure(url=app.config.get('OMDB_API_URL'),
+                          timeout=app.config.get('OMDB_TIMEOUT', 3.0),
+                          failure_rate=app.config.get('OMDB_BREAKER_FAILURE_RATE', 0.5),
+                          window=app.config.get('OMDB_BREAKER_WINDOW', 20),
+                          minimum_calls=app.config.get('OMDB_BREAKER_MINIMUM_CALLS', 5),
+                          reset_timeout=app.config.get('OMDB_BREAKER_RESET_TIMEOUT', 30.0))
+
+    # Candidates of each session's last search, for refining the next one as the user types.
+    search_refinement.cache_instance = search_refinement.SearchRefinementCache(
+        app.config.get('SEARCH_REFINEMENT_CACHE_SIZE', search_refinement.DEFAULT_MAX_CANDIDATES))
+
+    # The ranks of the movies matching recent searches, for paging through their results.
+    result_cache.cache_instance = result_cache.SearchResultCache(
+        app.config.get('SEARCH_RESULT_CACHE_SIZE', result_cache.DEFAULT_MAX_RANKS))
+
+    # Optionally answer "is this username taken?" for free names without looking the name up.
+    user_filter = None
+    if app.config.get('USER_BLOOM_FILTER_CAPACITY', 0) > 0:
+        user_filter = BloomFilter(app.config['USER_BLOOM_FILTER_CAPACITY'])
+
     if app.config['REPOSITORY'] == 'memory':
         # Create the MemoryRepository implementation for a memory-based repository.
-        repo.repo_instance = MemoryRepository()
-        memory_repository.populate(data_path, repo.repo_instance)
+        repo.repo_instance = MemoryRepository(user_filter)
+        timings = memory_repository.populate(data_path, repo.repo_instance, app.config.get('MOVIE_SNAPSHOT_PATH'),
+                                             app.config.get('SEED_PASSWORD_MODE', 'hash'))
+        app.logger.info('Loaded movies in %.3fs, completions in %.3fs and users in %.3fs', timings['movies'],
+                        timings['completions'], timings['users'])
+
+    elif app.config['REPOSITORY'] == 'columnar':
+        # Create the ColumnarRepository implementation, which holds large catalogs in memory column by column, or maps
+        # them from a catalog file shared by every worker process.
+        repo.repo_instance = columnar_repository.ColumnarRepository(user_filter)
+        timings = columnar_repository.populate(data_path, repo.repo_instance,
+                                               app.config.get('SEED_PASSWORD_MODE', 'hash'),
+                                               app.config.get('MOVIE_CATALOG_PATH'))
+        app.logger.info('Loaded movies in %.3fs, completions in %.3fs and users in %.3fs', timings['movies'],
+                        timings['completions'], timings['users'])
 
     elif app.config['REPOSITORY'] == 'database':
         database_uri = app.config['SQLALCHEMY_DATABASE_URI']
@@ -56,7 +104,7 @@ def create_app(test_config=None):
             # Generate mappings that map domain model classes to the database tables.
             map_model_to_tables()
 
-            database_repository.populate(database_engine, data_path)
+            database_repository.populate(database_engine, data_path, app.config.get('SEED_PASSWORD_MODE', 'hash'))
 
         else:
             # Solely generate mappings that map domain model classes to the database tables.
@@ -65,7 +113,17 @@ def create_app(test_config=None):
         # Create the database session factory using sessionmaker (this has to be done once, in a global manner)
         session_factory = sessionmaker(autocommit=False, autoflush=True, bind=database_engine)
         # Create the SQLAlchemy DatabaseRepository instance for an sqlite3-based repository.
-        repo.repo_instance = database_repository.SqlAlchemyRepository(session_factory)
+        repo.repo_instance = database_repository.SqlAlchemyRepository(session_factory, user_filter)
+
+    if app.config.get('POSTER_PREFETCH'):
+        # Warm the poster cache in the background, so that user requests are answered without contacting OMDb.
+        number_of_movies = repo.repo_instance.get_number_of_movies()
+        movies = repo.repo_instance.get_movies_by_rank(range(1, number_of_movies + 1))
+        poster_prefetch.prefetcher_instance = poster_prefetch.PosterPrefetcher(
+            movies,
+            checkpoint_path=app.config.get('POSTER_PREFETCH_CHECKPOINT'),
+            max_workers=app.config.get('POSTER_PREFETCH_WORKERS', 4),
+            rate_limit=app.config.get('POSTER_PREFETCH_RATE', 5.0)).start()
 
     # Build the application - these steps require an application context.
     with app.app_context():
@@ -82,6 +140,9 @@ def create_app(test_config=None):
         from .search import search
         app.register_blueprint(search.search_blueprint)
 
+        from .posters import posters
+        app.register_blueprint(posters.posters_blueprint)
+
         # Register a callback the makes sure that database sessions are associated with http requests
         # We reset the session inside the database repository before a new flask request is generated
         @app.before_request
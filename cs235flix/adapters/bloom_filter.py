@@ -0,0 +1,53 @@
+import hashlib
+import math
+
+
+class BloomFilter:
+    """ Set membership test that may give false positives but never false negatives.
+
+    The filter is sized for capacity items at the given false positive rate. Each item sets hash_count bits in a bit
+    array, derived from a single 128-bit hash by double hashing; an item is possibly present only if all of its bits
+    are set. Items cannot be removed.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        if capacity <= 0:
+            raise ValueError('capacity must be positive')
+        if not 0 < error_rate < 1:
+            raise ValueError('error_rate must be between 0 and 1')
+
+        self._size = max(8, int(math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)))
+        self._hash_count = max(1, int(round(self._size / capacity * math.log(2))))
+        self._bits = bytearray((self._size + 7) // 8)
+        self._count = 0
+
+    @property
+    def size(self):
+        return self._size
+
+    @property
+    def hash_count(self):
+        return self._hash_count
+
+    def __len__(self):
+        return self._count
+
+    def add(self, item: str):
+        bits = self._bits
+        for position in self._positions(item):
+            bits[position >> 3] |= 1 << (position & 7)
+        self._count += 1
+
+    def __contains__(self, item: str):
+        bits = self._bits
+        for position in self._positions(item):
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+    def _positions(self, item: str):
+        digest = int.from_bytes(hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest(), 'little')
+        first = digest & 0xFFFFFFFFFFFFFFFF
+        second = (digest >> 64) | 1
+        size = self._size
+        return [(first + i * second) % size for i in range(self._hash_count)]
@@ -0,0 +1,314 @@
+import json
+import mmap
+import os
+import sys
+from array import array
+from bisect import bisect_left
+
+from cs235flix.adapters.columnar_catalog import ColumnarCatalog, NameIndex, StringColumn, TitleIndex
+from cs235flix.adapters.genre_index import GenreBitmaps
+from cs235flix.adapters.movie_filter import NumericColumns
+from cs235flix.adapters.text_index import TextIndex
+from cs235flix.adapters.trigram_index import TrigramIndex
+
+# Bump whenever the layout of catalog files changes, so that older files are rebuilt.
+CATALOG_FILE_VERSION = 2
+
+_MAGIC = b'CS235CAT'
+
+# Sections start on 8-byte boundaries, so that every column can be read in place as an array of its type.
+_ALIGNMENT = 8
+
+# The fixed-width columns of a ColumnarCatalog, stored as they are.
+_COLUMNS = ['ranks', 'years', 'runtimes', 'ratings', 'votes', 'revenues', 'metascores', 'rows_by_rank',
+            'sorted_ranks']
+
+_NAME_INDEXES = ['actors', 'directors', 'genres']
+
+
+def save_catalog(path: str, catalog: ColumnarCatalog, source_hash: str):
+    """ Writes catalog to path as a catalog file, for map_catalog to read.
+
+    A catalog file is a header followed by sections. The header is the magic bytes, the length of a JSON table of
+    contents and the table itself, which holds the source hash and the offset, length and array type code of every
+    section. Sections are the fixed-width columns of the catalog, string heaps (UTF-8 blobs with an array of
+    offsets), the compressed sparse row arrays of its name and full-text indexes, and the genre bitmaps. The file is
+    written to a temporary file first and then moved into place, so that a process mapping it never sees a partly
+    written file.
+    """
+    sections = dict()
+    for name in _COLUMNS:
+        sections[name] = getattr(catalog, name)
+    _add_strings(sections, 'titles', *catalog.titles.buffers())
+    _add_strings(sections, 'descriptions', *catalog.descriptions.buffers())
+    _add_text(sections, 'title_keys', [catalog.title_index.title(row) for row in range(len(catalog))])
+
+    for index_name in _NAME_INDEXES:
+        _add_name_index(sections, index_name, getattr(catalog, index_name))
+
+    sections['release_years'] = array('h', catalog.release_years)
+    year_offsets = array('q', [0])
+    year_rows = array('i')
+    for year in catalog.release_years:
+        year_rows.extend(catalog.rows_by_year[year])
+        year_offsets.append(len(year_rows))
+    sections['year_offsets'] = year_offsets
+    sections['year_rows'] = year_rows
+
+    # Terms are sorted, and the posting lists of each term stored in compressed sparse row form.
+    terms = sorted(catalog.text_index.terms())
+    term_offsets = array('q', [0])
+    term_documents = array('i')
+    term_frequencies = array('i')
+    for term, (documents, frequencies) in terms:
+        term_documents.extend(documents)
+        term_frequencies.extend(frequencies)
+        term_offsets.append(len(term_documents))
+    _add_text(sections, 'text.terms', [term for term, postings in terms])
+    sections['text.term_offsets'] = term_offsets
+    sections['text.documents'] = term_documents
+    sections['text.frequencies'] = term_frequencies
+    sections['text.lengths'] = catalog.text_index.lengths()
+
+    genres = catalog.genre_bitmaps.bitmaps()
+    for key, bitmap in genres.items():
+        sections['genre_bitmap:' + key] = bitmap.to_bytes((len(catalog) + 7) // 8, 'little')
+
+    table = {'version': CATALOG_FILE_VERSION, 'source_hash': source_hash, 'byteorder': sys.byteorder,
+             'size': len(catalog), 'genres': list(genres), 'text_length': sum(catalog.text_index.lengths()),
+             'sections': dict()}
+    position = 0
+    for name, section in sections.items():
+        section = memoryview(section)
+        table['sections'][name] = [position, section.nbytes, section.format]
+        position = _aligned(position + section.nbytes)
+    table = json.dumps(table).encode('utf-8')
+
+    temp_path = '%s.%d.tmp' % (path, os.getpid())
+    with open(temp_path, 'wb') as outfile:
+        outfile.write(_MAGIC + len(table).to_bytes(8, 'little') + table)
+        outfile.write(bytes(_aligned(outfile.tell()) - outfile.tell()))
+        data_start = outfile.tell()
+        for section in sections.values():
+            outfile.write(section)
+            outfile.write(bytes(_aligned(outfile.tell() - data_start) - (outfile.tell() - data_start)))
+    os.replace(temp_path, path)
+
+
+def map_catalog(path: str, source_hash: str):
+    # Returns the catalog in the file at path, or None if there is no usable catalog file for the data with
+    # source_hash.
+    if path is None or not os.path.exists(path):
+        return None
+
+    try:
+        with open(path, 'rb') as infile:
+            mapping = mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    try:
+        if mapping[:len(_MAGIC)] != _MAGIC:
+            return None
+        table_end = len(_MAGIC) + 8 + int.from_bytes(mapping[len(_MAGIC):len(_MAGIC) + 8], 'little')
+        table = json.loads(mapping[len(_MAGIC) + 8:table_end].decode('utf-8'))
+        if not isinstance(table, dict) or table.get('version') != CATALOG_FILE_VERSION or \
+                table.get('source_hash') != source_hash or table.get('byteorder') != sys.byteorder:
+            return None
+        return MappedCatalog(mapping, _aligned(table_end), table)
+    except (ValueError, TypeError, KeyError, IndexError):
+        # A damaged or truncated file is rebuilt from the CSV file.
+        return None
+
+
+def _aligned(position: int) -> int:
+    return position + -position % _ALIGNMENT
+
+
+def _add_strings(sections: dict, name: str, blob, offsets):
+    sections[name + '.blob'] = blob
+    sections[name + '.offsets'] = offsets
+
+
+def _add_text(sections: dict, name: str, keys):
+    # Normalized names or titles, each followed by a newline so that a substring search can't run across two of them.
+    text = bytearray()
+    offsets = array('q', [0])
+    for key in keys:
+        text += key.encode('utf-8') + b'\n'
+        offsets.append(len(text))
+    _add_strings(sections, name, bytes(text), offsets)
+
+
+def _add_name_index(sections: dict, prefix: str, index: NameIndex):
+    _add_strings(sections, prefix + '.names', *index.names.buffers())
+    for name in ['name_offsets', 'name_ids', 'row_offsets', 'rows']:
+        sections[prefix + '.' + name] = getattr(index, name)
+
+    # Keys are kept in the order of their ids, with the ids in key order for exact lookups by binary search.
+    keys = index.keys()
+    _add_text(sections, prefix + '.keys', keys)
+    sections[prefix + '.sorted_keys'] = array('i', sorted(range(len(keys)), key=keys.__getitem__))
+
+    # Words are sorted, and the ids of the names containing each word stored in compressed sparse row form.
+    words = sorted(index.tokens)
+    word_offsets = array('q', [0])
+    word_ids = array('i')
+    for word in words:
+        word_ids.extend(sorted(index.tokens[word]))
+        word_offsets.append(len(word_ids))
+    _add_text(sections, prefix + '.words', words)
+    sections[prefix + '.word_offsets'] = word_offsets
+    sections[prefix + '.word_ids'] = word_ids
+
+
+class MappedCatalog(ColumnarCatalog):
+    """ A ColumnarCatalog read in place from a memory-mapped catalog file.
+
+    Columns and string heaps are memoryviews of the mapping, so records are read straight out of the page cache, and
+    every process mapping the same file shares one copy of it. Only the genre bitmaps and the rows of each year, which
+    are small, are copied into the process. Trigram indexes for typo-tolerant searches, and prefix indexes for
+    completing searches, are built the first time one is needed.
+    """
+
+    def __init__(self, mapping: mmap.mmap, data_start: int, table: dict):
+        self._mapping = mapping
+        self._data_start = data_start
+        self._sections = table['sections']
+
+        for name in _COLUMNS:
+            setattr(self, name, self._section(name))
+        self.numeric_columns = NumericColumns({'rank': self.ranks, 'year': self.years, 'runtime': self.runtimes,
+                                               'rating': self.ratings, 'votes': self.votes,
+                                               'revenue': self.revenues, 'metascore': self.metascores})
+
+        self.titles = self._strings('titles')
+        self.descriptions = self._strings('descriptions')
+        self.title_index = MappedTitleIndex(self, 'title_keys')
+        self.actors = MappedNameIndex(self, 'actors')
+        self.directors = MappedNameIndex(self, 'directors')
+        self.genres = MappedNameIndex(self, 'genres')
+        self.genre_bitmaps = GenreBitmaps(table['size'], {
+            key: int.from_bytes(self._section('genre_bitmap:' + key), 'little') for key in table['genres']})
+        self.text_index = MappedTextIndex(self, 'text', table['text_length'])
+
+        year_offsets = self._section('year_offsets')
+        year_rows = self._section('year_rows')
+        self.release_years = list(self._section('release_years'))
+        self.rows_by_year = {year: year_rows[year_offsets[index]:year_offsets[index + 1]]
+                             for index, year in enumerate(self.release_years)}
+        self._completions = None
+
+    def _section(self, name: str):
+        offset, length, type_code = self._sections[name]
+        start = self._data_start + offset
+        if start + length > len(self._mapping):
+            raise ValueError('catalog file is truncated')
+        return memoryview(self._mapping)[start:start + length].cast(type_code)
+
+    def _strings(self, name: str) -> StringColumn:
+        return StringColumn.from_buffers(self._section(name + '.blob'), self._section(name + '.offsets'))
+
+    def _text(self, name: str):
+        # The mapping itself, which can be searched with find, and where the text starts in it.
+        return self._mapping, self._data_start + self._sections[name + '.blob'][0]
+
+
+class MappedTitleIndex(TitleIndex):
+    """ The title index of a MappedCatalog, searched with find over the UTF-8 titles in the mapping. """
+
+    def __init__(self, catalog: MappedCatalog, name: str):
+        self._text, self._start = catalog._text(name)
+        self._offsets = catalog._section(name + '.offsets')
+        self._trigrams = None
+
+    def title(self, row: int) -> str:
+        return super().title(row).decode('utf-8')
+
+    def _needle(self, key: str):
+        return key.encode('utf-8')
+
+
+class MappedNameIndex(NameIndex):
+    """ A name index of a MappedCatalog.
+
+    Exact names and words are found by binary search over sorted keys and words in the mapping, and substrings with
+    find over the keys, rather than with dicts and a trigram index built when the catalog is loaded.
+    """
+
+    def __init__(self, catalog: MappedCatalog, prefix: str):
+        self.names = catalog._strings(prefix + '.names')
+        for name in ['name_offsets', 'name_ids', 'row_offsets', 'rows', 'sorted_keys', 'word_offsets', 'word_ids']:
+            setattr(self, name, catalog._section(prefix + '.' + name))
+        self._keys = MappedTitleIndex(catalog, prefix + '.keys')
+        self._words = MappedTitleIndex(catalog, prefix + '.words')
+        self.trigrams = None
+
+    def keys(self):
+        return [self._keys.title(name_id) for name_id in range(len(self))]
+
+    def _name_id(self, key: str):
+        index = _search_sorted(self._keys, self.sorted_keys, key)
+        return self.sorted_keys[index] if index is not None else None
+
+    def _word_name_ids(self, word: str):
+        index = _search_sorted(self._words, range(len(self._words)), word)
+        if index is None:
+            return ()
+        return self.word_ids[self.word_offsets[index]:self.word_offsets[index + 1]]
+
+    def _name_ids_containing(self, key: str):
+        return self._keys._containing(key)
+
+    def _trigram_index(self) -> TrigramIndex:
+        if self.trigrams is None:
+            self.trigrams = TrigramIndex()
+            self.trigrams.add_many(self.keys())
+        return self.trigrams
+
+
+class MappedTextIndex(TextIndex):
+    """ The full-text index of a MappedCatalog, with the posting lists of a term found by binary search. """
+
+    def __init__(self, catalog: MappedCatalog, prefix: str, total_length: int):
+        self._terms = MappedTitleIndex(catalog, prefix + '.terms')
+        self._term_offsets = catalog._section(prefix + '.term_offsets')
+        self._documents = catalog._section(prefix + '.documents')
+        self._frequencies = catalog._section(prefix + '.frequencies')
+        self._lengths = catalog._section(prefix + '.lengths')
+        self._total_length = total_length
+        self._postings = None
+
+    def _postings_of(self, term: str):
+        index = _search_sorted(self._terms, range(len(self._terms)), term)
+        return self._postings_at(index) if index is not None else ((), ())
+
+    def _postings_at(self, index: int):
+        start, end = self._term_offsets[index], self._term_offsets[index + 1]
+        return self._documents[start:end], self._frequencies[start:end]
+
+    def terms(self):
+        return [(self._terms.title(index), self._postings_at(index)) for index in range(len(self._terms))]
+
+
+class _SortedKeys:
+    # The keys of text in the order of ids, as a sequence for bisect.
+
+    def __init__(self, text: MappedTitleIndex, ids):
+        self._text = text
+        self._ids = ids
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __getitem__(self, index: int) -> str:
+        return self._text.title(self._ids[index])
+
+
+def _search_sorted(text: MappedTitleIndex, ids, key: str):
+    # Returns the position in ids of the id whose key is key, where ids are ordered by key, or None.
+    keys = _SortedKeys(text, ids)
+    index = bisect_left(keys, key)
+    if index < len(keys) and keys[index] == key:
+        return index
+    return None
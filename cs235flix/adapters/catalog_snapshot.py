@@ -0,0 +1,54 @@
+import gc
+import hashlib
+import os
+import pickle
+
+from cs235flix.adapters.movie_catalog import MovieCatalog
+
+# Bump whenever MovieCatalog, its indexes or the domain model change shape, so that older snapshots are rebuilt.
+SNAPSHOT_VERSION = 6
+
+
+def file_hash(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as infile:
+        for block in iter(lambda: infile.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def save_snapshot(path: str, catalog: MovieCatalog, source_hash: str):
+    # The snapshot is a small header followed by the pickled catalog. It is written to a temporary file first and then
+    # moved into place, so a reader never sees a partly written snapshot.
+    header = {'version': SNAPSHOT_VERSION, 'source_hash': source_hash}
+    temp_path = path + '.tmp'
+    with open(temp_path, 'wb') as outfile:
+        pickle.dump(header, outfile, protocol=pickle.HIGHEST_PROTOCOL)
+        pickle.dump(catalog, outfile, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temp_path, path)
+
+
+def load_snapshot(path: str, source_hash: str):
+    # Returns the catalog stored at path, or None if there is no usable snapshot for the data with source_hash.
+    if path is None or not os.path.exists(path):
+        return None
+
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        with open(path, 'rb') as infile:
+            header = pickle.load(infile)
+            if not isinstance(header, dict) or header.get('version') != SNAPSHOT_VERSION or \
+                    header.get('source_hash') != source_hash:
+                return None
+            catalog = pickle.load(infile)
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError, TypeError, ValueError):
+        # A damaged snapshot, or one written by incompatible code, is rebuilt from the CSV file.
+        return None
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+    if not isinstance(catalog, MovieCatalog):
+        return None
+    return catalog
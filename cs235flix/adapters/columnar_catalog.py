@@ -0,0 +1,360 @@
+import gc
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import namedtuple
+
+from cs235flix.adapters.genre_index import GenreBitmaps, genre_bitmaps
+from cs235flix.adapters.movie_filter import NumericColumns, MISSING
+from cs235flix.adapters.prefix_index import Completions
+from cs235flix.adapters.text_index import TextIndex
+from cs235flix.adapters.trigram_index import TrigramIndex, normalize_name, FUZZY_MATCH_LIMIT
+from cs235flix.domain.model import Actor, Genre, Movie
+
+# Serializes building the prefix indexes of a catalog, so that concurrent first completions build them only once.
+_completions_lock = threading.Lock()
+
+# One movie as stored in a ColumnarCatalog. Names of the director, actors and genres are plain strings.
+MovieRecord = namedtuple('MovieRecord', ['rank', 'title', 'year', 'description', 'director', 'actors', 'genres',
+                                         'runtime', 'rating', 'votes', 'revenue', 'metascore'])
+
+
+def record_sort_key(record: MovieRecord):
+    # The order of Movie.__lt__, and so of the movies in a MemoryRepository: by title, then release year.
+    return record.title, record.year
+
+
+def movie_record(movie: Movie) -> MovieRecord:
+    actors = [actor.actor_full_name for actor in movie.actors
+              if isinstance(actor, Actor) and actor.actor_full_name is not None]
+    genres = [genre.genre_name for genre in movie.genres if isinstance(genre, Genre)]
+    return MovieRecord(movie.rank, movie.title or "", int(movie.release_date), movie.description,
+                       movie.director.director_full_name, actors, genres, movie.runtime_minutes or MISSING,
+                       _or_missing(movie.rating, float('nan')), _or_missing(movie.votes, MISSING),
+                       _or_missing(movie.revenue, float('nan')), _or_missing(movie.metascore, MISSING))
+
+
+def _or_missing(value, missing):
+    return missing if value is None else value
+
+
+class StringColumn:
+    """ Strings stored back to back in a single UTF-8 blob, with the offset of each one. """
+
+    def __init__(self, strings=()):
+        blob = bytearray()
+        offsets = array('q', [0])
+        for string in strings:
+            blob += string.encode('utf-8')
+            offsets.append(len(blob))
+
+        self._blob = bytes(blob)
+        self._offsets = offsets
+
+    @classmethod
+    def from_buffers(cls, blob, offsets) -> 'StringColumn':
+        # A column over an existing blob and offsets, e.g. memoryviews of a mapped catalog file, without copying them.
+        column = cls.__new__(cls)
+        column._blob = blob
+        column._offsets = offsets
+        return column
+
+    def buffers(self):
+        return self._blob, self._offsets
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index: int) -> str:
+        return str(self._blob[self._offsets[index]:self._offsets[index + 1]], 'utf-8')
+
+
+class NameIndex:
+    """ The names (of actors, directors or genres) of every movie in a ColumnarCatalog, and the movies of every name.
+
+    Names get integer ids in the order they are first seen, and are shared by every movie whose name normalizes to
+    the same key. Both directions are stored in compressed sparse row form: the ids of the names of row r are
+    name_ids[name_offsets[r]:name_offsets[r + 1]], and the rows of the movies with name n are
+    rows[row_offsets[n]:row_offsets[n + 1]], in ascending order. Whole words and trigrams of the normalized names are
+    indexed for searching.
+    """
+
+    def __init__(self, names_per_row, searchable: bool = True):
+        ids = dict()
+        names = []
+        keys = dict()
+        name_offsets = array('q', [0])
+        name_ids = array('i')
+        for row_names in names_per_row:
+            for name in row_names:
+                key = keys.get(name)
+                if key is None:
+                    key = keys[name] = normalize_name(name)
+                name_id = ids.get(key)
+                if name_id is None:
+                    name_id = ids[key] = len(names)
+                    names.append(name)
+                name_ids.append(name_id)
+            name_offsets.append(len(name_ids))
+
+        # Count the movies of each name, then place each row after the rows of the names before it.
+        counts = array('q', bytes(8 * (len(names) + 1)))
+        for name_id in name_ids:
+            counts[name_id + 1] += 1
+        for name_id in range(len(names)):
+            counts[name_id + 1] += counts[name_id]
+        row_offsets = array('q', counts)
+        rows = array('i', bytes(4 * len(name_ids)))
+        for row in range(len(name_offsets) - 1):
+            for position in range(name_offsets[row], name_offsets[row + 1]):
+                name_id = name_ids[position]
+                rows[counts[name_id]] = row
+                counts[name_id] += 1
+
+        self.ids = ids
+        self.names = StringColumn(names)
+        self.name_offsets = name_offsets
+        self.name_ids = name_ids
+        self.row_offsets = row_offsets
+        self.rows = rows
+
+        self.tokens = dict()
+        self.trigrams = TrigramIndex()
+        if searchable:
+            for key, name_id in ids.items():
+                for word in key.split():
+                    self.tokens.setdefault(word, set()).add(name_id)
+            self.trigrams.add_many(ids)
+
+    def __len__(self):
+        return len(self.names)
+
+    def names_of_row(self, row: int):
+        return [self.names[name_id] for name_id in self.name_ids[self.name_offsets[row]:self.name_offsets[row + 1]]]
+
+    def rows_of_name(self, name_id: int):
+        return list(self.rows[self.row_offsets[name_id]:self.row_offsets[name_id + 1]])
+
+    def search(self, search: str):
+        # Returns the rows of the movies with names matching search, as MemoryRepository matches names: an exact name,
+        # then whole words, then a substring of the names, and failing those the names that look most like search.
+        key = normalize_name(search)
+        name_id = self._name_id(key)
+        if name_id is not None:
+            return self.rows_of_name(name_id)
+
+        words = key.split()
+        postings = [self._word_name_ids(word) for word in words]
+        if len(postings) > 0 and all(len(posting) > 0 for posting in postings):
+            name_ids = set(min(postings, key=len))
+            for posting in postings:
+                name_ids.intersection_update(posting)
+            if len(name_ids) > 0:
+                return self._rows_of_names(name_ids)
+
+        name_ids = self._name_ids_containing(key)
+        if len(name_ids) > 0:
+            return self._rows_of_names(name_ids)
+
+        # Movies are ordered by how closely their name matched.
+        rows = dict()
+        for name, similarity in self._trigram_index().fuzzy(key, limit=FUZZY_MATCH_LIMIT):
+            for row in self.rows_of_name(self._name_id(name)):
+                rows.setdefault(row)
+        return list(rows)
+
+    def keys(self):
+        # The normalized names, in the order of their ids.
+        return list(self.ids)
+
+    def _name_id(self, key: str):
+        return self.ids.get(key)
+
+    def _word_name_ids(self, word: str):
+        return self.tokens.get(word, ())
+
+    def _name_ids_containing(self, key: str):
+        return [self.ids[name] for name in self.trigrams.substring(key)]
+
+    def _trigram_index(self) -> TrigramIndex:
+        return self.trigrams
+
+    def _rows_of_names(self, name_ids):
+        rows = set()
+        for name_id in name_ids:
+            rows.update(self.rows[self.row_offsets[name_id]:self.row_offsets[name_id + 1]])
+        return sorted(rows)
+
+
+class TitleIndex:
+    """ The normalized titles of a ColumnarCatalog, one per line in a single string.
+
+    Substring searches run str.find over the whole string, which is fast enough for millions of titles without an
+    index per title. A trigram index of the titles, for typo-tolerant searches, is only built the first time one is
+    needed.
+    """
+
+    def __init__(self, titles):
+        keys = []
+        offsets = array('q', [0])
+        length = 0
+        for title in titles:
+            key = normalize_name(title)
+            keys.append(key)
+            length += len(key) + 1
+            offsets.append(length)
+
+        self._text = '\n'.join(keys) + '\n' if len(keys) > 0 else ''
+        self._start = 0
+        self._offsets = offsets
+        self._trigrams = None
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def title(self, row: int) -> str:
+        return self._text[self._start + self._offsets[row]:self._start + self._offsets[row + 1] - 1]
+
+    def search(self, search: str):
+        # Returns the rows of the movies whose title is search or, failing that, contains it. Failing both, returns
+        # the rows of the most similar titles.
+        key = normalize_name(search)
+        rows = self._containing(key)
+        length = len(self._needle(key)) + 1
+        exact = [row for row in rows if self._offsets[row + 1] - self._offsets[row] == length]
+        if len(exact) > 0:
+            return exact
+        if len(rows) > 0:
+            return rows
+
+        if self._trigrams is None:
+            self._trigrams = TrigramIndex()
+            self._trigrams.add_many(self.title(row) for row in range(len(self)))
+
+        rows = dict()
+        for title, similarity in self._trigrams.fuzzy(key, limit=FUZZY_MATCH_LIMIT):
+            for row in self._containing(title):
+                if self.title(row) == title:
+                    rows.setdefault(row)
+        return list(rows)
+
+    def _needle(self, key: str):
+        # key as it is stored in the text.
+        return key
+
+    def _containing(self, key: str):
+        rows = []
+        needle = self._needle(key)
+        text = self._text
+        start = self._start
+        offsets = self._offsets
+        end = start + offsets[-1]
+        position = text.find(needle, start, end)
+        while position >= 0:
+            row = bisect_right(offsets, position - start) - 1
+            if row >= len(offsets) - 1:
+                break
+            rows.append(row)
+            # A title can't contain a newline, so carry on from the start of the next title.
+            position = text.find(needle, start + offsets[row + 1], end)
+        return rows
+
+
+class ColumnarCatalog:
+    """ The movies of a ColumnarRepository, stored column by column rather than as Movie objects.
+
+    Movies are stored in rows ordered by name, like the movies of a MemoryRepository. Numbers are kept in typed arrays,
+    strings in StringColumns, and the actors, director and genres of each movie as ids into NameIndexes. A catalog is
+    built in one go from MovieRecords and is not changed afterwards.
+    """
+
+    def __init__(self, records=()):
+        records = sorted(records, key=record_sort_key)
+        self._build(records)
+
+    @classmethod
+    def build(cls, records) -> 'ColumnarCatalog':
+        # Building allocates many long-lived objects, which would otherwise trigger repeated and fruitless garbage
+        # collection passes.
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            return cls(records)
+        finally:
+            if gc_enabled:
+                gc.enable()
+
+    def _build(self, records):
+        self.ranks = array('q', (record.rank for record in records))
+        self.years = array('h', (record.year for record in records))
+        self.runtimes = array('i', (record.runtime for record in records))
+        self.ratings = array('d', (record.rating for record in records))
+        self.votes = array('q', (record.votes for record in records))
+        self.revenues = array('d', (record.revenue for record in records))
+        self.metascores = array('h', (record.metascore for record in records))
+        self.numeric_columns = NumericColumns({'rank': self.ranks, 'year': self.years, 'runtime': self.runtimes,
+                                               'rating': self.ratings, 'votes': self.votes,
+                                               'revenue': self.revenues, 'metascore': self.metascores})
+
+        self.titles = StringColumn(record.title for record in records)
+        self.descriptions = StringColumn(record.description for record in records)
+        self.title_index = TitleIndex(record.title for record in records)
+        self.actors = NameIndex(record.actors for record in records)
+        self.directors = NameIndex([] if record.director is None else [record.director] for record in records)
+        self.genres = NameIndex((record.genres for record in records), searchable=False)
+        self.genre_bitmaps = GenreBitmaps(len(records), genre_bitmaps(
+            (row, record.genres) for row, record in enumerate(records)))
+        self.text_index = TextIndex()
+        self.text_index.add_many((record.title, record.description) for record in records)
+
+        # Rows ordered by rank, for looking a movie up by its rank.
+        self.rows_by_rank = array('i', sorted(range(len(records)), key=self.ranks.__getitem__))
+        self.sorted_ranks = array('q', (self.ranks[row] for row in self.rows_by_rank))
+
+        # Rows of the movies released in each year (ordered by name), and the sorted distinct release years.
+        rows_by_year = dict()
+        for row, year in enumerate(self.years):
+            if year not in rows_by_year:
+                rows_by_year[year] = array('i')
+            rows_by_year[year].append(row)
+        self.rows_by_year = rows_by_year
+        self.release_years = sorted(rows_by_year)
+
+        # Prefix indexes of titles and names, made by the first call to completions.
+        self._completions = None
+
+    def __len__(self):
+        return len(self.ranks)
+
+    def row_of_rank(self, rank: int):
+        # Returns the row of the movie with rank, or None if there is no such movie.
+        index = bisect_left(self.sorted_ranks, rank)
+        if index < len(self.sorted_ranks) and self.sorted_ranks[index] == rank:
+            return self.rows_by_rank[index]
+        return None
+
+    def record(self, row: int) -> MovieRecord:
+        directors = self.directors.names_of_row(row)
+        return MovieRecord(self.ranks[row], self.titles[row], self.years[row], self.descriptions[row],
+                           directors[0] if len(directors) > 0 else None, self.actors.names_of_row(row),
+                           self.genres.names_of_row(row), self.runtimes[row], self.ratings[row], self.votes[row],
+                           self.revenues[row], self.metascores[row])
+
+    def records(self):
+        return (self.record(row) for row in range(len(self)))
+
+    def completions(self) -> Completions:
+        completions = self._completions
+        if completions is None:
+            with _completions_lock:
+                completions = self._completions
+                if completions is None:
+                    completions = self._completions = Completions(
+                        ((self.titles[row], self.ranks[row]) for row in range(len(self))),
+                        self._names_with_best_ranks(self.directors), self._names_with_best_ranks(self.actors))
+        return completions
+
+    def _names_with_best_ranks(self, index: NameIndex):
+        for name_id in range(len(index)):
+            rows = index.rows[index.row_offsets[name_id]:index.row_offsets[name_id + 1]]
+            yield index.names[name_id], min(self.ranks[row] for row in rows)
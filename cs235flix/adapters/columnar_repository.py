@@ -0,0 +1,315 @@
+import csv
+import os
+import threading
+import time
+import weakref
+from typing import List
+
+from bisect import bisect_left, bisect_right
+
+import cs235flix.adapters.catalog_file as catalog_file
+import cs235flix.adapters.poster_resolver as poster_resolver
+from cs235flix.adapters.bloom_filter import BloomFilter
+from cs235flix.adapters.catalog_snapshot import file_hash
+from cs235flix.adapters.columnar_catalog import ColumnarCatalog, MovieRecord, MISSING, movie_record
+from cs235flix.adapters.memory_repository import MemoryUserData, load_users, read_number
+from cs235flix.adapters.movie_filter import MovieFilter
+from cs235flix.adapters.page_query import EARLIEST_YEAR, MoviePage, PageQuery, movie_page
+from cs235flix.adapters.prefix_index import AUTOCOMPLETE_LIMIT
+from cs235flix.adapters.seed_passwords import HASH
+from cs235flix.domain.model import Actor, Genre, Movie
+
+
+class ColumnarRepository(MemoryUserData):
+    """ In-memory repository for large catalogs, which stores movies column by column in a ColumnarCatalog.
+
+    Movie objects are only made for the movies a caller asks for. They are kept in a weak-valued cache, so that while
+    anything (a page being rendered, a Review, a caller holding on to a Movie it added) still refers to a Movie, the
+    repository hands out that same object. Adding movies rebuilds the whole catalog, so movies are best added in bulk
+    with add_movies, which rebuilds it once. add_movie only appends the movie to a pending segment; the pending movies
+    are merged into the catalog, in a single rebuild, when the movies are next read. The catalog can also be mapped
+    read-only from a catalog file (see catalog_file), in which case additions build a new catalog in memory from the
+    mapped one.
+    """
+
+    def __init__(self, user_filter: BloomFilter = None):
+        super().__init__(user_filter)
+        self._catalog = ColumnarCatalog()
+        self._pending = []
+        self._merge_lock = threading.Lock()
+        self._genres = []
+        self._movies = weakref.WeakValueDictionary()
+        self._catalog_version = 0
+
+    def add_movie(self, movie: Movie):
+        with self._merge_lock:
+            self._pending.append(movie_record(movie))
+            self._movies[movie.rank] = movie
+            self._catalog_version += 1
+
+    def add_movies(self, movies):
+        movies = list(movies)
+        self.add_records(movie_record(movie) for movie in movies)
+        for movie in movies:
+            self._movies[movie.rank] = movie
+
+    def add_records(self, records):
+        with self._merge_lock:
+            self._merge(list(records))
+
+    def _merge(self, records):
+        # Builds a catalog of the current, the pending and the new movies on the side, and only then swaps it in.
+        catalog = ColumnarCatalog.build(list(self._catalog.records()) + self._pending + records)
+        self._genres = [Genre(catalog.genres.names[genre_id]) for genre_id in range(len(catalog.genres))]
+        self._catalog = catalog
+        self._pending = []
+        self._catalog_version += 1
+
+    def _current_catalog(self) -> ColumnarCatalog:
+        # The catalog, with any movies added by add_movie since it was built merged in first.
+        if len(self._pending) > 0:
+            with self._merge_lock:
+                if len(self._pending) > 0:
+                    self._merge([])
+        return self._catalog
+
+    def save_catalog_file(self, path: str, source_hash: str):
+        # Writes the movies to a catalog file at path, recording that they were loaded from data hashing to
+        # source_hash.
+        catalog_file.save_catalog(path, self._current_catalog(), source_hash)
+
+    def map_catalog_file(self, path: str, source_hash: str) -> bool:
+        # Replaces the movies with those of the catalog file at path, read in place from a read-only memory mapping,
+        # if the file was written from the data whose contents hash to source_hash. Returns False, leaving the
+        # repository unchanged, otherwise.
+        catalog = catalog_file.map_catalog(path, source_hash)
+        if catalog is None:
+            return False
+
+        with self._merge_lock:
+            self._genres = [Genre(catalog.genres.names[genre_id]) for genre_id in range(len(catalog.genres))]
+            self._movies = weakref.WeakValueDictionary()
+            self._catalog = catalog
+            self._pending = []
+            self._catalog_version += 1
+        return True
+
+    def _movie(self, catalog: ColumnarCatalog, row: int) -> Movie:
+        # Returns the Movie in row, reusing the Movie object made for it before if that is still in use.
+        rank = catalog.ranks[row]
+        movie = self._movies.get(rank)
+        if movie is None:
+            genres = self._genres
+            directors = catalog.directors.names_of_row(row)
+            movie = Movie(catalog.titles[row], catalog.years[row], rank, catalog.descriptions[row],
+                          directors[0] if len(directors) > 0 else "",
+                          [Actor(name) for name in catalog.actors.names_of_row(row)],
+                          [genres[genre_id] for genre_id in catalog.genres.name_ids[
+                              catalog.genres.name_offsets[row]:catalog.genres.name_offsets[row + 1]]])
+            if catalog.runtimes[row] > 0:
+                movie.runtime_minutes = catalog.runtimes[row]
+            if catalog.ratings[row] == catalog.ratings[row]:
+                movie.rating = catalog.ratings[row]
+            if catalog.votes[row] != MISSING:
+                movie.votes = catalog.votes[row]
+            if catalog.revenues[row] == catalog.revenues[row]:
+                movie.revenue = catalog.revenues[row]
+            if catalog.metascores[row] != MISSING:
+                movie.metascore = catalog.metascores[row]
+            self._movies[rank] = movie
+        return movie
+
+    def _movies_in_rows(self, catalog: ColumnarCatalog, rows) -> List[Movie]:
+        return [self._movie(catalog, row) for row in rows]
+
+    def get_movie(self, rank: int) -> Movie:
+        catalog = self._current_catalog()
+        row = catalog.row_of_rank(rank)
+        if row is None:
+            return None
+        return self._movie(catalog, row)
+
+    def get_movies_by_date(self, target_date: int) -> List[Movie]:
+        catalog = self._current_catalog()
+        return self._movies_in_rows(catalog, catalog.rows_by_year.get(target_date, []))
+
+    def get_first_movie(self):
+        catalog = self._current_catalog()
+        return self._movie(catalog, 0) if len(catalog) > 0 else None
+
+    def get_last_movie(self):
+        catalog = self._current_catalog()
+        return self._movie(catalog, len(catalog) - 1) if len(catalog) > 0 else None
+
+    def get_first_movie_by_date(self):
+        catalog = self._current_catalog()
+        if len(catalog.release_years) == 0:
+            return None
+        return self._movie(catalog, catalog.rows_by_year[catalog.release_years[0]][0])
+
+    def get_last_movie_by_date(self):
+        catalog = self._current_catalog()
+        if len(catalog.release_years) == 0:
+            return None
+        return self._movie(catalog, catalog.rows_by_year[catalog.release_years[-1]][0])
+
+    def get_number_of_movies(self):
+        return len(self._current_catalog())
+
+    def get_movies_by_rank(self, rank_list):
+        catalog = self._current_catalog()
+        rows = (catalog.row_of_rank(rank) for rank in rank_list)
+        return self._movies_in_rows(catalog, [row for row in rows if row is not None])
+
+    def get_date_of_previous_movie(self, movie: Movie):
+        catalog = self._current_catalog()
+        if not self._is_in_catalog(catalog, movie):
+            return None
+
+        index = bisect_left(catalog.release_years, int(movie.release_date))
+        return catalog.release_years[index - 1] if index > 0 else None
+
+    def get_date_of_next_movie(self, movie: Movie):
+        catalog = self._current_catalog()
+        if not self._is_in_catalog(catalog, movie):
+            return None
+
+        index = bisect_right(catalog.release_years, int(movie.release_date))
+        return catalog.release_years[index] if index < len(catalog.release_years) else None
+
+    def _is_in_catalog(self, catalog: ColumnarCatalog, movie: Movie) -> bool:
+        row = catalog.row_of_rank(movie.rank)
+        return row is not None and catalog.years[row] == int(movie.release_date)
+
+    def get_movie_ranks_for_type(self, movies: list):
+        return [int(movie.rank) for movie in movies]
+
+    def get_movie_by_type(self, search: str, type_var: str):
+        catalog = self._current_catalog()
+        rows = []
+
+        if type_var == "actor":
+            rows = catalog.actors.search(search)
+        elif type_var == "director":
+            rows = catalog.directors.search(search)
+        elif type_var == "genres":
+            rows = catalog.genre_bitmaps.slots(search)
+        elif type_var == "movie":
+            rows = catalog.title_index.search(search)
+        elif type_var == "description":
+            rows = [row for row, score in catalog.text_index.search(search)]
+
+        return self._movies_in_rows(catalog, rows)
+
+    def get_number_of_movies_by_genres(self, search: str):
+        return self._current_catalog().genre_bitmaps.count(search)
+
+    def get_movies_by_filter(self, movie_filter: MovieFilter, cursor: int = 0, count: int = None):
+        catalog = self._current_catalog()
+        rows, total = catalog.numeric_columns.select(movie_filter, cursor, count)
+        return self._movies_in_rows(catalog, rows), total
+
+    def get_movie_page(self, query: PageQuery, cursor: int, count: int, username: str = None) -> MoviePage:
+        catalog = self._current_catalog()
+        previous_year = next_year = year = year_counts = None
+        if query.year is not None:
+            years = catalog.release_years
+            year = query.year
+            if year == EARLIEST_YEAR:
+                year = years[0] if len(years) > 0 else None
+            rows = catalog.rows_by_year.get(year, ())
+            total = len(rows)
+            rows = rows[cursor:cursor + count]
+            if total > 0:
+                index = bisect_left(years, year)
+                previous_year = years[index - 1] if index > 0 else None
+                next_year = years[index + 1] if index + 1 < len(years) else None
+            year_counts = {listed_year: len(catalog.rows_by_year[listed_year]) for listed_year in years}
+        else:
+            total = len(query.ranks)
+            rows = (catalog.row_of_rank(rank) for rank in query.ranks[cursor:cursor + count])
+            rows = [row for row in rows if row is not None]
+        movies = self._movies_in_rows(catalog, rows)
+
+        watchlisted = self._watchlisted(username, movies)
+        return movie_page(movies, total, cursor, count, watchlisted, previous_year, next_year, year, year_counts)
+
+    def get_completions(self, prefix: str, search_type: str = None, limit: int = AUTOCOMPLETE_LIMIT):
+        return self._current_catalog().completions().complete(prefix, search_type, limit)
+
+    def build_completions(self):
+        # Builds the prefix indexes of the movies now, rather than when a search is first completed.
+        self._current_catalog().completions()
+
+    def get_catalog_version(self):
+        return self._catalog_version
+
+    def years_list(self):
+        return list(self._current_catalog().release_years)
+
+    def get_posters_by_movies(self, movies):
+        poster_resolver.resolve_posters(movies)
+
+
+def read_movie_records(filename: str):
+    # Reads the movies CSV file straight into MovieRecords, without making a Movie for each row.
+    with open(filename, mode='r', encoding='utf-8-sig') as csvfile:
+        for row in csv.DictReader(csvfile):
+            directors = row['Director'].split(",")
+            yield MovieRecord(
+                rank=int(row['Rank']),
+                title=row['Title'].strip(),
+                year=int(row['Year']),
+                description=row['Description'],
+                director=directors[-1].strip() or None,
+                actors=[actor.strip() for actor in row['Actors'].split(",") if actor.strip() != ""],
+                genres=[genre for genre in row['Genre'].split(",") if genre != ""],
+                runtime=_number(row.get('Runtime (Minutes)'), int, MISSING),
+                rating=_number(row.get('Rating'), float, float('nan')),
+                votes=_number(row.get('Votes'), int, MISSING),
+                revenue=_number(row.get('Revenue (Millions)'), float, float('nan')),
+                metascore=_number(row.get('Metascore'), int, MISSING)
+            )
+
+
+def _number(value: str, number_type, missing):
+    number = read_number(value, number_type)
+    return missing if number is None else number
+
+
+def load_movies(data_path: str, repo: ColumnarRepository, catalog_path: str = None):
+    # With a catalog_path, the movies are mapped from the catalog file there, which is (re)written from the CSV file
+    # first if it is missing or was written from a different version of it. Every process mapping the file shares
+    # one copy of the movies.
+    filename = os.path.join(data_path, "Data1000Movies.csv")
+    if catalog_path is None:
+        repo.add_records(read_movie_records(filename))
+        return
+
+    source_hash = file_hash(filename)
+    if repo.map_catalog_file(catalog_path, source_hash):
+        return
+
+    repo.add_records(read_movie_records(filename))
+    repo.save_catalog_file(catalog_path, source_hash)
+    repo.map_catalog_file(catalog_path, source_hash)
+
+
+def populate(data_path: str, repo: ColumnarRepository, password_mode: str = HASH, catalog_path: str = None):
+    # Returns how long (in seconds) loading the movies and the users took.
+    timings = dict()
+
+    start = time.perf_counter()
+    load_movies(data_path, repo, catalog_path)
+    timings['movies'] = time.perf_counter() - start
+
+    # Build the autocomplete indexes before the first keystroke needs them.
+    start = time.perf_counter()
+    repo.build_completions()
+    timings['completions'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    load_users(data_path, repo, password_mode)
+    timings['users'] = time.perf_counter() - start
+
+    return timings
@@ -1,19 +1,29 @@
 import csv
 import os
+import threading
 
-from datetime import date
 from typing import List
 
-from sqlalchemy import desc, asc
+from sqlalchemy import desc, asc, func, and_, or_, not_, false, exists, select, type_coerce, String
 from sqlalchemy.engine import Engine
-from sqlalchemy.orm.exc import NoResultFound, MultipleResultsFound
-from werkzeug.security import generate_password_hash
+from sqlalchemy.orm.exc import NoResultFound
 
-from sqlalchemy.orm import scoped_session
+from sqlalchemy.orm import aliased, scoped_session
 from flask import _app_ctx_stack
 
 from cs235flix.domain.model import User, Movie, Review
+from cs235flix.adapters import orm
+from cs235flix.adapters.bloom_filter import BloomFilter
+from cs235flix.adapters.genre_index import parse_genre_query
+from cs235flix.adapters.memory_repository import NUMERIC_COLUMNS, read_number
+from cs235flix.adapters.movie_filter import MovieFilter
+from cs235flix.adapters.page_query import EARLIEST_YEAR, MoviePage, PageQuery, movie_page
+from cs235flix.adapters.prefix_index import AUTOCOMPLETE_LIMIT, Completions
 from cs235flix.adapters.repository import AbstractRepository
+from cs235flix.adapters.seed_passwords import seed_password, HASH
+from cs235flix.adapters.text_index import STOP_WORDS, TEXT_SEARCH_LIMIT, tokenize
+from cs235flix.adapters.trigram_index import TrigramIndex, normalize_name, FUZZY_MATCH_LIMIT
+import cs235flix.adapters.poster_resolver as poster_resolver
 
 
 class SessionContextManager:
@@ -50,8 +60,27 @@ class SessionContextManager:
 
 class SqlAlchemyRepository(AbstractRepository):
 
-    def __init__(self, session_factory):
+    def __init__(self, session_factory, user_filter: BloomFilter = None):
         self._session_cm = SessionContextManager(session_factory)
+        self._user_filter = user_filter
+        self._user_filter_loaded = False
+        self._name_columns = {
+            "actor": orm.movies.c.actors,
+            "director": orm.movies.c.director,
+            "movie": orm.movies.c.title
+        }
+        self._numeric_columns = {
+            "rank": orm.movies.c.rank,
+            "year": orm.movies.c.release_date,
+            "runtime": orm.movies.c.runtime_minutes,
+            "rating": orm.movies.c.rating,
+            "votes": orm.movies.c.votes,
+            "revenue": orm.movies.c.revenue,
+            "metascore": orm.movies.c.metascore
+        }
+        self._name_indexes = dict()
+        self._completions = None
+        self._completions_lock = threading.Lock()
 
     def close_session(self):
         self._session_cm.close_current_session()
@@ -63,6 +92,8 @@ class SqlAlchemyRepository(AbstractRepository):
         with self._session_cm as scm:
             scm.session.add(user)
             scm.commit()
+        if self._user_filter is not None:
+            self._user_filter.add(user.username)
 
     def get_user(self, username) -> User:
         user = None
@@ -74,15 +105,40 @@ class SqlAlchemyRepository(AbstractRepository):
 
         return user
 
+    def has_user(self, username) -> bool:
+        if self._user_filter is not None:
+            if not self._user_filter_loaded:
+                for name, in self._session_cm.session.query(orm.users.c.username):
+                    self._user_filter.add(name)
+                self._user_filter_loaded = True
+            if username not in self._user_filter:
+                # The filter has no false negatives, so the database need not be queried for a free name.
+                return False
+        return self._session_cm.session.query(User).filter_by(_username=username).count() > 0
+
+    def update_user_password(self, user: User, password: str):
+        with self._session_cm as scm:
+            user.password = password
+            scm.commit()
+
     def add_movie(self, movie: Movie):
         with self._session_cm as scm:
             scm.session.add(movie)
             scm.commit()
+        self._name_indexes.clear()
+        self._completions = None
 
-    def get_movie(self, id: int) -> Movie:
+    def add_movies(self, movies):
+        with self._session_cm as scm:
+            scm.session.add_all(list(movies))
+            scm.commit()
+        self._name_indexes.clear()
+        self._completions = None
+
+    def get_movie(self, rank: int) -> Movie:
         movie = None
         try:
-            movie = self._session_cm.session.query(Movie).filter(Movie._id == id).one()
+            movie = self._session_cm.session.query(Movie).filter(orm.movies.c.rank == rank).one()
         except NoResultFound:
             # Ignore any exception and return None.
             pass
@@ -95,7 +151,8 @@ class SqlAlchemyRepository(AbstractRepository):
             return movies
         else:
             # Return movies matching target_date; return an empty list if there are no matches.
-            movies = self._session_cm.session.query(Movie).filter(Movie._date == target_date).all()
+            movies = self._session_cm.session.query(Movie).filter(orm.movies.c.release_date == target_date) \
+                .order_by(asc(orm.movies.c.title), asc(orm.movies.c.rank)).all()
             return movies
 
     def get_number_of_movies(self):
@@ -116,89 +173,288 @@ class SqlAlchemyRepository(AbstractRepository):
 
     def get_last_movie_by_date(self):
         movie = self._session_cm.session.query(Movie).order_by(desc(Movie.release_date)).first()
+        return movie
 
     def get_movies_by_rank(self, rank_list):
-        existing_ranks = [rank for rank in rank_list if rank in self._movies_index]
-        movies = []
-        for rank in existing_ranks:
-            movie = self._session_cm.execute('SELECT rank FROM movies WHERE rank = :rank').fetchall()
-            movies.append(movie)
+        rank_list = list(rank_list)
+        movies_by_rank = {movie.rank: movie for movie in self._session_cm.session.query(Movie).filter(
+            orm.movies.c.rank.in_(rank_list)).all()}
 
-        return movies
+        # Ranks in rank_list that don't represent Movie ranks in the repository are left out.
+        return [movies_by_rank[rank] for rank in rank_list if rank in movies_by_rank]
 
     def get_date_of_previous_movie(self, movie: Movie):
-        result = None
-        prev = self._session_cm.session.query(Movie).filter(Movie.release_date < movie.release_date).order_by(desc(Movie.release_date)).first()
-
-        if prev is not None:
-            result = prev.release_date
-
-        return result
+        release_date = orm.movies.c.release_date
+        return self._session_cm.session.query(func.max(release_date)).filter(
+            release_date < int(movie.release_date)).scalar()
 
     def get_date_of_next_movie(self, movie: Movie):
-        result = None
-        next = self._session_cm.session.query(Movie).filter(Movie.release_date > movie.release_date).order_by(asc(Movie.reelase_date)).first()
-
-        if next is not None:
-            result = next.date
-
-        return result
+        release_date = orm.movies.c.release_date
+        return self._session_cm.session.query(func.min(release_date)).filter(
+            release_date > int(movie.release_date)).scalar()
 
     def get_movie_ranks_for_type(self, movies: list):
-        rank_list = []
-
-        for movie in movies:
-            rank = self._session_cm.execute('SELECT rank FROM movies WHERE title = :movie.title').fetchall()
-            rank_list.append(rank)
-
-        return rank_list
+        return [int(movie.rank) for movie in movies]
 
     def get_movie_by_type(self, search: str, type_var: str):
         movies = []
-        search = search.lower()
 
-        if type_var == "actor":
-            movie = self._session_cm.query(Movie).filter(search in Movie.actors).all()
+        if type_var in self._name_columns:
+            column = self._name_columns[type_var]
+            names, fuzzy = self._find_names(type_var, normalize_name(search))
+            if len(names) == 0:
+                return movies
+
+            if fuzzy:
+                # Keep the movies of the closest names first.
+                groups = [[name] for name in names]
+            else:
+                groups = [names]
 
-        elif type_var == "director":
-            movie = self._session_cm.query(Movie).filter(search in Movie.director).all()
-            movies.append(movie)
+            seen = set()
+            for group in groups:
+                for movie in self._movies_with_names(column, type_var, group):
+                    if movie.rank not in seen:
+                        seen.add(movie.rank)
+                        movies.append(movie)
 
         elif type_var == "genres":
-            genres_list = []
-            stripped = []
+            movies = self._genre_query(search).order_by(asc(orm.movies.c.title), asc(orm.movies.c.release_date)).all()
+
+        elif type_var == "description":
+            # Without a full-text index in the database, movies are matched on any word of search, or any of the
+            # stemmed words the text index would match it on, and are not ranked.
+            words = [word for word in search.casefold().split() if word not in STOP_WORDS]
+            terms = set(words).union(*[tokenize(word) for word in words])
+            if len(terms) == 0:
+                return movies
+            columns = [orm.movies.c.title, orm.movies.c.description]
+            criteria = or_(*[func.lower(column).like('%' + term + '%') for term in terms for column in columns])
+            movies = self._session_cm.session.query(Movie).filter(criteria) \
+                .order_by(asc(orm.movies.c.title), asc(orm.movies.c.release_date)).limit(TEXT_SEARCH_LIMIT).all()
 
-            if "," in search:
-                genres_list = search.split(",")
-            else:
-                genres_list.append(search.strip())
+        return movies
 
-            for item in genres_list:
-                stripped.append(item.strip().lower())
+    def _find_names(self, type_var: str, key: str):
+        # Matches search against the distinct names in the database as the memory repository does: exact names, then
+        # the actor and director names having every word of search, then names containing search, then the names most
+        # similar to it. The trigram index over the names, and the names of each word, are built on first use.
+        if type_var not in self._name_indexes:
+            index = TrigramIndex()
+            tokens = dict()
+            # The names are read as stored, rather than as the Director and Actor objects the columns map to.
+            column = type_coerce(self._name_columns[type_var], String)
+            for value, in self._session_cm.session.query(column).distinct():
+                for name in (value.split(",") if type_var == "actor" else [value]):
+                    name = normalize_name(name)
+                    index.add(name)
+                    if type_var != "movie":
+                        for word in name.split():
+                            tokens.setdefault(word, set()).add(name)
+            self._name_indexes[type_var] = (index, tokens)
+
+        index, tokens = self._name_indexes[type_var]
+        if key in index:
+            return [key], False
+
+        words = key.split()
+        if len(words) > 0 and all(word in tokens for word in words):
+            names = set.intersection(*(tokens[word] for word in words))
+            if len(names) > 0:
+                return sorted(names), False
+
+        names = index.substring(key)
+        if len(names) > 0:
+            return names, False
+        return [name for name, similarity in index.fuzzy(key, limit=FUZZY_MATCH_LIMIT)], True
+
+    def _movies_with_names(self, column, type_var: str, names):
+        if type_var == "actor":
+            # Actors are stored as one comma-separated string per movie.
+            criteria = or_(*[func.lower(column).like('%' + name + '%') for name in names])
+        else:
+            criteria = func.lower(column).in_(names)
+        return self._session_cm.session.query(Movie).filter(criteria) \
+            .order_by(asc(orm.movies.c.title), asc(orm.movies.c.release_date)).all()
+
+    def get_number_of_movies_by_genres(self, search: str):
+        return self._genre_query(search).count()
+
+    def get_movies_by_filter(self, movie_filter: MovieFilter, cursor: int = 0, count: int = None):
+        query = self._session_cm.session.query(Movie)
+        for field, (low, high) in movie_filter.ranges.items():
+            column = self._numeric_columns[field]
+            query = query.filter(column.isnot(None))
+            if low is not None:
+                query = query.filter(column >= low)
+            if high is not None:
+                query = query.filter(column <= high)
+        total = query.count()
+
+        order = [asc(orm.movies.c.title), asc(orm.movies.c.release_date)]
+        if movie_filter.sort_by is not None:
+            column = self._numeric_columns[movie_filter.sort_by]
+            # Movies without a value for the field come last, whichever the direction.
+            order = [column.is_(None), desc(column) if movie_filter.descending else asc(column)] + order
+        query = query.order_by(*order).offset(cursor)
+        if count is not None:
+            query = query.limit(count)
+        return query.all(), total
+
+    def get_movie_page(self, query: PageQuery, cursor: int, count: int, username: str = None) -> MoviePage:
+        # Every page is a single query. A page of a year outer joins the number of movies of each year with the page
+        # of the year's movies, so that the year's total and neighbouring years come back in the same rows as its
+        # movies. Each movie comes with whether it is in the user's watchlist.
+        session = self._session_cm.session
+        if query.year is None:
+            page_ranks = list(query.ranks[cursor:cursor + count])
+            rows = session.query(Movie, self._watchlisted(orm.movies.c.rank, username)) \
+                .filter(orm.movies.c.rank.in_(page_ranks)).all()
+            movies_by_rank = {movie.rank: (movie, in_watchlist) for movie, in_watchlist in rows}
+            movies = [movies_by_rank[rank][0] for rank in page_ranks if rank in movies_by_rank]
+            watchlisted = set(rank for rank, (movie, in_watchlist) in movies_by_rank.items() if in_watchlist)
+            return movie_page(movies, len(query.ranks), cursor, count, watchlisted)
+
+        release_date = orm.movies.c.release_date
+        target_year = query.year
+        if target_year == EARLIEST_YEAR:
+            target_year = select([func.min(release_date)]).as_scalar()
+        year_counts = select([release_date.label('year'), func.count().label('total')]) \
+            .group_by(release_date).alias('year_counts')
+        page = orm.movies.select().where(release_date == target_year) \
+            .order_by(asc(orm.movies.c.title), asc(orm.movies.c.rank)).offset(cursor).limit(count).alias('page')
+        page_movie = aliased(Movie, page)
+        rows = session.query(year_counts.c.year, year_counts.c.total, page_movie,
+                             self._watchlisted(page.c.rank, username)) \
+            .select_from(year_counts).outerjoin(page_movie, page.c.release_date == year_counts.c.year) \
+            .order_by(year_counts.c.year, page.c.title, page.c.rank).all()
+
+        year_counts = dict()
+        movies = []
+        watchlisted = set()
+        for listed_year, total, movie, in_watchlist in rows:
+            year_counts[int(listed_year)] = total
+            if movie is not None:
+                movies.append(movie)
+                if in_watchlist:
+                    watchlisted.add(movie.rank)
+
+        years = list(year_counts)
+        year = query.year
+        if year == EARLIEST_YEAR:
+            year = years[0] if len(years) > 0 else None
+        total = year_counts.get(year, 0)
+        previous_year = next_year = None
+        if total > 0:
+            index = years.index(year)
+            previous_year = years[index - 1] if index > 0 else None
+            next_year = years[index + 1] if index + 1 < len(years) else None
+        return movie_page(movies, total, cursor, count, watchlisted, previous_year, next_year, year, year_counts)
+
+    def _watchlisted(self, rank_column, username: str):
+        # Whether the movie with the rank in rank_column is in the watchlist of the user named username.
+        if username is None:
+            return false().label('watchlisted')
+        return exists().where(and_(orm.watchlists.c.username == username,
+                                   orm.watchlists.c.movie_rank == rank_column)).label('watchlisted')
+
+    def get_completions(self, prefix: str, search_type: str = None, limit: int = AUTOCOMPLETE_LIMIT):
+        # Completions are looked up in prefix indexes held in memory, built from the movies table on first use. The
+        # lock makes concurrent first completions wait for a single build. Movies are read in the memory repository's
+        # order, so that names of movies with the same rank are completed in the same order.
+        completions = self._completions
+        if completions is None:
+            with self._completions_lock:
+                completions = self._completions
+                if completions is None:
+                    rows = self._session_cm.session.query(
+                        orm.movies.c.title, type_coerce(orm.movies.c.director, String),
+                        type_coerce(orm.movies.c.actors, String), orm.movies.c.rank) \
+                        .order_by(asc(orm.movies.c.title), asc(orm.movies.c.release_date)).all()
+                    completions = self._completions = Completions(
+                        ((title, rank) for title, director, actors, rank in rows),
+                        ((director, rank) for title, director, actors, rank in rows),
+                        ((actor.strip(), rank) for title, director, actors, rank in rows
+                         for actor in actors.split(",")))
+        return completions.complete(prefix, search_type, limit)
+
+    def get_catalog_version(self):
+        # Movies are only ever added, so their number identifies the version, including for movies added by other
+        # processes sharing the database.
+        return self.get_number_of_movies()
+
+    def _genre_query(self, search: str):
+        terms = parse_genre_query(search)
+        if len(terms) == 0:
+            return self._session_cm.session.query(Movie).filter(false())
+
+        query = self._session_cm.session.query(Movie)
+        for negated, alternatives in terms:
+            criteria = or_(*[func.lower(orm.movies.c.genres).like('%' + genre + '%') for genre in alternatives])
+            query = query.filter(not_(criteria) if negated else criteria)
+        return query
+
+    def add_review(self, review: Review):
+        super().add_review(review)
+        with self._session_cm as scm:
+            scm.session.add(review)
+            scm.commit()
 
-            for genre in stripped:
-                movie = self._session_cm.query(Movie).filter(genre in Movie.genres).all()
+    def get_reviews(self):
+        return self._session_cm.session.query(Review).all()
 
-        elif type_var == "movie":
-            movie = self._session_cm.query(Movie).filter(search == Movie.title).all()
+    def add_to_watchlist(self, username: str, movie: Movie):
+        if self.check_if_added(username, movie.rank):
+            return
+        with self._session_cm as scm:
+            scm.session.execute(orm.watchlists.insert().values(username=username, movie_rank=movie.rank))
+            scm.commit()
 
+    def remove_from_watchlist(self, username: str, movie: Movie):
+        with self._session_cm as scm:
+            scm.session.execute(orm.watchlists.delete().where(and_(orm.watchlists.c.username == username,
+                                                                   orm.watchlists.c.movie_rank == movie.rank)))
+            scm.commit()
 
-def movie_record_generator(filename: str):
-    with open(filename, mode='r', encoding='utf-8-sig') as infile:
-        reader = csv.reader(infile)
+    def get_movie_watchlist(self, username: str, cursor: int = 0, count: int = None):
+        query = self._session_cm.session.query(Movie) \
+            .join(orm.watchlists, orm.watchlists.c.movie_rank == orm.movies.c.rank) \
+            .filter(orm.watchlists.c.username == username).order_by(orm.watchlists.c.id).offset(cursor)
+        if count is not None:
+            query = query.limit(count)
+        return query.all()
 
-        # Read first line of the CSV file.
-        headers = next(reader)
+    def get_watchlist_size(self, username: str):
+        return self._session_cm.session.query(orm.watchlists).filter(orm.watchlists.c.username == username).count()
 
-        # Read remaining rows from the CSV file.
-        for row in reader:
-            movie_data = row
-            movie_key = movie_data[0]
+    def check_if_added(self, username: str, movie_rank: int):
+        return len(self.check_if_added_many(username, [movie_rank])) > 0
 
-            # Strip any leading/trailing white space from data read.
-            movie_data = [item.strip() for item in movie_data]
+    def check_if_added_many(self, username: str, movie_ranks):
+        rows = self._session_cm.session.query(orm.watchlists.c.movie_rank).filter(and_(
+            orm.watchlists.c.username == username, orm.watchlists.c.movie_rank.in_(list(movie_ranks)))).all()
+        return set(rank for rank, in rows)
 
-            yield movie_data
+    def years_list(self):
+        release_date = orm.movies.c.release_date
+        return [int(year) for year, in self._session_cm.session.query(release_date).distinct()
+                .order_by(release_date).all()]
+
+    def get_posters_by_movies(self, movies):
+        poster_resolver.resolve_posters(movies)
+
+
+def movie_record_generator(filename: str):
+    # Yields the values of each movie in the CSV file, in the order of the columns of the movies table. The rank is
+    # also the movie's id, and numbers missing from a row (e.g. an unknown revenue) are NULL.
+    with open(filename, mode='r', encoding='utf-8-sig') as infile:
+        for row in csv.DictReader(infile):
+            row = {column: value.strip() for column, value in row.items()}
+            directors = row['Director'].split(",")
+            actors = [actor.strip() for actor in row['Actors'].split(",")]
+            yield [int(row['Rank']), row['Title'], int(row['Year']), int(row['Rank']), row['Description'],
+                   directors[-1].strip(), ",".join(actors), row['Genre']] + \
+                [read_number(row.get(column), number_type) for field, column, number_type in NUMERIC_COLUMNS]
 
 
 def generic_generator(filename, post_process=None):
@@ -218,26 +474,28 @@ def generic_generator(filename, post_process=None):
             yield row
 
 
-def process_user(user_row):
-    user_row[2] = generate_password_hash(user_row[2])
+def process_user(user_row, password_mode: str = HASH):
+    user_row[1] = seed_password(user_row[1], password_mode)
     return user_row
 
 
-def populate(engine: Engine, data_path: str):
+def populate(engine: Engine, data_path: str, password_mode: str = HASH):
     conn = engine.raw_connection()
     cursor = conn.cursor()
 
     insert_movies = """
         INSERT INTO movies (
-        id, title, release_date, rank, description, director, actors, genres)
-        VALUES (?, ?, ?, ?, ?, ?, ?)"""
+        id, title, release_date, rank, description, director, actors, genres, runtime_minutes, rating, votes,
+        revenue, metascore)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"""
     cursor.executemany(insert_movies, movie_record_generator(os.path.join(data_path, 'Data1000Movies.csv')))
 
     insert_users = """
         INSERT INTO users(
-        id, username, password)
-        VALUES (?, ?, ?)"""
-    cursor.executemany(insert_users, generic_generator(os.path.join(data_path, 'users.csv'), process_user()))
+        username, password)
+        VALUES (?, ?)"""
+    cursor.executemany(insert_users, generic_generator(os.path.join(data_path, 'users.csv'),
+                                                       lambda row: process_user(row, password_mode)))
 
     conn.commit()
     conn.close()
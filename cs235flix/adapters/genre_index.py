@@ -0,0 +1,161 @@
+from cs235flix.adapters.trigram_index import normalize_name
+
+
+def parse_genre_query(search: str):
+    """ Splits a genre search into its terms.
+
+    Comma-separated terms must all match (AND), "|" separates alternatives within a term (OR), and a term starting
+    with "-" must not match (NOT), e.g. "Action, Comedy|Drama, -Horror". Returns a list of (negated, alternatives)
+    pairs, with the alternatives normalized; empty terms are left out.
+    """
+    terms = []
+    for term in search.split(","):
+        term = term.strip()
+        negated = term.startswith("-")
+        if negated:
+            term = term[1:]
+
+        alternatives = [normalize_name(alternative) for alternative in term.split("|")]
+        alternatives = [alternative for alternative in alternatives if alternative != ""]
+        if len(alternatives) > 0:
+            terms.append((negated, alternatives))
+    return terms
+
+
+# The positions of the set bits of every byte value.
+_BYTE_BITS = [tuple(bit for bit in range(8) if byte & (1 << bit)) for byte in range(256)]
+
+
+def genre_bitmaps(slots_with_genres) -> dict:
+    # Returns the bitmap of each genre, keyed by its normalized name, from (slot, genre_names) pairs. The bits of each
+    # genre are set in a bytearray and turned into an int once, rather than growing an int by one bit per slot.
+    bits = dict()
+    keys = dict()
+    for slot, genre_names in slots_with_genres:
+        for name in genre_names:
+            key = keys.get(name)
+            if key is None:
+                key = keys[name] = normalize_name(name)
+            genre_bits = bits.get(key)
+            if genre_bits is None:
+                genre_bits = bits[key] = bytearray()
+            if len(genre_bits) <= slot >> 3:
+                genre_bits.extend(bytes((slot >> 3) + 1 - len(genre_bits)))
+            genre_bits[slot >> 3] |= 1 << (slot & 7)
+
+    return {key: int.from_bytes(genre_bits, 'little') for key, genre_bits in bits.items()}
+
+
+class GenreBitmaps:
+    """ Bitmaps of the slots (numbered from 0) in each genre.
+
+    Each genre keeps a Python int whose bit n is set when slot n has that genre. Combining genres is then a bitwise AND,
+    OR or AND NOT of a few ints, and counting the matches is a popcount, rather than a pass over every slot.
+    """
+
+    def __init__(self, size: int = 0, bitmaps: dict = None):
+        self._size = size
+        self._bitmaps = dict() if bitmaps is None else bitmaps
+
+    def __len__(self):
+        return self._size
+
+    def genres(self):
+        return list(self._bitmaps)
+
+    def bitmaps(self) -> dict:
+        # The bitmap of each genre, keyed by its normalized name.
+        return dict(self._bitmaps)
+
+    def bitmap(self, search: str) -> int:
+        # Returns the bitmap of the slots matching search. A genre name matches exactly or, failing that, as part of
+        # a longer genre name (e.g. "sci" for "sci-fi").
+        terms = parse_genre_query(search)
+        if len(terms) == 0:
+            return 0
+
+        bitmap = (1 << len(self)) - 1
+        for negated, alternatives in terms:
+            term_bitmap = 0
+            for alternative in alternatives:
+                term_bitmap |= self._genre_bitmap(alternative)
+
+            if negated:
+                bitmap &= ~term_bitmap
+            else:
+                bitmap &= term_bitmap
+        return bitmap
+
+    def slots(self, search: str):
+        # Returns the matching slots in ascending order. The bitmap is converted to bytes once and only its non-zero
+        # bytes are looked at, as each operation on a large int would copy all of it.
+        slots = []
+        bitmap = self.bitmap(search)
+        for index, byte in enumerate(bitmap.to_bytes((bitmap.bit_length() + 7) // 8, 'little')):
+            if byte:
+                slot = index << 3
+                for bit in _BYTE_BITS[byte]:
+                    slots.append(slot + bit)
+        return slots
+
+    def count(self, search: str) -> int:
+        return bin(self.bitmap(search)).count("1")
+
+    def _genre_bitmap(self, key: str) -> int:
+        if key in self._bitmaps:
+            return self._bitmaps[key]
+
+        bitmap = 0
+        for name, genre_bitmap in self._bitmaps.items():
+            if key in name:
+                bitmap |= genre_bitmap
+        return bitmap
+
+
+class GenreIndex(GenreBitmaps):
+    """ Bitmaps of the movies in each genre.
+
+    Every movie added gets the next slot, so the movies matching a genre search are found from the bitmaps of its
+    genres.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._movies = list()
+        self._slots = dict()
+
+    def __len__(self):
+        return len(self._movies)
+
+    def add(self, movie, genre_names):
+        slot = self._slot(movie)
+        for name in genre_names:
+            key = normalize_name(name)
+            self._bitmaps[key] = self._bitmaps.get(key, 0) | (1 << slot)
+
+    def add_many(self, movies_with_genres):
+        # Adds (movie, genre_names) pairs, setting the bits of each genre's bitmap all at once.
+        bitmaps = genre_bitmaps((self._slot(movie), genre_names) for movie, genre_names in movies_with_genres)
+        for key, bitmap in bitmaps.items():
+            self._bitmaps[key] = self._bitmaps.get(key, 0) | bitmap
+
+    def _slot(self, movie) -> int:
+        slot = self._slots.get(id(movie))
+        if slot is None:
+            slot = self._slots[id(movie)] = len(self._movies)
+            self._movies.append(movie)
+        return slot
+
+    def __getstate__(self):
+        # Slots are looked up by object id, which does not survive pickling, so they are rebuilt on unpickling.
+        return {'movies': self._movies, 'bitmaps': self._bitmaps}
+
+    def __setstate__(self, state):
+        self._size = 0
+        self._movies = state['movies']
+        self._bitmaps = state['bitmaps']
+        self._slots = {id(movie): slot for slot, movie in enumerate(self._movies)}
+
+    def movies(self, search: str):
+        # Returns the matching movies in the order they were added.
+        return [self._movies[slot] for slot in self.slots(search)]
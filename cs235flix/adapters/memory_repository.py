@@ -1,40 +1,42 @@
 import csv
 import os
+import time
 from typing import List
-import omdb
 
-from bisect import bisect_left, insort_left
-
-from werkzeug.security import generate_password_hash
+from bisect import bisect_left, bisect_right
 
+import cs235flix.adapters.catalog_snapshot as catalog_snapshot
+import cs235flix.adapters.poster_resolver as poster_resolver
+from cs235flix.adapters.bloom_filter import BloomFilter
+from cs235flix.adapters.movie_catalog import MovieCatalog, movie_sort_key
+from cs235flix.adapters.movie_filter import MovieFilter
+from cs235flix.adapters.page_query import EARLIEST_YEAR, MoviePage, PageQuery, movie_page
+from cs235flix.adapters.prefix_index import AUTOCOMPLETE_LIMIT
 from cs235flix.adapters.repository import AbstractRepository
+from cs235flix.adapters.seed_passwords import seed_password, HASH
+from cs235flix.adapters.trigram_index import TrigramIndex, normalize_name, FUZZY_MATCH_LIMIT
+from cs235flix.adapters.watchlist_store import WatchlistStore
 from cs235flix.domain.model import Actor, Genre, Director, Movie, User, Review
 
 
-def get_poster(movie: str):
-    # Set OMDB API key
-    omdb.set_default("apikey", "1454b6c1")
-    movies_list = omdb.search_movie(movie)
+def normalize_username(username: str) -> str:
+    # Usernames are unique regardless of case.
+    return str(username).casefold()
 
-    # Get poster
-    if len(movies_list) != 0:
-        poster = movies_list[0]["poster"]
-        return poster
-    else:
-        return None
 
+class MemoryUserData(AbstractRepository):
+    """ The users, reviews and watchlists of the repositories that hold everything in memory.
 
-class MemoryRepository(AbstractRepository):
-    # Movies ordered by name.
+    Users are looked up regardless of the case of their name, and user_filter, if given, answers most lookups of
+    names that were never added without touching the users. Watchlisted movies are fetched with get_movies_by_rank.
+    """
 
-    def __init__(self):
-        self._movies = list()
-        self._movies_index = dict()
-        self._search = ""
+    def __init__(self, user_filter: BloomFilter = None):
         self._users = list()
+        self._users_by_name = dict()
+        self._user_filter = user_filter
         self._reviews = list()
-        self._watchlist = list()
-        self._years = list()
+        self._watchlists = WatchlistStore()
 
     @property
     def users(self):
@@ -42,23 +44,98 @@ class MemoryRepository(AbstractRepository):
 
     def add_user(self, user: User):
         self._users.append(user)
+        key = normalize_username(user.username)
+        self._users_by_name[key] = user
+        if self._user_filter is not None:
+            self._user_filter.add(key)
 
     def get_user(self, username) -> User:
-        return next((user for user in self._users if user.username == username), None)
+        return self._users_by_name.get(normalize_username(username))
+
+    def has_user(self, username) -> bool:
+        key = normalize_username(username)
+        if self._user_filter is not None and key not in self._user_filter:
+            # The filter has no false negatives, so a name it has never seen is certainly free.
+            return False
+        return key in self._users_by_name
+
+    def update_user_password(self, user: User, password: str):
+        user.password = password
+
+    def add_review(self, review: Review):
+        super().add_review(review)
+        self._reviews.append(review)
+
+    def get_reviews(self):
+        return self._reviews
+
+    def add_to_watchlist(self, username: str, movie: Movie):
+        self._watchlists.add(normalize_username(username), movie.rank)
+
+    def remove_from_watchlist(self, username: str, movie: Movie):
+        self._watchlists.remove(normalize_username(username), movie.rank)
+
+    def get_movie_watchlist(self, username: str, cursor: int = 0, count: int = None):
+        return self.get_movies_by_rank(self._watchlists.ranks(normalize_username(username), cursor, count))
+
+    def get_watchlist_size(self, username: str):
+        return self._watchlists.size(normalize_username(username))
+
+    def check_if_added(self, username: str, movie_rank: int):
+        return self._watchlists.contains(normalize_username(username), movie_rank)
+
+    def check_if_added_many(self, username: str, movie_ranks):
+        return self._watchlists.contains_many(normalize_username(username), movie_ranks)
+
+    def _watchlisted(self, username: str, movies) -> set:
+        # The ranks of the movies in username's watchlist, for a page of movies.
+        if username is None:
+            return set()
+        return self._watchlists.contains_many(normalize_username(username), [movie.rank for movie in movies])
+
+
+class MemoryRepository(MemoryUserData):
+    # Movies ordered by name.
+
+    def __init__(self, user_filter: BloomFilter = None):
+        super().__init__(user_filter)
+        self._catalog = MovieCatalog()
+        self._catalog_version = 0
 
     @property
     def get_index(self):
-        return self._movies_index
+        return self._catalog.movies_by_rank
 
     def add_movie(self, movie: Movie):
-        insort_left(self._movies, movie)
-        self._movies_index[movie.rank] = movie
+        self._catalog.add(movie)
+        self._catalog_version += 1
+
+    def add_movies(self, movies):
+        # Build a catalog of the current and the new movies on the side, and only then swap it in, so that readers see
+        # either the old catalog or the complete new one.
+        self._catalog = MovieCatalog.build(self._catalog.movies + list(movies))
+        self._catalog_version += 1
+
+    def save_snapshot(self, path: str, source_hash: str):
+        # Writes the movies and every index over them to path, for the data file whose contents hash to source_hash.
+        catalog_snapshot.save_snapshot(path, self._catalog, source_hash)
+
+    def load_snapshot(self, path: str, source_hash: str) -> bool:
+        # Replaces the movies and their indexes with those saved at path, if the snapshot there was taken from the
+        # data file whose contents hash to source_hash. Returns False, leaving the repository unchanged, otherwise.
+        catalog = catalog_snapshot.load_snapshot(path, source_hash)
+        if catalog is None:
+            return False
+
+        self._catalog = catalog
+        self._catalog_version += 1
+        return True
 
     def get_movie(self, rank: int) -> Movie:
         movie = None
 
         try:
-            movie = self._movies_index[rank]
+            movie = self._catalog.movies_by_rank[rank]
         except KeyError:
             # Ignore exception and return None
             pass
@@ -66,103 +143,85 @@ class MemoryRepository(AbstractRepository):
         return movie
 
     def get_movies_by_date(self, target_date: int) -> List[Movie]:
-        matching_movies = list()
-
-        for m in self._movies:
-            if int(m.release_date) == target_date:
-                matching_movies.append(m)
-
-        return matching_movies
+        return list(self._catalog.movies_by_year.get(target_date, []))
 
     def get_first_movie(self):
         movie = None
+        movies = self._catalog.movies
 
-        if len(self._movies) > 0:
-            movie = self._movies[0]
+        if len(movies) > 0:
+            movie = movies[0]
         return movie
 
     def get_last_movie(self):
         movie = None
+        movies = self._catalog.movies
 
-        if len(self._movies) > 0:
-            movie = self._movies[-1]
+        if len(movies) > 0:
+            movie = movies[-1]
         return movie
 
     def get_first_movie_by_date(self):
         first_movie = None
-        current_year = 3000
-
-        for m in self._movies:
-            if int(m.release_date) < current_year:
-                current_year = int(m.release_date)
-                first_movie = m
+        catalog = self._catalog
 
+        if len(catalog.years) > 0:
+            first_movie = catalog.movies_by_year[catalog.years[0]][0]
         return first_movie
 
     def get_last_movie_by_date(self):
         last_movie = None
-        current_year = 0
-
-        for m in self._movies:
-            if int(m.release_date) > current_year:
-                current_year = int(m.release_date)
-                last_movie = m
+        catalog = self._catalog
 
+        if len(catalog.years) > 0:
+            last_movie = catalog.movies_by_year[catalog.years[-1]][0]
         return last_movie
 
     def get_number_of_movies(self):
-        return len(self._movies)
+        return len(self._catalog.movies)
 
     def get_movies_by_rank(self, rank_list):
+        movies_by_rank = self._catalog.movies_by_rank
+
         # Strip out any ranks in rank_list that don't represent Movie ranks in the repository.
-        existing_ranks = [rank for rank in rank_list if rank in self._movies_index]
+        existing_ranks = [rank for rank in rank_list if rank in movies_by_rank]
 
         # Fetch the movies.
-        movies = [self._movies_index[rank] for rank in existing_ranks]
+        movies = [movies_by_rank[rank] for rank in existing_ranks]
         return movies
 
     def get_date_of_previous_movie(self, movie: Movie):
         previous_date = None
-        current_date = 0
-
-        try:
-            index = self.movie_index(movie)
-            for stored_movie in reversed(self._movies):
-                if int(movie.release_date) > int(stored_movie.release_date) > int(current_date):
-                    previous_date = stored_movie.release_date
-                    current_date = stored_movie.release_date
-        except ValueError:
-            # No earlier movies, so return None
-            pass
+        catalog = self._catalog
 
-        if previous_date is not None:
-            return int(previous_date)
+        if self.is_indexed_by_year(movie, catalog):
+            index = bisect_left(catalog.years, int(movie.release_date))
+            if index > 0:
+                previous_date = catalog.years[index - 1]
         return previous_date
 
     def get_date_of_next_movie(self, movie: Movie):
         next_date = None
-        current_date = 2020
-
-        try:
-            index = self.movie_index(movie)
-            for stored_movie in self._movies:
-                if int(current_date) > int(stored_movie.release_date) > int(movie.release_date):
-                    current_date = stored_movie.release_date
-
-                if int(movie.release_date) < int(stored_movie.release_date) <= int(current_date):
-                    next_date = stored_movie.release_date
-        except ValueError:
-            # No subsequent movies, so return None.
-            pass
+        catalog = self._catalog
 
-        if next_date is not None:
-            return int(next_date)
+        if self.is_indexed_by_year(movie, catalog):
+            index = bisect_right(catalog.years, int(movie.release_date))
+            if index < len(catalog.years):
+                next_date = catalog.years[index]
         return next_date
 
+    # Helper method to check that movie is stored in the year index.
+    def is_indexed_by_year(self, movie: Movie, catalog: MovieCatalog = None):
+        catalog = catalog or self._catalog
+        year_movies = catalog.movies_by_year.get(int(movie.release_date), [])
+        index = bisect_left(year_movies, movie)
+        return index != len(year_movies) and year_movies[index].title == movie.title
+
     # Helper method to return movie index.
     def movie_index(self, movie: Movie):
-        index = bisect_left(self._movies, movie)
-        if index != len(self._movies) and self._movies[index].release_date == movie.release_date:
+        movies = self._catalog.movies
+        index = bisect_left(movies, movie)
+        if index != len(movies) and movies[index].release_date == movie.release_date:
             return index
         raise ValueError
 
@@ -176,96 +235,161 @@ class MemoryRepository(AbstractRepository):
 
     def get_movie_by_type(self, search: str, type_var: str):
         movies = []
-        search = search.lower()
+        catalog = self._catalog
 
         if type_var == "actor":
-            for movie in self._movies:
-                for actor in movie.actors:
-                    if search in str(actor).lower():
-                        movies.append(movie)
+            movies = self._search_names(catalog.movies_by_actor, catalog.actor_tokens, catalog.actor_trigrams, search)
 
         elif type_var == "director":
-            for movie in self._movies:
-                if search in str(movie.director).lower():
-                    movies.append(movie)
+            movies = self._search_names(catalog.movies_by_director, catalog.director_tokens,
+                                        catalog.director_trigrams, search)
 
         elif type_var == "genres":
-            genres_list = []
-            stripped = []
+            movies = catalog.genre_index.movies(search)
+            movies.sort(key=movie_sort_key)
 
-            if "," in search:
-                genres_list = search.split(",")
-            else:
-                genres_list.append(search.strip())
+        elif type_var == "movie":
+            movies = self._search_names(catalog.movies_by_title, dict(), catalog.title_trigrams, search)
 
-            for item in genres_list:
-                stripped.append(item.strip().lower())
+        elif type_var == "description":
+            movies = catalog.text_index.movies(search)
 
-            for movie in self._movies:
-                add = True
-                for genre in stripped:
-                    if genre not in str(movie.genres).lower():
-                        add = False
+        return movies
 
-                if add:
-                    movies.append(movie)
+    def _search_names(self, index: dict, tokens: dict, trigram_index: TrigramIndex, search: str):
+        # An exact name is a single dictionary hit, as is a query made of whole words from a name (e.g. "pratt").
+        # Anything else, such as a partial word, is matched as a substring of the names via the trigram index.
+        key = normalize_name(search)
+        if key in index:
+            return list(index[key])
+
+        words = key.split()
+        if len(words) > 0 and all(word in tokens for word in words):
+            names = set.intersection(*(tokens[word] for word in words))
+            if len(names) > 0:
+                return self._movies_for_keys(index, names)
+
+        names = trigram_index.substring(key)
+        if len(names) > 0:
+            return self._movies_for_keys(index, names)
+
+        # Nothing contains the query, so fall back to the names that look most like it, to tolerate typos such as
+        # "chirs prat". Movies are ordered by how closely their name matched.
+        movies = dict()
+        for name, similarity in trigram_index.fuzzy(key, limit=FUZZY_MATCH_LIMIT):
+            for movie in index[name]:
+                movies.setdefault(id(movie), movie)
+        return list(movies.values())
+
+    def _movies_for_keys(self, index: dict, keys):
+        # Returns the movies listed under any of keys, without duplicates and ordered by name.
+        keys = list(keys)
+        if len(keys) == 1:
+            return list(index[keys[0]])
+
+        movies = dict()
+        for key in keys:
+            for movie in index[key]:
+                movies[id(movie)] = movie
+        return sorted(movies.values(), key=movie_sort_key)
+
+    def get_number_of_movies_by_genres(self, search: str):
+        return self._catalog.genre_index.count(search)
+
+    def get_movies_by_filter(self, movie_filter: MovieFilter, cursor: int = 0, count: int = None):
+        catalog = self._catalog
+        positions, total = catalog.numeric_columns().select(movie_filter, cursor, count)
+        return [catalog.movies[position] for position in positions], total
+
+    def get_movie_page(self, query: PageQuery, cursor: int, count: int, username: str = None) -> MoviePage:
+        catalog = self._catalog
+        previous_year = next_year = year = year_counts = None
+        if query.year is not None:
+            year = query.year
+            if year == EARLIEST_YEAR:
+                year = catalog.years[0] if len(catalog.years) > 0 else None
+            movies = catalog.movies_by_year.get(year, [])
+            total = len(movies)
+            movies = movies[cursor:cursor + count]
+            navigation = catalog.year_navigation.get(year)
+            if navigation is not None:
+                previous_year, next_year = navigation['previous_year'], navigation['next_year']
+            year_counts = {listed_year: catalog.year_navigation[listed_year]['count'] for listed_year in catalog.years}
+        else:
+            movies_by_rank = catalog.movies_by_rank
+            total = len(query.ranks)
+            movies = [movies_by_rank[rank] for rank in query.ranks[cursor:cursor + count] if rank in movies_by_rank]
+
+        watchlisted = self._watchlisted(username, movies)
+        return movie_page(movies, total, cursor, count, watchlisted, previous_year, next_year, year, year_counts)
+
+    def get_completions(self, prefix: str, search_type: str = None, limit: int = AUTOCOMPLETE_LIMIT):
+        return self._catalog.completions().complete(prefix, search_type, limit)
+
+    def build_completions(self):
+        # Builds the prefix indexes of the movies now, rather than when a search is first completed.
+        self._catalog.completions()
+
+    def get_catalog_version(self):
+        return self._catalog_version
 
-        elif type_var == "movie":
-            for movie in self._movies:
-                if search.strip() == str(movie.title).lower():
-                    movies.append(movie)
+    def years_list(self):
+        return list(self._catalog.years)
 
-        return movies
+    def get_posters_by_movies(self, movies):
+        poster_resolver.resolve_posters(movies)
 
-    def set_search(self, search: str):
-        self._search = search
 
-    def get_search(self):
-        return self._search
+class InternTable:
+    """ Hands out a single shared instance per name.
 
-    def add_review(self, review: Review):
-        super().add_review(review)
-        self._reviews.append(review)
+    Names are normalized before lookup, so "Chris Pratt" and "chris  pratt" share the instance created for whichever
+    was seen first. Entities are kept in the order they were first seen.
+    """
 
-    def get_reviews(self):
-        return self._reviews
+    def __init__(self, factory):
+        self._factory = factory
+        self._entities = dict()
 
-    def add_to_watchlist(self, movie: Movie):
-        if movie not in self._watchlist:
-            self._watchlist.append(movie)
+    def __len__(self):
+        return len(self._entities)
 
-    def get_movie_watchlist(self):
-        return self._watchlist
+    def intern(self, name: str):
+        key = normalize_name(name)
+        entity = self._entities.get(key)
+        if entity is None:
+            entity = self._entities[key] = self._factory(name)
+        return entity
 
-    def check_if_added(self, movie_rank: int):
-        for movie in self._watchlist:
-            if movie.rank == movie_rank:
-                return True
+    def values(self):
+        return list(self._entities.values())
 
-        return False
 
-    def years_list(self):
-        years_list = []
-        for movie in self._movies:
-            if int(movie.release_date) not in years_list:
-                years_list.append(int(movie.release_date))
+# Movie attributes read from numeric columns of the movies CSV file, with the column they are read from.
+NUMERIC_COLUMNS = [
+    ('runtime_minutes', 'Runtime (Minutes)', int),
+    ('rating', 'Rating', float),
+    ('votes', 'Votes', int),
+    ('revenue', 'Revenue (Millions)', float),
+    ('metascore', 'Metascore', int)
+]
 
-        years_list.sort()
-        return years_list
 
-    def get_posters_by_movies(self, movies):
-        for movie in movies:
-            poster = get_poster(movie['title'])
-            movie['poster'] = poster
+def read_number(value: str, number_type):
+    # Returns value converted to number_type, or None if it is empty or not a number.
+    try:
+        return number_type(value)
+    except (TypeError, ValueError):
+        return None
 
 
 class MovieFileCSVReader:
     def __init__(self, file_name: str):
         self.__file_name = file_name
         self._dataset_of_movies = []
-        self._dataset_of_actors = []
-        self._dataset_of_directors = []
-        self._dataset_of_genres = []
+        self._actors = InternTable(Actor)
+        self._directors = InternTable(Director)
+        self._genres = InternTable(Genre)
         self._dataset_of_descriptions = []
 
     def read_csv_file(self):
@@ -282,29 +406,30 @@ class MovieFileCSVReader:
                 add_genres = []
                 add_director = ""
 
+                # Every movie with the same actor, director or genre shares one instance of it.
                 actors_list = row['Actors'].split(",")
                 for a in actors_list:
-                    actor = a.strip()
-                    add_actor = Actor(actor)
-                    if add_actor not in self._dataset_of_actors:
-                        self._dataset_of_actors.append(add_actor)
-                    add_actors.append(add_actor)
+                    add_actors.append(self._actors.intern(a.strip()))
 
                 directors_list = row['Director'].split(",")
                 for d in directors_list:
-                    add_director = Director(d)
-                    if add_director not in self._dataset_of_directors:
-                        self._dataset_of_directors.append(add_director)
-                    add_director = d
+                    add_director = self._directors.intern(d)
 
                 genre_list = row['Genre'].split(",")
                 for g in genre_list:
-                    add_genre = Genre(g)
-                    if add_genre not in self._dataset_of_genres:
-                        self._dataset_of_genres.append(add_genre)
-                    add_genres.append(add_genre)
+                    add_genres.append(self._genres.intern(g))
 
                 add_movie = Movie(add_title, add_year, add_rank, add_description, add_director, add_actors, add_genres)
+
+                # Numbers missing from a row (e.g. an unknown revenue) are left unset on the movie.
+                for field, column, number_type in NUMERIC_COLUMNS:
+                    value = read_number(row.get(column), number_type)
+                    if value is not None:
+                        try:
+                            setattr(add_movie, field, value)
+                        except ValueError:
+                            # Out of range for the field, so treated as missing.
+                            pass
                 self._dataset_of_movies.append(add_movie)
 
                 index += 1
@@ -315,15 +440,15 @@ class MovieFileCSVReader:
 
     @property
     def dataset_of_actors(self):
-        return self._dataset_of_actors
+        return self._actors.values()
 
     @property
     def dataset_of_directors(self):
-        return self._dataset_of_directors
+        return self._directors.values()
 
     @property
     def dataset_of_genres(self):
-        return self._dataset_of_genres
+        return self._genres.values()
 
 
 def read_csv_file(filename: str):
@@ -340,30 +465,54 @@ def read_csv_file(filename: str):
             yield row
 
 
-def load_users(data_path: str, repo: MemoryRepository):
+def load_users(data_path: str, repo: MemoryRepository, password_mode: str = HASH):
     users = dict()
 
     for data_row in read_csv_file(os.path.join(data_path, 'users.csv')):
         user = User(
             username=data_row[0],
-            password=generate_password_hash(data_row[1])
+            password=seed_password(data_row[1], password_mode)
         )
         repo.add_user(user)
         users[data_row[0]] = user
     return users
 
 
-def load_movies(data_path: str, repo: MemoryRepository):
-    movie_file_reader = MovieFileCSVReader(os.path.join(data_path, "Data1000Movies.csv"))
+def load_movies(data_path: str, repo: MemoryRepository, snapshot_path: str = None):
+    movies_path = os.path.join(data_path, "Data1000Movies.csv")
+
+    if snapshot_path is not None:
+        # Reuse the snapshot taken the last time this file was loaded, rather than parsing it again.
+        source_hash = catalog_snapshot.file_hash(movies_path)
+        if repo.load_snapshot(snapshot_path, source_hash):
+            return
+
+    movie_file_reader = MovieFileCSVReader(movies_path)
     movie_file_reader.read_csv_file()
 
-    for movie in movie_file_reader.dataset_of_movies:
-        repo.add_movie(movie)
+    repo.add_movies(movie_file_reader.dataset_of_movies)
 
+    if snapshot_path is not None:
+        repo.save_snapshot(snapshot_path, source_hash)
 
-def populate(data_path: str, repo: MemoryRepository):
-    # Load movies into the repository
-    load_movies(data_path, repo)
+
+def populate(data_path: str, repo: MemoryRepository, snapshot_path: str = None, password_mode: str = HASH):
+    # Returns how long (in seconds) loading the movies and the users took.
+    timings = dict()
 
     # Load movies into the repository
-    load_users(data_path, repo)
+    start = time.perf_counter()
+    load_movies(data_path, repo, snapshot_path)
+    timings['movies'] = time.perf_counter() - start
+
+    # Build the autocomplete indexes before the first keystroke needs them.
+    start = time.perf_counter()
+    repo.build_completions()
+    timings['completions'] = time.perf_counter() - start
+
+    # Load users into the repository
+    start = time.perf_counter()
+    load_users(data_path, repo, password_mode)
+    timings['users'] = time.perf_counter() - start
+
+    return timings
@@ -0,0 +1,204 @@
+import gc
+import threading
+
+from bisect import bisect_left, insort_left
+
+from cs235flix.adapters.genre_index import GenreIndex
+from cs235flix.adapters.movie_filter import NumericColumns
+from cs235flix.adapters.prefix_index import Completions
+from cs235flix.adapters.text_index import MovieTextIndex
+from cs235flix.adapters.trigram_index import TrigramIndex, normalize_name
+from cs235flix.domain.model import Actor, Genre, Movie
+
+# Serializes building the prefix indexes of a catalog, so that concurrent first completions build them only once. The
+# lock is not kept on the catalog, which is pickled into snapshots.
+_completions_lock = threading.Lock()
+
+
+def movie_sort_key(movie: Movie):
+    # The order of Movie.__lt__ (by title, then release year), precomputed so that sorting doesn't compare Movies.
+    return movie.title or "", int(movie.release_date)
+
+
+def insert_posting(postings: list, movie: Movie):
+    # Insert movie into a list of movies ordered by name, unless it is already there.
+    position = bisect_left(postings, movie)
+    if position == len(postings) or postings[position] is not movie:
+        postings.insert(position, movie)
+
+
+def append_posting(postings: list, movie: Movie):
+    # Append movie to a list of movies ordered by name, when movies are indexed in name order.
+    if len(postings) == 0 or postings[-1] is not movie:
+        postings.append(movie)
+
+
+class MovieCatalog:
+    """ The movies of a MemoryRepository together with every index over them.
+
+    Movies can be added one at a time, which keeps each index sorted by inserting into it, or a whole catalog can be
+    built at once from an iterable of movies, which sorts the movies once and fills every index in a single pass
+    without any insertion. A catalog that has been built is complete, so a repository can publish it by replacing its
+    reference to the old catalog.
+    """
+
+    def __init__(self):
+        # Movies ordered by name, and movies by rank.
+        self.movies = list()
+        self.movies_by_rank = dict()
+
+        # Year index: movies released in each year (ordered by name), and the sorted distinct release years.
+        self.movies_by_year = dict()
+        self.years = list()
+        self.year_navigation = dict()
+
+        # Inverted indexes for searching: normalized names and titles to the movies they appear in (ordered by name),
+        # words to the names that contain them, trigrams to names and titles, genres to bitmaps of their movies, and
+        # the words of titles and descriptions to the movies containing them, for full-text search.
+        self.movies_by_title = dict()
+        self.title_trigrams = TrigramIndex()
+        self.movies_by_actor = dict()
+        self.actor_tokens = dict()
+        self.actor_trigrams = TrigramIndex()
+        self.movies_by_director = dict()
+        self.director_tokens = dict()
+        self.director_trigrams = TrigramIndex()
+        self.genre_index = GenreIndex()
+        self.text_index = MovieTextIndex()
+
+        # Normalized actor and director names, so that a name shared by many movies is only normalized once.
+        self._name_keys = dict()
+
+        # Numeric fields of the movies in name order, made when first filtered by, and prefix indexes of titles and
+        # names, made when a search is first completed.
+        self._numeric_columns = None
+        self._completions = None
+
+    @classmethod
+    def build(cls, movies) -> 'MovieCatalog':
+        # Building allocates many long-lived lists, dicts and sets, which would otherwise trigger repeated and
+        # fruitless garbage collection passes.
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            return cls._build(movies)
+        finally:
+            if gc_enabled:
+                gc.enable()
+
+    @classmethod
+    def _build(cls, movies) -> 'MovieCatalog':
+        catalog = cls()
+        catalog.movies = sorted(movies, key=movie_sort_key)
+
+        # Movies are indexed in name order, so every posting list is filled in order by appending to it.
+        for movie in catalog.movies:
+            catalog.movies_by_rank[movie.rank] = movie
+
+            year = int(movie.release_date)
+            if year not in catalog.movies_by_year:
+                catalog.movies_by_year[year] = list()
+            catalog.movies_by_year[year].append(movie)
+
+            catalog._index_movie_for_search(movie, append_posting, bulk=True)
+
+        # Trigrams and genre bitmaps are filled in one go once every movie has been seen.
+        catalog.title_trigrams.add_many(catalog.movies_by_title)
+        catalog.actor_trigrams.add_many(catalog.movies_by_actor)
+        catalog.director_trigrams.add_many(catalog.movies_by_director)
+        catalog.genre_index.add_many((movie, catalog._genre_names(movie)) for movie in catalog.movies)
+        catalog.text_index.add_movies(catalog.movies)
+
+        catalog.years = sorted(catalog.movies_by_year)
+        for index, year in enumerate(catalog.years):
+            catalog.year_navigation[year] = {
+                'count': len(catalog.movies_by_year[year]),
+                'previous_year': catalog.years[index - 1] if index > 0 else None,
+                'next_year': catalog.years[index + 1] if index + 1 < len(catalog.years) else None
+            }
+        return catalog
+
+    def add(self, movie: Movie):
+        insort_left(self.movies, movie)
+        self.movies_by_rank[movie.rank] = movie
+
+        year = int(movie.release_date)
+        if year not in self.movies_by_year:
+            self.movies_by_year[year] = list()
+            insort_left(self.years, year)
+            self._add_year_navigation(year)
+        insort_left(self.movies_by_year[year], movie)
+        self.year_navigation[year]['count'] += 1
+
+        self._index_movie_for_search(movie, insert_posting)
+        self._numeric_columns = None
+        self._completions = None
+
+    def numeric_columns(self) -> NumericColumns:
+        if self._numeric_columns is None:
+            self._numeric_columns = NumericColumns.from_movies(self.movies)
+        return self._numeric_columns
+
+    def completions(self) -> Completions:
+        completions = self._completions
+        if completions is None:
+            with _completions_lock:
+                completions = self._completions
+                if completions is None:
+                    movies = self.movies
+                    completions = self._completions = Completions(
+                        ((movie.title, movie.rank) for movie in movies),
+                        ((movie.director.director_full_name, movie.rank) for movie in movies
+                         if movie.director.director_full_name is not None),
+                        ((actor.actor_full_name, movie.rank) for movie in movies for actor in movie.actors
+                         if isinstance(actor, Actor) and actor.actor_full_name is not None))
+        return completions
+
+    def _index_movie_for_search(self, movie: Movie, add_posting, bulk: bool = False):
+        # When bulk is set, the caller indexes the trigrams and genres of every movie afterwards.
+        title = normalize_name(movie.title)
+        add_posting(self.movies_by_title.setdefault(title, []), movie)
+        if not bulk:
+            self.title_trigrams.add(title)
+
+        for actor in movie.actors:
+            if isinstance(actor, Actor) and actor.actor_full_name is not None:
+                self._index_name(self.movies_by_actor, self.actor_tokens, None if bulk else self.actor_trigrams,
+                                 actor.actor_full_name, movie, add_posting)
+
+        if movie.director.director_full_name is not None:
+            self._index_name(self.movies_by_director, self.director_tokens,
+                             None if bulk else self.director_trigrams, movie.director.director_full_name, movie,
+                             add_posting)
+
+        if not bulk:
+            self.genre_index.add(movie, self._genre_names(movie))
+            self.text_index.add_movie(movie)
+
+    def _genre_names(self, movie: Movie):
+        return [genre.genre_name for genre in movie.genres if isinstance(genre, Genre)]
+
+    def _index_name(self, index: dict, tokens: dict, trigram_index: TrigramIndex, name: str, movie: Movie,
+                    add_posting):
+        key = self._name_keys.get(name)
+        if key is None:
+            key = self._name_keys[name] = normalize_name(name)
+        if key not in index:
+            index[key] = list()
+            if trigram_index is not None:
+                trigram_index.add(key)
+            for word in key.split():
+                tokens.setdefault(word, set()).add(key)
+        add_posting(index[key], movie)
+
+    def _add_year_navigation(self, year: int):
+        # Link a newly indexed year between its neighbours in the sorted years list.
+        index = bisect_left(self.years, year)
+        previous_year = self.years[index - 1] if index > 0 else None
+        next_year = self.years[index + 1] if index + 1 < len(self.years) else None
+
+        self.year_navigation[year] = {'count': 0, 'previous_year': previous_year, 'next_year': next_year}
+        if previous_year is not None:
+            self.year_navigation[previous_year]['next_year'] = year
+        if next_year is not None:
+            self.year_navigation[next_year]['previous_year'] = year
@@ -0,0 +1,185 @@
+import heapq
+import math
+from array import array
+
+try:
+    import numpy
+except ImportError:
+    # Without NumPy, filters are evaluated one movie at a time.
+    numpy = None
+
+# Stored in the integer columns for values the data doesn't have. Missing floats are stored as NaN.
+MISSING = -1
+
+# The numeric fields that movies can be filtered and sorted by, with the Movie attribute each is read from and the
+# array type code of its column.
+NUMERIC_FIELDS = {
+    'rank': ('rank', 'q'),
+    'year': ('release_date', 'h'),
+    'runtime': ('runtime_minutes', 'i'),
+    'rating': ('rating', 'd'),
+    'votes': ('votes', 'q'),
+    'revenue': ('revenue', 'd'),
+    'metascore': ('metascore', 'h'),
+}
+
+
+class MovieFilter:
+    """ Which movies to list, by ranges of their numeric fields, and the order to list them in.
+
+    ranges maps field names to (low, high) pairs; both bounds are inclusive and either may be None. A movie without a
+    value for a field never matches a range over it. Movies are listed by name unless sort_by names a field, in which
+    case movies without a value for it come last.
+    """
+
+    def __init__(self, ranges: dict = None, sort_by: str = None, descending: bool = False):
+        ranges = dict() if ranges is None else dict(ranges)
+        for field in list(ranges) + ([] if sort_by is None else [sort_by]):
+            if field not in NUMERIC_FIELDS:
+                raise ValueError('unknown movie field: %r' % field)
+
+        # A range open at both ends doesn't filter anything.
+        self.ranges = {field: bounds for field, bounds in ranges.items() if bounds != (None, None)}
+        self.sort_by = sort_by
+        self.descending = descending
+
+
+class NumericColumns:
+    """ The numeric fields of a list of movies as typed columns, for filtering and sorting by them.
+
+    Position n of every column holds a field of movie n. Integer columns hold MISSING, and float columns NaN, for a
+    movie without a value. With NumPy, each filter is evaluated over whole columns at once as boolean masks, and the
+    first page of a sorted listing is found with a partial sort (numpy.partition) rather than a full one.
+    """
+
+    def __init__(self, columns: dict):
+        self._columns = columns
+        self._arrays = dict()
+
+    @classmethod
+    def from_movies(cls, movies):
+        columns = {field: array(type_code) for field, (attribute, type_code) in NUMERIC_FIELDS.items()}
+        for movie in movies:
+            for field, (attribute, type_code) in NUMERIC_FIELDS.items():
+                value = getattr(movie, attribute)
+                if field == 'runtime' and value == 0:
+                    # A Movie's runtime is 0 until it is known.
+                    value = None
+
+                if type_code == 'd':
+                    columns[field].append(math.nan if value is None else value)
+                else:
+                    columns[field].append(MISSING if value is None else int(value))
+        return cls(columns)
+
+    def __len__(self):
+        return len(self._columns['rank'])
+
+    def __getstate__(self):
+        # NumPy views of the columns are made again when needed.
+        return {'columns': self._columns}
+
+    def __setstate__(self, state):
+        self._columns = state['columns']
+        self._arrays = dict()
+
+    def select(self, movie_filter: MovieFilter, cursor: int = 0, count: int = None):
+        # Returns the positions of the matching movies from cursor onwards, up to count of them, in the order of
+        # movie_filter, together with the number of movies matching.
+        if numpy is not None:
+            return self._select_with_numpy(movie_filter, cursor, count)
+        return self._select(movie_filter, cursor, count)
+
+    def _array(self, field: str):
+        # A NumPy view sharing the memory of the column.
+        view = self._arrays.get(field)
+        if view is None:
+            column = self._columns[field]
+            # Columns are arrays or memoryviews, which both give their type code as a buffer format.
+            type_code = memoryview(column).format
+            view = self._arrays[field] = numpy.frombuffer(column, dtype=type_code) if len(column) > 0 else \
+                numpy.zeros(0, dtype=type_code)
+        return view
+
+    def _select_with_numpy(self, movie_filter: MovieFilter, cursor: int, count: int):
+        mask = None
+        for field, (low, high) in movie_filter.ranges.items():
+            column = self._array(field)
+            conditions = []
+            if low is not None:
+                conditions.append(column >= low)
+            if high is not None:
+                conditions.append(column <= high)
+            if column.dtype.kind != 'f':
+                # Comparisons with NaN are always false, so only integer columns need missing values left out.
+                conditions.append(column != MISSING)
+            for condition in conditions:
+                if mask is None:
+                    mask = condition
+                else:
+                    mask &= condition
+
+        # Without any range, every movie matches and positions are left as None rather than listing them all.
+        positions = None if mask is None else numpy.flatnonzero(mask)
+        total = len(self) if positions is None else len(positions)
+        stop = total if count is None else min(total, cursor + count)
+        if cursor >= stop:
+            return [], total
+        if movie_filter.sort_by is None:
+            return list(range(cursor, stop)) if positions is None else positions[cursor:stop].tolist(), total
+
+        column = self._array(movie_filter.sort_by)
+        keys = (column if positions is None else column[positions]).astype(numpy.float64)
+        missing = numpy.isnan(keys) if column.dtype.kind == 'f' else keys == MISSING
+        if movie_filter.descending:
+            numpy.negative(keys, out=keys)
+        keys[missing] = numpy.inf
+
+        if stop < total:
+            # Only the movies up to the end of the page need sorting: those with keys below the key of the last movie
+            # on the page, and as many of those tying with it as fill the page. Matches are in name order, so the
+            # first of the ties are the ones to keep.
+            threshold = numpy.partition(keys, stop - 1)[stop - 1]
+            below = numpy.flatnonzero(keys < threshold)
+            ties = numpy.flatnonzero(keys == threshold)[:stop - len(below)]
+            indexes = numpy.concatenate((below, ties))
+        else:
+            indexes = numpy.arange(total)
+
+        # Movies with equal keys stay in name order.
+        order = indexes[numpy.lexsort((indexes, keys[indexes]))[cursor:stop]]
+        return (order if positions is None else positions[order]).tolist(), total
+
+    def _select(self, movie_filter: MovieFilter, cursor: int, count: int):
+        positions = range(len(self))
+        for field, (low, high) in movie_filter.ranges.items():
+            column = self._columns[field]
+            positions = [position for position in positions if self._in_range(column[position], low, high)]
+
+        positions = list(positions)
+        total = len(positions)
+        stop = total if count is None else min(total, cursor + count)
+        if cursor >= stop:
+            return [], total
+        if movie_filter.sort_by is None:
+            return positions[cursor:stop], total
+
+        column = self._columns[movie_filter.sort_by]
+        sign = -1 if movie_filter.descending else 1
+
+        def sort_key(position):
+            value = column[position]
+            if value == MISSING or value != value:
+                return 1, 0, position
+            return 0, sign * value, position
+
+        if stop < total:
+            positions = heapq.nsmallest(stop, positions, key=sort_key)
+        else:
+            positions.sort(key=sort_key)
+        return positions[cursor:stop], total
+
+    def _in_range(self, value, low, high) -> bool:
+        if value == MISSING or value != value:
+            return False
+        return (low is None or value >= low) and (high is None or value <= high)
@@ -0,0 +1,67 @@
+import requests
+
+from omdb import OMDBClient
+
+from cs235flix.adapters.resilience import SingleFlight, CircuitBreaker, CircuitOpenException
+
+
+OMDB_API_KEY = "1454b6c1"
+
+# Shared OMDb client, so that the API key and HTTP session are set up once rather than per lookup.
+client = OMDBClient(apikey=OMDB_API_KEY, timeout=5)
+
+# Concurrent lookups of the same movie share one OMDb request, and once OMDb keeps failing or timing out, lookups
+# fail fast instead of tying up worker threads until it recovers.
+single_flight = SingleFlight()
+breaker = CircuitBreaker()
+
+
+class OmdbException(Exception):
+    pass
+
+
+def configure(url: str = None, timeout: float = None, **breaker_settings):
+    # Point the client at a different OMDb endpoint (e.g. a local stub server), change the request timeout, and/or
+    # replace the circuit breaker with one built from breaker_settings.
+    global breaker
+
+    if url is not None:
+        client.url = url
+    if timeout is not None:
+        client.set_default("timeout", timeout)
+    if breaker_settings:
+        breaker = CircuitBreaker(**breaker_settings)
+
+
+def fetch_poster(title: str, year=None):
+    # Search OMDb for the movie and return its poster URL, or None if OMDb has no poster for it. Raises
+    # OmdbException if OMDb could not be reached, returned something unreadable, or the circuit breaker is open.
+    key = (" ".join(str(title).lower().split()), str(year))
+    return single_flight.do(key, _guarded_search_poster, title, year)
+
+
+def _guarded_search_poster(title: str, year):
+    try:
+        return breaker.call(_search_poster, title, year)
+    except CircuitOpenException:
+        raise OmdbException("OMDb lookups are suspended while the circuit breaker is open")
+
+
+def _search_poster(title: str, year):
+    try:
+        movies_list = client.search_movie(title)
+    except (requests.RequestException, ValueError) as e:
+        raise OmdbException(e)
+
+    if len(movies_list) == 0:
+        return None
+
+    # Prefer the result released in the same year, falling back to the best match.
+    match = movies_list[0]
+    if year is not None:
+        match = next((m for m in movies_list if str(m.get("year")) == str(year)), match)
+
+    poster = match.get("poster")
+    if poster is None or poster == "N/A":
+        return None
+    return poster
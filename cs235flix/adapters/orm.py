@@ -1,13 +1,46 @@
 from sqlalchemy import (
-    Table, MetaData, Column, Integer, String, DateTime,
-    ForeignKey
+    Table, MetaData, Column, Integer, String, DateTime, Float,
+    ForeignKey, UniqueConstraint
 )
 from sqlalchemy.orm import mapper, relationship
+from sqlalchemy.types import TypeDecorator
 
 from cs235flix.domain import model
 
 metadata = MetaData()
 
+
+class DirectorName(TypeDecorator):
+    """ A movie's Director, stored as the director's name. """
+    impl = String
+
+    def process_bind_param(self, value, dialect):
+        return value.director_full_name if isinstance(value, model.Director) else value
+
+    def process_result_value(self, value, dialect):
+        return None if value is None else model.Director(value)
+
+
+class NameList(TypeDecorator):
+    """ A movie's list of Actor or Genre objects, stored as their comma-separated names. """
+    impl = String
+
+    def __init__(self, make, name_of, length: int):
+        super().__init__(length)
+        self._make = make
+        self._name_of = name_of
+
+    def process_bind_param(self, value, dialect):
+        if value is None or isinstance(value, str):
+            return value
+        return ",".join(self._name_of(item) for item in value)
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return [self._make(name.strip()) for name in value.split(",")]
+
+
 users = Table(
     'users', metadata,
     Column('id', Integer, primary_key=True, autoincrement=True),
@@ -21,6 +54,7 @@ reviews = Table(
     Column('user_id', ForeignKey('users.id')),
     Column('movie_id', ForeignKey('movies.id')),
     Column('review', String(1024), nullable=False),
+    Column('rating', Integer),
     Column('timestamp', DateTime, nullable=False)
 )
 
@@ -31,9 +65,23 @@ movies = Table(
     Column('release_date', Integer, nullable=False),
     Column('rank', Integer, nullable=False),
     Column('description', String(1024), nullable=False),
-    Column('director', String(255), nullable=False),
-    Column('actors', String(1024), nullable=False),
-    Column('genres', String(255), nullable=False)
+    Column('director', DirectorName(255), nullable=False),
+    Column('actors', NameList(model.Actor, lambda actor: actor.actor_full_name, 1024), nullable=False),
+    Column('genres', NameList(model.Genre, lambda genre: genre.genre_name, 255), nullable=False),
+    Column('runtime_minutes', Integer),
+    Column('rating', Float),
+    Column('votes', Integer),
+    Column('revenue', Float),
+    Column('metascore', Integer)
+)
+
+# Each user's watchlist, in the order its movies were added.
+watchlists = Table(
+    'watchlists', metadata,
+    Column('id', Integer, primary_key=True, autoincrement=True),
+    Column('username', ForeignKey('users.username'), nullable=False),
+    Column('movie_rank', Integer, nullable=False),
+    UniqueConstraint('username', 'movie_rank')
 )
 
 search = Table(
@@ -44,23 +92,28 @@ search = Table(
 
 def map_model_to_tables():
     mapper(model.User, users, properties={
-        'username': users.c.username,
-        'password': users.column.password,
-        'reviews': relationship(model.Review, backref='_user')
+        '_username': users.c.username,
+        '_password': users.c.password,
+        '_reviews': relationship(model.Review, backref='_Review__user')
     })
     mapper(model.Review, reviews, properties={
-        '_Review__review': reviews.column.review,
-        '_Review__timestamp': reviews.column.timestamp
+        '_Review__review_text': reviews.c.review,
+        '_Review__rating': reviews.c.rating,
+        '_Review__timestamp': reviews.c.timestamp
     })
-    movies_mapper = mapper(model.Movie, movies, properties={
-        '_Movie__id': movies.column.id,
-        '_Movie__title': movies.column.title,
-        '_Movie__release_date': movies.column.release_date,
-        '_Movie__rank': movies.column.rank,
-        '_Movie__description': movies.column.description,
-        '_Movie__director': movies.column.director,
-        '_Movie__actors': movies.column.actors,
-        '_Movie_genres': movies.column.genres,
-        '_Movie_reviews': relationship(model.Review, backref='_movie')
+    mapper(model.Movie, movies, properties={
+        '_Movie__id': movies.c.id,
+        '_Movie__movie_title': movies.c.title,
+        '_Movie__release_date': movies.c.release_date,
+        '_Movie__rank': movies.c.rank,
+        '_Movie__description': movies.c.description,
+        '_Movie__director': movies.c.director,
+        '_Movie__actors': movies.c.actors,
+        '_Movie__genres': movies.c.genres,
+        '_Movie__runtime_minutes': movies.c.runtime_minutes,
+        '_Movie__rating': movies.c.rating,
+        '_Movie__votes': movies.c.votes,
+        '_Movie__revenue': movies.c.revenue,
+        '_Movie__metascore': movies.c.metascore,
+        '_Movie__reviews': relationship(model.Review, backref='_Review__movie')
     })
-
@@ -0,0 +1,48 @@
+from collections import namedtuple
+
+# The year of a PageQuery listing the movies of the earliest year with movies, whichever year that is.
+EARLIEST_YEAR = 'earliest'
+
+
+class PageQuery:
+    """ Which movies a page lists: those released in year, in the catalog's order for the year, or those with ranks,
+    in that order (e.g. the cached ranks matching a search). Exactly one of year and ranks is given. year may be
+    EARLIEST_YEAR, which repositories resolve to the earliest year with movies.
+    """
+
+    def __init__(self, year: int = None, ranks=None):
+        if (year is None) == (ranks is None):
+            raise ValueError('a page query lists either the movies of a year or the movies with given ranks')
+        self.year = year
+        self.ranks = ranks
+
+    @classmethod
+    def by_year(cls, year: int):
+        return cls(year=int(year))
+
+    @classmethod
+    def earliest_year(cls):
+        return cls(year=EARLIEST_YEAR)
+
+    @classmethod
+    def by_ranks(cls, ranks):
+        return cls(ranks=ranks)
+
+
+# A page of movies listed by a PageQuery: the page's Movies, the number of movies the query lists, the cursors of the
+# previous, next and last pages (None where there is no such page), the ranks of the page's movies in the user's
+# watchlist, and for a year, the year listed, the neighbouring years with movies and the number of movies of every year
+# with movies, in year order.
+MoviePage = namedtuple('MoviePage', ['movies', 'total', 'previous_cursor', 'next_cursor', 'last_cursor',
+                                     'watchlisted', 'previous_year', 'next_year', 'year', 'year_counts'])
+
+
+def movie_page(movies: list, total: int, cursor: int, count: int, watchlisted=frozenset(),
+               previous_year: int = None, next_year: int = None, year: int = None,
+               year_counts: dict = None) -> MoviePage:
+    # Returns the MoviePage of movies, the page of count movies starting at cursor among total.
+    previous_cursor = max(cursor - count, 0) if cursor > 0 else None
+    next_cursor = cursor + count if cursor + count < total else None
+    last_cursor = ((total - 1) // count) * count if total > 0 and count > 0 else None
+    return MoviePage(movies, total, previous_cursor, next_cursor, last_cursor, watchlisted, previous_year,
+                     next_year, year, year_counts)
@@ -0,0 +1,157 @@
+import sqlite3
+import threading
+import time
+
+from collections import OrderedDict
+
+import cs235flix.adapters.omdb_client as omdb_client
+
+
+# Returned by PosterCache.lookup when nothing (not even a negative result) is cached for a key.
+MISSING = object()
+
+DEFAULT_TTL = 30 * 24 * 60 * 60
+DEFAULT_NEGATIVE_TTL = 24 * 60 * 60
+
+
+def normalize_key(title: str, year=None) -> str:
+    # Titles are matched case-insensitively and with collapsed whitespace, so "The  Matrix" and "the matrix" share
+    # an entry.
+    normalized_title = " ".join(str(title).lower().split())
+    if year is None or str(year).strip() == "":
+        return normalized_title
+    return normalized_title + "|" + str(year).strip()
+
+
+class PosterCache:
+    """ Two-tier cache of poster URLs keyed by normalized title and year.
+
+    The first tier is an in-process LRU holding at most max_entries posters. The optional second tier is an SQLite
+    file at path, which survives restarts. A poster of None records that OMDb has no poster for the movie; such
+    negative results are kept for negative_ttl seconds instead of ttl seconds.
+    """
+
+    def __init__(self, path: str = None, max_entries: int = 1024, ttl: float = DEFAULT_TTL,
+                 negative_ttl: float = DEFAULT_NEGATIVE_TTL, clock=time.time):
+        self._path = path
+        self._max_entries = max_entries
+        self._ttl = ttl
+        self._negative_ttl = negative_ttl
+        self._clock = clock
+        self._lock = threading.RLock()
+        self._entries = OrderedDict()
+        self._stats = dict.fromkeys(
+            ('hits', 'misses', 'memory_hits', 'disk_hits', 'negative_hits', 'expired', 'evictions', 'stores'), 0)
+
+        self._db = None
+        if path is not None:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                'CREATE TABLE IF NOT EXISTS posters (key TEXT PRIMARY KEY, poster TEXT, expires REAL NOT NULL)')
+            self._db.commit()
+
+    @property
+    def path(self):
+        return self._path
+
+    @property
+    def max_entries(self):
+        return self._max_entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def lookup(self, title: str, year=None):
+        # Returns the cached poster (possibly None for a negative result), or MISSING if there is no live entry.
+        key = normalize_key(title, year)
+        now = self._clock()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                poster, expires = entry
+                if expires > now:
+                    self._entries.move_to_end(key)
+                    self._record_hit('memory_hits', poster)
+                    return poster
+                del self._entries[key]
+                self._stats['expired'] += 1
+
+            if self._db is not None:
+                row = self._db.execute('SELECT poster, expires FROM posters WHERE key = ?', (key,)).fetchone()
+                if row is not None:
+                    poster, expires = row
+                    if expires > now:
+                        self._remember(key, poster, expires)
+                        self._record_hit('disk_hits', poster)
+                        return poster
+                    self._db.execute('DELETE FROM posters WHERE key = ?', (key,))
+                    self._db.commit()
+                    self._stats['expired'] += 1
+
+            self._stats['misses'] += 1
+            return MISSING
+
+    def store(self, title: str, year, poster):
+        key = normalize_key(title, year)
+        ttl = self._ttl if poster is not None else self._negative_ttl
+        expires = self._clock() + ttl
+
+        with self._lock:
+            self._remember(key, poster, expires)
+            self._stats['stores'] += 1
+            if self._db is not None:
+                self._db.execute('INSERT OR REPLACE INTO posters (key, poster, expires) VALUES (?, ?, ?)',
+                                 (key, poster, expires))
+                self._db.commit()
+
+    def get_or_fetch(self, title: str, year=None, fetch=None):
+        poster = self.lookup(title, year)
+        if poster is MISSING:
+            poster = self.refresh(title, year, fetch)
+        return poster
+
+    def refresh(self, title: str, year=None, fetch=None):
+        # Fetch the poster regardless of what is cached and store the result. Errors raised by fetch propagate and
+        # leave the cache untouched, so a failed lookup is retried next time.
+        if fetch is None:
+            fetch = omdb_client.fetch_poster
+        poster = fetch(title, year)
+        self.store(title, year, poster)
+        return poster
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = len(self._entries)
+        return stats
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute('DELETE FROM posters')
+                self._db.commit()
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def _remember(self, key, poster, expires):
+        self._entries[key] = (poster, expires)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+            self._stats['evictions'] += 1
+
+    def _record_hit(self, tier, poster):
+        self._stats['hits'] += 1
+        self._stats[tier] += 1
+        if poster is None:
+            self._stats['negative_hits'] += 1
+
+
+# Process-wide cache used by the repositories; create_app replaces it with one configured from the app settings.
+cache_instance = PosterCache()
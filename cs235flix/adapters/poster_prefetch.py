@@ -0,0 +1,200 @@
+import json
+import logging
+import os
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+
+import cs235flix.adapters.poster_cache as poster_cache
+from cs235flix.adapters.poster_cache import MISSING
+
+
+CHECKPOINT_VERSION = 1
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimiter:
+    """ Spaces out calls to acquire so that at most rate of them return per second, across all threads. """
+
+    def __init__(self, rate: float, clock=time.monotonic, sleep=time.sleep):
+        self._interval = 1.0 / rate if rate else 0.0
+        self._clock = clock
+        self._sleep = sleep
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            now = self._clock()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self._interval
+        if slot > now:
+            self._sleep(slot - now)
+
+
+class PosterPrefetcher:
+    """ Warms the poster cache for every movie in a catalog.
+
+    Movies are processed in the order given, with at most max_workers lookups in flight and at most rate_limit OMDb
+    requests per second. Movies already in the cache are skipped. If checkpoint_path is set and the cache has an
+    on-disk tier, the position up to which every movie's poster has been cached is saved there as the job goes, and a
+    new job started with the same checkpoint resumes from that position. Failed lookups hold the checkpoint back, so
+    that a resumed job retries them. A memory-only cache starts empty after a restart, so the checkpoint is ignored.
+    """
+
+    def __init__(self, movies, cache=None, checkpoint_path: str = None, max_workers: int = 4,
+                 rate_limit: float = 5.0, checkpoint_every: int = 25):
+        self._movies = list(movies)
+        self._cache = cache
+        self._checkpoint_path = checkpoint_path
+        self._max_workers = max_workers
+        self._rate_limiter = RateLimiter(rate_limit)
+        self._checkpoint_every = checkpoint_every
+
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._done_indexes = set()
+        self._next_index = 0
+        self._resumed_from = 0
+        self._counts = dict.fromkeys(('fetched', 'cached', 'failed'), 0)
+        self._running = False
+        self._finished = False
+        self._started_at = None
+        self._finished_at = None
+
+    @property
+    def cache(self):
+        if self._cache is not None:
+            return self._cache
+        return poster_cache.cache_instance
+
+    def start(self):
+        # Run the job on a daemon thread, so that it never holds up requests or process shutdown.
+        self._thread = threading.Thread(target=self.run, name='poster-prefetch', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: float = None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def join(self, timeout: float = None):
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def run(self):
+        cache = self.cache
+        if cache.path is None:
+            if self._checkpoint_path is not None:
+                logger.warning('Ignoring the poster prefetch checkpoint %s, as the poster cache is only held in memory',
+                               self._checkpoint_path)
+                self._checkpoint_path = None
+            if len(self._movies) > cache.max_entries:
+                logger.warning('The poster cache holds %d posters, fewer than the %d movies to prefetch, so the '
+                               'posters fetched first will be evicted and looked up again', cache.max_entries,
+                               len(self._movies))
+
+        with self._lock:
+            self._next_index = self._resumed_from = self._load_checkpoint()
+            self._running = True
+            self._started_at = time.time()
+
+        # Limit the number of outstanding lookups rather than queueing the whole catalog on the pool.
+        slots = threading.BoundedSemaphore(self._max_workers)
+        with ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix='poster-prefetch') as executor:
+            for index in range(self._resumed_from, len(self._movies)):
+                if self._stop.is_set():
+                    break
+                slots.acquire()
+                future = executor.submit(self._prefetch, index)
+                future.add_done_callback(lambda f: slots.release())
+
+        with self._lock:
+            self._running = False
+            self._finished = self._next_index >= len(self._movies)
+            self._finished_at = time.time()
+            self._save_checkpoint()
+
+    def status(self):
+        with self._lock:
+            total = len(self._movies)
+            completed = self._resumed_from + len(self._done_indexes)
+            return {
+                'enabled': True,
+                'running': self._running,
+                'finished': self._finished,
+                'total': total,
+                'completed': completed,
+                'percent': round(100.0 * completed / total, 1) if total else 100.0,
+                'resumed_from': self._resumed_from,
+                'checkpoint': self._next_index,
+                'fetched': self._counts['fetched'],
+                'cached': self._counts['cached'],
+                'failed': self._counts['failed'],
+                'started_at': self._started_at,
+                'finished_at': self._finished_at
+            }
+
+    def _prefetch(self, index: int):
+        movie = self._movies[index]
+        cache = self.cache
+        outcome = 'cached'
+
+        if cache.lookup(movie.title, movie.release_date) is MISSING:
+            self._rate_limiter.acquire()
+            try:
+                cache.refresh(movie.title, movie.release_date)
+                outcome = 'fetched'
+            except Exception:
+                # Failed lookups are not marked done, so the checkpoint stops at the first of them.
+                outcome = 'failed'
+
+        with self._lock:
+            self._counts[outcome] += 1
+            if outcome != 'failed':
+                self._done_indexes.add(index)
+                while self._next_index in self._done_indexes:
+                    self._next_index += 1
+            if sum(self._counts.values()) % self._checkpoint_every == 0:
+                self._save_checkpoint()
+
+    def _load_checkpoint(self):
+        if self._checkpoint_path is None or not os.path.exists(self._checkpoint_path):
+            return 0
+
+        try:
+            with open(self._checkpoint_path, encoding='utf-8') as infile:
+                checkpoint = json.load(infile)
+        except ValueError:
+            # A corrupt checkpoint only costs a full re-run, which skips cached movies anyway.
+            return 0
+
+        if checkpoint.get('version') != CHECKPOINT_VERSION or checkpoint.get('total') != len(self._movies):
+            return 0
+        return min(int(checkpoint.get('next_index', 0)), len(self._movies))
+
+    def _save_checkpoint(self):
+        if self._checkpoint_path is None:
+            return
+
+        # Write to a temporary file first, so that a crash mid-write never leaves a truncated checkpoint. Its name is
+        # unique to the process, as every worker process runs its own job against the same checkpoint.
+        checkpoint = {'version': CHECKPOINT_VERSION, 'total': len(self._movies), 'next_index': self._next_index}
+        temporary_path = '%s.%d.tmp' % (self._checkpoint_path, os.getpid())
+        with open(temporary_path, 'w', encoding='utf-8') as outfile:
+            json.dump(checkpoint, outfile)
+        os.replace(temporary_path, self._checkpoint_path)
+
+
+# The running prefetch job, if create_app started one.
+prefetcher_instance = None
+
+
+def get_prefetch_status():
+    if prefetcher_instance is None:
+        return {'enabled': False}
+    return prefetcher_instance.status()
@@ -0,0 +1,97 @@
+import threading
+
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import cs235flix.adapters.poster_cache as poster_cache
+from cs235flix.adapters.poster_cache import MISSING, normalize_key
+
+
+class PosterResolver:
+    """ Resolves the posters for a page of movies concurrently.
+
+    Cache hits are filled in straight away. Misses are looked up on a thread pool shared by all requests, so at most
+    max_workers OMDb calls are in flight at once. Posters that are not known within deadline seconds, or whose lookup
+    failed, are replaced by placeholder and marked as not resolved (poster_resolved is False); lookups still running
+    carry on in the background and fill the cache for the next page view.
+    """
+
+    def __init__(self, max_workers: int = 8, deadline: float = 2.0, placeholder: str = None, cache=None):
+        self._max_workers = max_workers
+        self._deadline = deadline
+        self._placeholder = placeholder
+        self._cache = cache
+        self._executor = None
+        self._lock = threading.Lock()
+
+    @property
+    def placeholder(self):
+        return self._placeholder
+
+    @property
+    def cache(self):
+        # Default to the process-wide cache, looked up at call time because create_app replaces it.
+        if self._cache is not None:
+            return self._cache
+        return poster_cache.cache_instance
+
+    def resolve(self, movies):
+        cache = self.cache
+
+        # Group the movies that missed the cache by key, so each distinct movie is fetched once per batch.
+        pending = dict()
+        for movie in movies:
+            poster = cache.lookup(movie['title'], movie['year'])
+            if poster is MISSING:
+                key = normalize_key(movie['title'], movie['year'])
+                pending.setdefault(key, []).append(movie)
+            else:
+                self._set_poster(movie, poster)
+
+        if len(pending) == 0:
+            return movies
+
+        executor = self._get_executor()
+        futures = dict()
+        for waiting_movies in pending.values():
+            movie = waiting_movies[0]
+            future = executor.submit(cache.refresh, movie['title'], movie['year'])
+            futures[future] = waiting_movies
+
+        done, not_done = wait(futures, timeout=self._deadline)
+
+        for future in done:
+            failed = future.exception() is not None
+            poster = None if failed else future.result()
+            for movie in futures[future]:
+                self._set_poster(movie, poster, resolved=not failed)
+
+        for future in not_done:
+            for movie in futures[future]:
+                self._set_poster(movie, None, resolved=False)
+
+        return movies
+
+    def shutdown(self, wait_for_lookups: bool = True):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=wait_for_lookups)
+                self._executor = None
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self._max_workers,
+                                                    thread_name_prefix='poster-resolver')
+            return self._executor
+
+    def _set_poster(self, movie, poster, resolved: bool = True):
+        movie['poster'] = poster if poster is not None else self._placeholder
+        movie['poster_resolved'] = resolved
+
+
+# Process-wide resolver used by the repositories; create_app replaces it with one configured from the app settings.
+resolver_instance = PosterResolver()
+
+
+def resolve_posters(movies):
+    return resolver_instance.resolve(movies)
@@ -0,0 +1,134 @@
+import heapq
+from array import array
+from bisect import bisect_left
+
+from cs235flix.adapters.trigram_index import normalize_name
+
+# The most completions returned for a prefix.
+AUTOCOMPLETE_LIMIT = 10
+
+# The search types that can be completed, in the order their completions are listed when ranks tie.
+COMPLETION_TYPES = ['movie', 'director', 'actor']
+
+# The best names of prefixes matching more keys than this are ranked when an index is built, so that a lookup never
+# ranks more than this many keys.
+_PRECOMPUTED_RANGE = 256
+
+# Sorts after every other character, so that the keys starting with a prefix sort below prefix + _LAST.
+_LAST = chr(0x10ffff)
+
+
+def _word_starts(key: str):
+    # The positions in key where its words start.
+    return [0] + [index + 1 for index, letter in enumerate(key) if letter == " "]
+
+
+class PrefixIndex:
+    """ Completions of prefixes to names (titles, or names of people), best first by the rank of their best movie.
+
+    Every name is indexed under its normalized form from the start of each of its words onwards, so that "pratt"
+    completes to "Chris Pratt" as well as "chris". These keys are kept in one sorted list, in which the keys starting
+    with a prefix are a range found by binary search. Small ranges are ranked when looked up; the best names of every
+    prefix with a larger range are ranked once, when the index is built, bottom-up from the best names of its longer
+    prefixes.
+    """
+
+    def __init__(self, names, limit: int = AUTOCOMPLETE_LIMIT):
+        # names are (name, rank) pairs. A name given more than once keeps its best (lowest) rank.
+        name_ids = dict()
+        self.names = list()
+        self.ranks = array('q')
+        for name, rank in names:
+            key = normalize_name(name)
+            if key == "":
+                continue
+            name_id = name_ids.get(key)
+            if name_id is None:
+                name_ids[key] = len(self.names)
+                self.names.append(name)
+                self.ranks.append(rank)
+            elif rank < self.ranks[name_id]:
+                self.ranks[name_id] = rank
+
+        keys = list()
+        ids = list()
+        for key, name_id in name_ids.items():
+            for start in _word_starts(key):
+                keys.append(key[start:])
+                ids.append(name_id)
+        order = sorted(range(len(keys)), key=keys.__getitem__)
+        self._keys = [keys[position] for position in order]
+        self._ids = array('i', (ids[position] for position in order))
+
+        self._limit = limit
+        self._best = dict()
+        self._precompute("", 0, len(self._keys))
+
+    def __len__(self):
+        return len(self.names)
+
+    def complete(self, prefix: str, limit: int = AUTOCOMPLETE_LIMIT):
+        # Returns up to limit (name, rank) pairs for the names with a word starting with prefix, best first.
+        key = normalize_name(prefix)
+        limit = min(limit, self._limit)
+        if key == "" or limit <= 0:
+            return []
+
+        best = self._best.get(key)
+        if best is None:
+            start = bisect_left(self._keys, key)
+            best = self._rank(self._ids[start:bisect_left(self._keys, key + _LAST, start)])
+        return [(self.names[name_id], self.ranks[name_id]) for name_id in best[:limit]]
+
+    def _rank(self, name_ids):
+        return heapq.nsmallest(self._limit, set(name_ids), key=self._sort_key)
+
+    def _sort_key(self, name_id: int):
+        return self.ranks[name_id], name_id
+
+    def _precompute(self, prefix: str, start: int, end: int):
+        # Returns the best names of the keys in start:end, which all start with prefix, after storing the best names
+        # of every longer prefix matching more than _PRECOMPUTED_RANGE of them. The best names of a range are among
+        # the best names of its parts.
+        keys = self._keys
+        depth = len(prefix) + 1
+        candidates = list()
+        position = start
+        while position < end:
+            if len(keys[position]) < depth:
+                # The key is prefix itself.
+                candidates.append(self._ids[position])
+                position += 1
+                continue
+
+            longer = keys[position][:depth]
+            stop = bisect_left(keys, longer + _LAST, position, end)
+            if stop - position > _PRECOMPUTED_RANGE:
+                self._best[longer] = self._precompute(longer, position, stop)
+                candidates.extend(self._best[longer])
+            else:
+                candidates.extend(self._ids[position:stop])
+            position = stop
+        return self._rank(candidates)
+
+
+class Completions:
+    """ PrefixIndexes over the titles, directors and actors of a catalog, for completing searches of each type. """
+
+    def __init__(self, titles, directors, actors):
+        # Each of titles, directors and actors are (name, rank) pairs, with the rank of a movie of the name.
+        self._indexes = {'movie': PrefixIndex(titles), 'director': PrefixIndex(directors),
+                         'actor': PrefixIndex(actors)}
+
+    def complete(self, prefix: str, search_type: str = None, limit: int = AUTOCOMPLETE_LIMIT):
+        # Returns up to limit (search type, name, rank) triples completing prefix, of search_type or of every type,
+        # best first.
+        if search_type is not None and search_type not in self._indexes:
+            raise ValueError('unknown search type: %r' % search_type)
+
+        completions = []
+        for order, completed_type in enumerate(COMPLETION_TYPES if search_type is None else [search_type]):
+            completions.append([(rank, order, completed_type, name)
+                                for name, rank in self._indexes[completed_type].complete(prefix, limit)])
+        merged = heapq.merge(*completions)
+        return [(completed_type, name, rank) for rank, order, completed_type, name in merged][:limit]
@@ -1,6 +1,9 @@
 import abc
 from typing import List
 
+from cs235flix.adapters.movie_filter import MovieFilter
+from cs235flix.adapters.page_query import MoviePage, PageQuery
+from cs235flix.adapters.prefix_index import AUTOCOMPLETE_LIMIT
 from cs235flix.domain.model import Movie, User, Review
 
 
@@ -27,11 +30,30 @@ class AbstractRepository(abc.ABC):
         """
         raise NotImplementedError
 
+    @abc.abstractmethod
+    def has_user(self, username) -> bool:
+        """ Returns True if a User named username is in the repository. """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def update_user_password(self, user: User, password: str):
+        """ Replaces the stored password of user, e.g. with a hash of the seed password it logged in with. """
+        raise NotImplementedError
+
     @abc.abstractmethod
     def add_movie(self, movie: Movie):
         """ Adds a Movie to the repository. """
         raise NotImplementedError
 
+    @abc.abstractmethod
+    def add_movies(self, movies):
+        """ Adds an iterable of Movies to the repository in one go.
+
+        This is faster than adding the Movies one at a time, and the Movies only become visible once all of them have
+        been added.
+        """
+        raise NotImplementedError
+
     @abc.abstractmethod
     def get_movie(self, rank: int) -> Movie:
         """ Returns Movie with rank from the repository.
@@ -111,9 +133,21 @@ class AbstractRepository(abc.ABC):
 
     @abc.abstractmethod
     def get_movie_by_type(self, search: str, type_var: str):
-        """ Returns movies with starring actors / by director specified in search.
+        """ Returns movies with starring actors / by director / with genres / with title specified in search.
 
-        If no matches found, this method returns an empty list.
+        Actor and director names and titles match if they contain search; if none do, movies whose names or titles
+        are closest to search are returned instead, so that small typos still find results. A "description" search
+        matches the words of titles and descriptions, and returns the most relevant movies first. If no matches found,
+        this method returns an empty list.
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def get_number_of_movies_by_genres(self, search: str):
+        """ Returns the number of movies matching the genre search, in the form accepted by get_movie_by_type.
+
+        Comma-separated genres must all match, "|" separates alternative genres, and a genre prefixed with "-" must
+        not match, e.g. "Action, Comedy|Drama, -Horror".
         """
         raise NotImplementedError
 
@@ -126,16 +160,38 @@ class AbstractRepository(abc.ABC):
         raise NotImplementedError
 
     @abc.abstractmethod
-    def set_search(self, search: str):
-        """ Set the current search to user input.
+    def get_movies_by_filter(self, movie_filter: MovieFilter, cursor: int = 0, count: int = None):
+        """ Returns the Movies matching movie_filter, in its order, together with the number of Movies matching.
+
+        Only the Movies from position cursor onwards, and at most count of them, are returned.
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def get_movie_page(self, query: PageQuery, cursor: int, count: int, username: str = None) -> MoviePage:
+        """ Returns the MoviePage of at most count of the Movies listed by query, from position cursor onwards.
+
+        The page carries the number of Movies listed, the cursors to navigate from it, if username is given which of
+        its Movies are in the user's watchlist and, for a year, the number of Movies of every year, so that a page needs
+        no other repository calls. Ranks of query that don't represent Movie ranks in the repository are left out of
+        the page.
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def get_completions(self, prefix: str, search_type: str = None, limit: int = AUTOCOMPLETE_LIMIT):
+        """ Returns up to limit (search type, name, rank) triples for the titles ("movie"), directors and actors with
+        a word starting with prefix, best first by the rank of their best movie.
+
+        Only names of search_type are completed if it is given. Raises ValueError for an unknown search type.
         """
         raise NotImplementedError
 
     @abc.abstractmethod
-    def get_search(self):
-        """ Return the current search.
+    def get_catalog_version(self):
+        """ Returns the version of the repository's movies, which changes whenever Movies are added.
 
-        If no searches found, return None.
+        Results computed from the movies, such as the ranks matching a search, remain valid while it is unchanged.
         """
         raise NotImplementedError
 
@@ -157,23 +213,42 @@ class AbstractRepository(abc.ABC):
         raise NotImplementedError
 
     @abc.abstractmethod
-    def add_to_watchlist(self, movie: Movie):
-        """ Adds a Movie to repository watchlist."""
+    def add_to_watchlist(self, username: str, movie: Movie):
+        """ Adds a Movie to the watchlist of the User named username. """
         raise NotImplementedError
 
     @abc.abstractmethod
-    def get_movie_watchlist(self):
-        """ Returns the Movies stored in the repository. """
+    def remove_from_watchlist(self, username: str, movie: Movie):
+        """ Removes a Movie from the watchlist of the User named username. """
         raise NotImplementedError
 
     @abc.abstractmethod
-    def check_if_added(self, movie_rank: int):
-        """ Returns True if movie has been added to watchlist.
+    def get_movie_watchlist(self, username: str, cursor: int = 0, count: int = None):
+        """ Returns the Movies in the watchlist of the User named username, in the order they were added.
+
+        Up to count Movies are returned, starting with the Movie at position cursor; without count, all Movies from
+        cursor onwards are returned.
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def get_watchlist_size(self, username: str):
+        """ Returns the number of Movies in the watchlist of the User named username. """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def check_if_added(self, username: str, movie_rank: int):
+        """ Returns True if movie has been added to the watchlist of the User named username.
 
         If the movie hasn't been added, this method returns False.
         """
         raise NotImplementedError
 
+    @abc.abstractmethod
+    def check_if_added_many(self, username: str, movie_ranks):
+        """ Returns the set of those movie_ranks that have been added to the watchlist of the User named username. """
+        raise NotImplementedError
+
     @abc.abstractmethod
     def years_list(self):
         """ Returns a list of the release dates of all movies.
@@ -184,5 +259,6 @@ class AbstractRepository(abc.ABC):
 
     @abc.abstractmethod
     def get_posters_by_movies(self, movies):
-        """ Sets posters to the movies. """
+        """ Sets 'poster' on each movie dict, and 'poster_resolved' to whether its poster could be looked up in
+        time. """
         raise NotImplementedError
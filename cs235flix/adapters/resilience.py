@@ -0,0 +1,173 @@
+import threading
+import time
+
+from collections import deque
+
+
+class CircuitOpenException(Exception):
+    pass
+
+
+class SingleFlight:
+    """ Coalesces concurrent calls that share a key into one call.
+
+    The first caller for a key runs the function; callers arriving while it is still running wait for it and receive
+    the same result, or the same exception. If given, on_wait(key) is called by each such caller once it has joined
+    the running call, just before it starts waiting.
+    """
+
+    class _Call:
+        def __init__(self):
+            self.done = threading.Event()
+            self.result = None
+            self.error = None
+
+    def __init__(self, on_wait=None):
+        self._lock = threading.Lock()
+        self._calls = dict()
+        self._on_wait = on_wait
+
+    def do(self, key, function, *args, **kwargs):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = SingleFlight._Call()
+
+        if not leader:
+            if self._on_wait is not None:
+                self._on_wait(key)
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = function(*args, **kwargs)
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._calls)
+
+
+class CircuitBreaker:
+    """ Stops calling a failing dependency until it has had time to recover.
+
+    While closed, the outcome of the last window calls is recorded; a call that raises, or that takes longer than
+    slow_call_timeout seconds, counts as a failure. Once at least minimum_calls have been recorded and the share of
+    failures reaches failure_rate, the breaker opens and calls raise CircuitOpenException without running. After
+    reset_timeout seconds the breaker is half-open and lets up to half_open_calls probe calls through: if they all
+    succeed the breaker closes again, and if any fails it reopens.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_rate: float = 0.5, window: int = 20, minimum_calls: int = 5,
+                 reset_timeout: float = 30.0, half_open_calls: int = 1, slow_call_timeout: float = None,
+                 clock=time.monotonic):
+        self._failure_rate = failure_rate
+        self._outcomes = deque(maxlen=window)
+        self._minimum_calls = minimum_calls
+        self._reset_timeout = reset_timeout
+        self._half_open_calls = half_open_calls
+        self._slow_call_timeout = slow_call_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = CircuitBreaker.CLOSED
+        self._opened_at = None
+        self._probes_started = 0
+        self._probes_succeeded = 0
+        self._rejected = 0
+
+    @property
+    def state(self):
+        with self._lock:
+            self._update_state()
+            return self._state
+
+    def call(self, function, *args, **kwargs):
+        self._before_call()
+
+        start = self._clock()
+        try:
+            result = function(*args, **kwargs)
+        except Exception:
+            self._record(False)
+            raise
+
+        elapsed = self._clock() - start
+        self._record(self._slow_call_timeout is None or elapsed <= self._slow_call_timeout)
+        return result
+
+    def reset(self):
+        with self._lock:
+            self._close()
+            self._rejected = 0
+
+    def stats(self):
+        with self._lock:
+            self._update_state()
+            failures = self._outcomes.count(False)
+            return {
+                'state': self._state,
+                'calls': len(self._outcomes),
+                'failures': failures,
+                'rejected': self._rejected
+            }
+
+    def _before_call(self):
+        with self._lock:
+            self._update_state()
+            if self._state == CircuitBreaker.OPEN:
+                self._rejected += 1
+                raise CircuitOpenException
+            if self._state == CircuitBreaker.HALF_OPEN:
+                if self._probes_started >= self._half_open_calls:
+                    self._rejected += 1
+                    raise CircuitOpenException
+                self._probes_started += 1
+
+    def _record(self, success: bool):
+        with self._lock:
+            if self._state == CircuitBreaker.HALF_OPEN:
+                if not success:
+                    self._open()
+                else:
+                    self._probes_succeeded += 1
+                    if self._probes_succeeded >= self._half_open_calls:
+                        self._close()
+                return
+
+            if self._state == CircuitBreaker.OPEN:
+                # A call that started before the breaker opened; the breaker has already reacted to the failures.
+                return
+
+            self._outcomes.append(success)
+            failures = self._outcomes.count(False)
+            if len(self._outcomes) >= self._minimum_calls and failures >= self._failure_rate * len(self._outcomes):
+                self._open()
+
+    def _update_state(self):
+        if self._state == CircuitBreaker.OPEN and self._clock() - self._opened_at >= self._reset_timeout:
+            self._state = CircuitBreaker.HALF_OPEN
+            self._probes_started = 0
+            self._probes_succeeded = 0
+
+    def _open(self):
+        self._state = CircuitBreaker.OPEN
+        self._opened_at = self._clock()
+
+    def _close(self):
+        self._state = CircuitBreaker.CLOSED
+        self._opened_at = None
+        self._outcomes.clear()
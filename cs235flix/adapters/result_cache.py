@@ -0,0 +1,99 @@
+import threading
+
+from array import array
+from collections import OrderedDict
+
+from cs235flix.adapters.genre_index import parse_genre_query
+from cs235flix.adapters.text_index import STOP_WORDS
+from cs235flix.adapters.trigram_index import normalize_name
+
+DEFAULT_MAX_RANKS = 1000000
+
+
+def _genre_key(search: str):
+    # Genre searches match the same movies, in the same order, whatever the order of their terms and alternatives.
+    return frozenset((negated, frozenset(alternatives)) for negated, alternatives in parse_genre_query(search))
+
+
+def _description_key(search: str):
+    # Description searches match any of their words, other than stop words, in any order. Words are not stemmed, as
+    # the database repository also matches descriptions on the words themselves.
+    return frozenset(word for word in search.casefold().split() if word not in STOP_WORDS)
+
+
+# How each type of search normalizes its query, so that searches matching the same movies share a key. Names (the
+# actor, director and movie searches) ignore case and surrounding or repeated whitespace.
+SEARCH_KEYS = {
+    'genres': _genre_key,
+    'description': _description_key,
+}
+
+
+class SearchResultCache:
+    """ The ranks of the movies matching recent searches, for paging through search results without searching again.
+
+    Results are keyed by search type, the search normalized as that type of search matches it (see SEARCH_KEYS), and
+    the version of the catalog searched, so that adding movies makes every earlier result stale. Only the ranks are
+    kept, as an array of 8 byte integers, and each page of results fetches its movies by rank.
+
+    Memory is bounded by max_ranks, the most ranks held across every result; the least recently used results are
+    evicted to make room for a new one, and a result with more ranks than that is not kept at all.
+    """
+
+    def __init__(self, max_ranks: int = DEFAULT_MAX_RANKS):
+        self._max_ranks = max_ranks
+        self._lock = threading.Lock()
+        self._results = OrderedDict()
+        self._size = 0
+        self._stats = dict.fromkeys(('hits', 'misses', 'evictions'), 0)
+
+    def __len__(self):
+        return len(self._results)
+
+    @property
+    def size(self):
+        # The number of ranks held across every result.
+        return self._size
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats)
+
+    def ranks(self, search: str, search_type: str, version, search_ranks) -> array:
+        # Returns the ranks of the movies matching search, from an earlier search of the same version of the catalog
+        # if there was one and from search_ranks() (a search of the whole catalog, returning ranks) otherwise.
+        key = (search_type, SEARCH_KEYS.get(search_type, normalize_name)(search), version)
+        with self._lock:
+            ranks = self._results.get(key)
+            if ranks is not None:
+                self._results.move_to_end(key)
+                self._stats['hits'] += 1
+                return ranks
+            self._stats['misses'] += 1
+
+        ranks = array('q', search_ranks())
+        self._remember(key, ranks)
+        return ranks
+
+    def clear(self):
+        with self._lock:
+            self._results.clear()
+            self._size = 0
+
+    def _remember(self, key, ranks: array):
+        with self._lock:
+            previous = self._results.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous)
+            if len(ranks) > self._max_ranks:
+                return
+
+            while self._size + len(ranks) > self._max_ranks:
+                evicted_key, evicted = self._results.popitem(last=False)
+                self._size -= len(evicted)
+                self._stats['evictions'] += 1
+            self._results[key] = ranks
+            self._size += len(ranks)
+
+
+cache_instance = SearchResultCache()
@@ -0,0 +1,160 @@
+import threading
+
+from collections import OrderedDict, namedtuple
+
+from cs235flix.adapters.trigram_index import normalize_name
+
+DEFAULT_MAX_CANDIDATES = 100000
+
+
+def _actor_keys(movie):
+    return tuple(normalize_name(actor.actor_full_name) for actor in movie.actors
+                 if getattr(actor, 'actor_full_name', None) is not None)
+
+
+def _director_keys(movie):
+    name = movie.director.director_full_name
+    return () if name is None else (normalize_name(name),)
+
+
+def _title_keys(movie):
+    return normalize_name(movie.title),
+
+
+# The search types that can be refined, with the normalized names each matches a movie by.
+_NAME_KEYS = {'actor': _actor_keys, 'director': _director_keys, 'movie': _title_keys}
+
+# The last search of a session: the movies with a name containing key, in the order they were found, and the
+# positions in movies of the movies of each of those (normalized) names.
+_Search = namedtuple('_Search', ['search_type', 'key', 'version', 'movies', 'names'])
+
+
+class SearchRefinementCache:
+    """ The candidates of the last name or title search of each session, for refining searches as the user types.
+
+    A name search matches, in order of preference: movies with a name equal to the search, then (for actors and
+    directors) with the search as a whole word of a name, then with a name containing it. When a session's previous
+    search fell through to the last of these, its results are every movie with a name containing it, and they are
+    kept together with their distinct names. A search that extends the previous one (e.g. "chri" after "chr") can
+    only match movies among them, so it filters their names rather than searching the whole catalog. Searches for
+    several words of a name are not refined, as whole words can match in any order.
+
+    Memory is bounded by max_candidates, the most movies held across every session; the least recently used
+    sessions are evicted to make room for a new one.
+    """
+
+    def __init__(self, max_candidates: int = DEFAULT_MAX_CANDIDATES):
+        self._max_candidates = max_candidates
+        self._lock = threading.Lock()
+        self._searches = OrderedDict()
+        self._size = 0
+        self._stats = dict.fromkeys(('searches', 'refinements', 'evictions'), 0)
+
+    def __len__(self):
+        return len(self._searches)
+
+    @property
+    def size(self):
+        # The number of candidate movies held across every session.
+        return self._size
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats)
+
+    def search(self, session_id, search: str, search_type: str, version, search_catalog):
+        # Returns the movies matching search, refined from the previous search of session_id if possible, and from
+        # search_catalog() (a search of the whole catalog) otherwise. Candidates are only reused for the same
+        # version of the catalog.
+        key = normalize_name(search)
+        name_keys = _NAME_KEYS.get(search_type)
+        refinable = name_keys is not None and key != "" and (search_type == 'movie' or ' ' not in key)
+        if not refinable:
+            return search_catalog()
+
+        with self._lock:
+            self._stats['searches'] += 1
+            previous = self._searches.get(session_id)
+
+        if previous is not None and previous.search_type == search_type and previous.version == version and \
+                key.startswith(previous.key):
+            names = {name: positions for name, positions in previous.names.items() if key in name}
+            if len(names) > 0:
+                with self._lock:
+                    self._stats['refinements'] += 1
+                return self._refine(session_id, previous, key, names)
+
+        movies = search_catalog()
+        self.forget(session_id)
+        if 0 < len(movies) <= self._max_candidates:
+            names = self._names_of_movies(movies, name_keys, key, search_type)
+            if names is not None:
+                self._remember(session_id, _Search(search_type, key, version, movies, names))
+        return movies
+
+    def forget(self, session_id):
+        with self._lock:
+            previous = self._searches.pop(session_id, None)
+            if previous is not None:
+                self._size -= len(previous.movies)
+
+    def _refine(self, session_id, previous: _Search, key: str, names: dict):
+        # Matches key among the names of the previous search containing it, as a search of the whole catalog would:
+        # every name equal to key, or with key as a word, is among them.
+        movies = previous.movies
+        if key in names:
+            return [movies[position] for position in names[key]]
+        if previous.search_type != 'movie':
+            words = [positions for name, positions in names.items() if key in name.split()]
+            if len(words) > 0:
+                return [movies[position] for position in self._union(words)]
+
+        positions = self._union(names.values())
+        if len(positions) < len(movies):
+            movies = [movies[position] for position in positions]
+            moved = {position: index for index, position in enumerate(positions)}
+            names = {name: [moved[position] for position in name_positions] for name, name_positions in names.items()}
+        self._remember(session_id, _Search(previous.search_type, key, previous.version, movies, names))
+        return movies
+
+    def _union(self, position_lists):
+        # The positions in any of position_lists, in ascending order (the order the movies were found in).
+        position_lists = list(position_lists)
+        if len(position_lists) == 1:
+            return list(position_lists[0])
+        return sorted(set().union(*position_lists))
+
+    def _names_of_movies(self, movies, name_keys, key: str, search_type: str):
+        # Returns the positions of the movies of each of their names if movies, found by searching for key, are every
+        # movie with a name containing it: they all contain it, and none matched as an equal name or a whole word,
+        # which are preferred to containing it. Returns None otherwise.
+        names = dict()
+        for position, movie in enumerate(movies):
+            keys = [name for name in name_keys(movie) if key in name]
+            if len(keys) == 0:
+                return None
+            for name in keys:
+                names.setdefault(name, []).append(position)
+        if key in names:
+            return None
+        if search_type != 'movie' and any(key in name.split() for name in names):
+            return None
+        return names
+
+    def _remember(self, session_id, search: _Search):
+        with self._lock:
+            previous = self._searches.pop(session_id, None)
+            if previous is not None:
+                self._size -= len(previous.movies)
+            if len(search.movies) > self._max_candidates:
+                return
+
+            while self._size + len(search.movies) > self._max_candidates:
+                evicted_id, evicted = self._searches.popitem(last=False)
+                self._size -= len(evicted.movies)
+                self._stats['evictions'] += 1
+            self._searches[session_id] = search
+            self._size += len(search.movies)
+
+
+cache_instance = SearchRefinementCache()
@@ -0,0 +1,43 @@
+import hmac
+
+from werkzeug.security import generate_password_hash, check_password_hash
+
+# How passwords read from the users seed file are stored. 'hash' hashes each plaintext password while loading the
+# file; 'lazy' keeps the plaintext, marked with PLAINTEXT_PREFIX, and hashes it when its user first logs in. Passwords
+# that are already hashed in the seed file are stored as they are in either mode.
+HASH = 'hash'
+LAZY = 'lazy'
+PASSWORD_MODES = (HASH, LAZY)
+
+# Never the start of a hash made by werkzeug, whose hashes start with the name of their method.
+PLAINTEXT_PREFIX = 'seed$'
+
+HASH_METHODS = ('pbkdf2:', 'scrypt:', 'argon2')
+
+
+def is_password_hash(password: str) -> bool:
+    # Werkzeug hashes have the form method$salt$hash.
+    return password.startswith(HASH_METHODS) and password.count('$') == 2
+
+
+def is_seed_plaintext(password: str) -> bool:
+    return password.startswith(PLAINTEXT_PREFIX)
+
+
+def seed_password(password: str, mode: str = HASH) -> str:
+    # Returns what to store for a password read from the seed file.
+    if mode not in PASSWORD_MODES:
+        raise ValueError('unknown seed password mode: %r' % mode)
+
+    if is_password_hash(password):
+        return password
+    if mode == LAZY:
+        return PLAINTEXT_PREFIX + password
+    return generate_password_hash(password)
+
+
+def check_password(stored_password: str, password: str) -> bool:
+    if is_seed_plaintext(stored_password):
+        return hmac.compare_digest(stored_password[len(PLAINTEXT_PREFIX):].encode('utf-8'),
+                                   password.encode('utf-8'))
+    return check_password_hash(stored_password, password)
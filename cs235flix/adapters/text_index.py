@@ -0,0 +1,230 @@
+import heapq
+import math
+import re
+from array import array
+from functools import lru_cache
+
+try:
+    import numpy
+except ImportError:
+    # Without NumPy, scores are accumulated one posting at a time.
+    numpy = None
+
+# The most movies returned by a full-text search, most relevant first.
+TEXT_SEARCH_LIMIT = 100
+
+# BM25 parameters: how quickly repeats of a term stop adding to a score, and how much long documents are penalised.
+K1 = 1.2
+B = 0.75
+
+# Each word of a title counts as this many words of a description.
+TITLE_WEIGHT = 3
+
+# Words too common to tell documents apart.
+STOP_WORDS = frozenset([
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'but', 'by', 'for', 'from', 'has', 'he', 'her', 'his', 'in', 'into',
+    'is', 'it', 'its', 'of', 'on', 'or', 'she', 'that', 'the', 'their', 'them', 'they', 'this', 'to', 'was', 'who',
+    'whose', 'with'
+])
+
+_WORD = re.compile(r"[^\W_]+")
+
+
+def tokenize(text: str):
+    # Returns the stemmed words of text, lower case and without stop words, in order.
+    return [stem(word) for word in _WORD.findall(str(text).casefold()) if word not in STOP_WORDS]
+
+
+def _has_vowel(word: str) -> bool:
+    return any(letter in 'aeiou' for letter in word) or 'y' in word[1:]
+
+
+def _measure(word: str) -> int:
+    # The number of vowel-consonant sequences in word, as in the Porter stemmer: "tree" is 0, "trouble" 1.
+    form = ''.join('v' if letter in 'aeiou' or (letter == 'y' and index > 0 and word[index - 1] not in 'aeiou')
+                   else 'c' for index, letter in enumerate(word))
+    return form.count('vc') if form else 0
+
+
+def _ends_cvc(word: str) -> bool:
+    # Whether word ends consonant-vowel-consonant, where the last consonant is not w, x or y (e.g. "hop").
+    return len(word) >= 3 and word[-1] not in 'aeiouwxy' and word[-2] in 'aeiouy' and word[-3] not in 'aeiou'
+
+
+# Derivational suffixes, and what they are replaced with when the rest of the word has a non-zero measure.
+_SUFFIXES = [
+    ('ational', 'ate'), ('tional', 'tion'), ('enci', 'ence'), ('anci', 'ance'), ('izer', 'ize'), ('ization', 'ize'),
+    ('ation', 'ate'), ('ator', 'ate'), ('alism', 'al'), ('iveness', 'ive'), ('fulness', 'ful'), ('ousness', 'ous'),
+    ('aliti', 'al'), ('iviti', 'ive'), ('biliti', 'ble'), ('icate', 'ic'), ('ative', ''), ('alize', 'al'),
+    ('ical', 'ic'), ('ful', ''), ('ness', ''), ('ement', ''), ('ment', ''),
+]
+
+
+@lru_cache(maxsize=65536)
+def stem(word: str) -> str:
+    """ Reduces an English word to its stem, so that e.g. "hunting", "hunted" and "hunts" are indexed as one term.
+
+    A shortened form of the Porter stemmer: plurals, past tenses and gerunds are removed, a final "y" after a
+    consonant becomes "i", the commonest derivational suffixes are replaced and a final "e" is dropped from longer
+    words.
+    """
+    if len(word) <= 3 or not word.isalpha():
+        return word
+
+    if word.endswith('sses') or word.endswith('ies'):
+        word = word[:-2]
+    elif word.endswith('s') and not word.endswith('ss') and not word.endswith('us'):
+        word = word[:-1]
+
+    if word.endswith('eed'):
+        if _measure(word[:-3]) > 0:
+            word = word[:-1]
+    else:
+        for suffix in ('ed', 'ing'):
+            if word.endswith(suffix) and _has_vowel(word[:-len(suffix)]):
+                word = word[:-len(suffix)]
+                if word.endswith(('at', 'bl', 'iz')):
+                    word += 'e'
+                elif len(word) > 1 and word[-1] == word[-2] and word[-1] not in 'lsz':
+                    word = word[:-1]
+                elif _measure(word) == 1 and _ends_cvc(word):
+                    word += 'e'
+                break
+
+    if word.endswith('y') and _has_vowel(word[:-1]):
+        word = word[:-1] + 'i'
+
+    for suffix, replacement in _SUFFIXES:
+        if word.endswith(suffix):
+            if _measure(word[:-len(suffix)]) > 0:
+                word = word[:-len(suffix)] + replacement
+            break
+
+    if word.endswith('e'):
+        measure = _measure(word[:-1])
+        if measure > 1 or (measure == 1 and not _ends_cvc(word[:-1])):
+            word = word[:-1]
+    return word
+
+
+class TextIndex:
+    """ Full-text index of documents (numbered from 0), each a title and a description, ranked with BM25.
+
+    Every term maps to a posting list: the numbers of the documents containing it, in ascending order, and how often
+    it occurs in each, with words of the title counted TITLE_WEIGHT times. A search scores only the documents in the
+    posting lists of its terms, and keeps the best with a heap. With NumPy, the scores of each posting list are
+    computed at once.
+    """
+
+    def __init__(self):
+        self._postings = dict()
+        self._lengths = array('i')
+        self._total_length = 0
+
+    def __len__(self):
+        return len(self._lengths)
+
+    def add(self, title: str, description: str):
+        document = len(self._lengths)
+        frequencies = self._frequencies(title, description)
+        for term, frequency in frequencies.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = (array('i'), array('i'))
+            postings[0].append(document)
+            postings[1].append(frequency)
+
+        length = sum(frequencies.values())
+        self._lengths.append(length)
+        self._total_length += length
+
+    def add_many(self, documents):
+        # Adds (title, description) pairs. The same as calling add for each of them.
+        for title, description in documents:
+            self.add(title, description)
+
+    def _frequencies(self, title: str, description: str) -> dict:
+        frequencies = dict()
+        for term in tokenize(title or ""):
+            frequencies[term] = frequencies.get(term, 0) + TITLE_WEIGHT
+        for term in tokenize(description or ""):
+            frequencies[term] = frequencies.get(term, 0) + 1
+        return frequencies
+
+    def search(self, query: str, limit: int = TEXT_SEARCH_LIMIT):
+        # Returns up to limit (document, score) pairs for the documents containing any term of query, best first.
+        # Documents with equal scores are in ascending order.
+        count = len(self)
+        postings = [self._postings_of(term) for term in set(tokenize(query))]
+        postings = [(documents, frequencies) for documents, frequencies in postings if len(documents) > 0]
+        if count == 0 or len(postings) == 0 or limit <= 0:
+            return []
+
+        average_length = self._total_length / count
+        weighted = [(documents, frequencies, self._idf(len(documents), count)) for documents, frequencies in postings]
+        if numpy is not None:
+            return self._search_with_numpy(weighted, average_length, limit)
+        return self._search(weighted, average_length, limit)
+
+    def _idf(self, document_frequency: int, count: int) -> float:
+        return math.log(1 + (count - document_frequency + 0.5) / (document_frequency + 0.5))
+
+    def _postings_of(self, term: str):
+        return self._postings.get(term, ((), ()))
+
+    def _search_with_numpy(self, weighted, average_length: float, limit: int):
+        # Views of the arrays are only held during the search, as arrays can't grow while a view of them exists.
+        lengths = numpy.frombuffer(self._lengths, dtype=memoryview(self._lengths).format)
+        scores = numpy.zeros(len(self))
+        for documents, frequencies, idf in weighted:
+            documents = numpy.frombuffer(documents, dtype=memoryview(documents).format)
+            frequencies = numpy.frombuffer(frequencies, dtype=memoryview(frequencies).format).astype(numpy.float64)
+            norms = K1 * (1 - B + B * lengths[documents] / average_length)
+            scores[documents] += idf * frequencies * (K1 + 1) / (frequencies + norms)
+
+        matches = numpy.flatnonzero(scores)
+        if len(matches) > limit:
+            threshold = numpy.partition(scores[matches], len(matches) - limit)[len(matches) - limit]
+            matches = matches[scores[matches] >= threshold]
+        order = numpy.lexsort((matches, -scores[matches]))[:limit]
+        return [(int(document), float(scores[document])) for document in matches[order]]
+
+    def _search(self, weighted, average_length: float, limit: int):
+        lengths = self._lengths
+        scores = dict()
+        for documents, frequencies, idf in weighted:
+            for document, frequency in zip(documents, frequencies):
+                norm = K1 * (1 - B + B * lengths[document] / average_length)
+                scores[document] = scores.get(document, 0.0) + idf * frequency * (K1 + 1) / (frequency + norm)
+        return heapq.nsmallest(limit, scores.items(), key=lambda item: (-item[1], item[0]))
+
+    def terms(self):
+        # The terms in the index, with their posting lists.
+        return self._postings.items()
+
+    def lengths(self):
+        # The length of each document, in weighted terms.
+        return self._lengths
+
+
+class MovieTextIndex(TextIndex):
+    """ Full-text index of the titles and descriptions of movies.
+
+    Every movie added becomes the next document, so the movies matching a search are found from their document
+    numbers.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._movies = list()
+
+    def add_movie(self, movie):
+        self.add(movie.title, movie.description)
+        self._movies.append(movie)
+
+    def add_movies(self, movies):
+        for movie in movies:
+            self.add_movie(movie)
+
+    def movies(self, query: str, limit: int = TEXT_SEARCH_LIMIT):
+        return [self._movies[document] for document, score in self.search(query, limit)]
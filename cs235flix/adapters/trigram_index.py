@@ -0,0 +1,104 @@
+from collections import Counter
+
+# The number of closest names whose movies are returned when a search has no exact or substring matches.
+FUZZY_MATCH_LIMIT = 5
+
+
+def normalize_name(name: str) -> str:
+    # Names and titles are searched case-insensitively and with collapsed whitespace.
+    return " ".join(str(name).lower().split())
+
+
+def trigrams(text: str) -> set:
+    # The text is padded so that the start and end of the string, and so of a name, produce trigrams of their own.
+    padded = "  " + text + " "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TrigramIndex:
+    """ Index of strings by their character trigrams, for substring and typo-tolerant lookups.
+
+    Each string added gets an integer id, and every trigram maps to the set of ids of the strings containing it. A
+    substring query intersects the postings of the query's trigrams, starting with the rarest, and only checks the
+    strings that survive. A fuzzy query ranks the strings sharing trigrams with the query by their similarity.
+    Strings should be normalized (e.g. lower case) before they are added and queried.
+    """
+
+    def __init__(self):
+        self._strings = list()
+        self._ids = dict()
+        self._trigram_counts = list()
+        self._postings = dict()
+
+    def __len__(self):
+        return len(self._strings)
+
+    def __contains__(self, text):
+        return text in self._ids
+
+    def add(self, text: str):
+        self.add_many((text,))
+
+    def add_many(self, texts):
+        # Adds each of texts not already indexed, with the next free id.
+        strings = self._strings
+        ids = self._ids
+        trigram_counts = self._trigram_counts
+        postings = self._postings
+        for text in texts:
+            if text in ids:
+                continue
+
+            string_id = ids[text] = len(strings)
+            strings.append(text)
+
+            text_trigrams = trigrams(text)
+            trigram_counts.append(len(text_trigrams))
+            for trigram in text_trigrams:
+                posting = postings.get(trigram)
+                if posting is None:
+                    postings[trigram] = {string_id}
+                else:
+                    posting.add(string_id)
+
+    def substring(self, query: str):
+        # Returns the indexed strings containing query, in the order they were added.
+        if len(query) < 3:
+            return [text for text in self._strings if query in text]
+
+        query_trigrams = set(query[i:i + 3] for i in range(len(query) - 2))
+        postings = []
+        for trigram in query_trigrams:
+            posting = self._postings.get(trigram)
+            if posting is None:
+                return []
+            postings.append(posting)
+
+        postings.sort(key=len)
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            candidates &= posting
+            if len(candidates) == 0:
+                return []
+
+        # Trigrams can match in a different order to the query, so confirm each candidate.
+        return [self._strings[string_id] for string_id in sorted(candidates) if query in self._strings[string_id]]
+
+    def fuzzy(self, query: str, limit: int = 10, threshold: float = 0.3):
+        # Returns up to limit (string, similarity) pairs, most similar first. Similarity is the Jaccard index of the
+        # two trigram sets, and strings scoring below threshold are left out.
+        query_trigrams = trigrams(query)
+        shared = Counter()
+        for trigram in query_trigrams:
+            posting = self._postings.get(trigram)
+            if posting is not None:
+                shared.update(posting)
+
+        matches = []
+        for string_id, count in shared.items():
+            similarity = count / (len(query_trigrams) + self._trigram_counts[string_id] - count)
+            if similarity >= threshold:
+                matches.append((self._strings[string_id], similarity))
+
+        matches.sort(key=lambda match: (-match[1], match[0]))
+        return matches[:limit]
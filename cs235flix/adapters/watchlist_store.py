@@ -0,0 +1,39 @@
+from itertools import islice
+
+
+class WatchlistStore:
+    """ The watchlists of every user, as ordered sets of movie ranks.
+
+    Each username maps to a dict whose keys are the ranks in that user's watchlist, in the order they were added, so
+    adding, removing and checking a movie are dictionary operations whatever the size of the watchlist.
+    """
+
+    def __init__(self):
+        self._watchlists = dict()
+
+    def add(self, username: str, rank: int):
+        self._watchlists.setdefault(username, dict())[rank] = None
+
+    def remove(self, username: str, rank: int):
+        watchlist = self._watchlists.get(username)
+        if watchlist is not None:
+            watchlist.pop(rank, None)
+
+    def contains(self, username: str, rank: int) -> bool:
+        return rank in self._watchlists.get(username, ())
+
+    def contains_many(self, username: str, ranks) -> set:
+        # Returns those of ranks that are in the user's watchlist.
+        watchlist = self._watchlists.get(username)
+        if not watchlist:
+            return set()
+        return set(rank for rank in ranks if rank in watchlist)
+
+    def size(self, username: str) -> int:
+        return len(self._watchlists.get(username, ()))
+
+    def ranks(self, username: str, cursor: int = 0, count: int = None):
+        # Returns up to count ranks of the user's watchlist, starting at position cursor.
+        watchlist = self._watchlists.get(username, ())
+        stop = None if count is None else cursor + count
+        return list(islice(watchlist, cursor, stop))
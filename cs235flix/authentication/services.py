@@ -1,6 +1,7 @@
-from werkzeug.security import generate_password_hash, check_password_hash
+from werkzeug.security import generate_password_hash
 
 from cs235flix.adapters.repository import AbstractRepository
+from cs235flix.adapters.seed_passwords import check_password, is_seed_plaintext
 from cs235flix.domain.model import User
 
 
@@ -18,8 +19,7 @@ class AuthenticationException(Exception):
 
 def add_user(username: str, password: str, repo: AbstractRepository):
     # Check that the given username is available
-    user = repo.get_user(username)
-    if user is not None:
+    if repo.has_user(username):
         raise NameNotUniqueException
 
     # Encrypt password so that the database doesn't store passwords 'in the clear'.
@@ -43,10 +43,14 @@ def authenticate_user(username: str, password: str, repo: AbstractRepository):
 
     user = repo.get_user(username)
     if user is not None:
-        authenticated = check_password_hash(user.password, password)
+        authenticated = check_password(user.password, password)
     if not authenticated:
         raise AuthenticationException
 
+    if is_seed_plaintext(user.password):
+        # Seed users loaded without hashing their passwords have them hashed on their first login.
+        repo.update_user_password(user, generate_password_hash(password))
+
 
 # ===================================================
 # Functions to convert model entities to dictionaries
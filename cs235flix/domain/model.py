@@ -3,13 +3,15 @@ from typing import List, Iterable
 
 
 class Actor:
+    __slots__ = ('__actor_full_name', '_actor_colleagues')
 
     def __init__(self, actor_full_name: str):
         if actor_full_name == "" or type(actor_full_name) is not str:
             self.__actor_full_name = None
         else:
             self.__actor_full_name: str = actor_full_name.strip()
-        self._actor_colleagues: list = []
+        # Most actors have no colleagues recorded, so the list is only created for the first one.
+        self._actor_colleagues: list = None
 
     @property
     def actor_full_name(self) -> str:
@@ -30,13 +32,17 @@ class Actor:
         return hash(self.__actor_full_name)
 
     def add_actor_colleague(self, colleague):
+        if self._actor_colleagues is None:
+            self._actor_colleagues = []
         self._actor_colleagues.append(colleague)
 
     def check_if_this_actor_worked_with(self, colleague) -> bool:
-        return colleague in self._actor_colleagues
+        return self._actor_colleagues is not None and colleague in self._actor_colleagues
 
 
 class Genre:
+    __slots__ = ('_genre_name',)
+
     def __init__(
             self, genre_name: str
     ):
@@ -65,6 +71,8 @@ class Genre:
 
 
 class Director:
+    __slots__ = ('__director_full_name',)
+
     def __init__(self, director_full_name: str):
         if director_full_name == "" or type(director_full_name) is not str:
             self.__director_full_name = None
@@ -90,6 +98,8 @@ class Director:
         return hash(self.__director_full_name)
 
 
+# User, Review and Movie are mapped to database tables by SQLAlchemy (see adapters/orm.py), which keeps each mapped
+# instance's state in its __dict__, so unlike the other model classes they do not declare __slots__.
 class User:
     def __init__(
             self, username: str, password: str
@@ -106,6 +116,10 @@ class User:
     def password(self) -> str:
         return self._password
 
+    @password.setter
+    def password(self, password: str):
+        self._password = password
+
     @property
     def reviews(self) -> Iterable['Review']:
         return iter(self._reviews)
@@ -178,10 +192,14 @@ class Movie:
         self.__rank: int = int(rank)
         self.__release_date: int = release_date
         self.__description: str = description
-        self.__director: Director = Director(director)
+        self.__director: Director = director if isinstance(director, Director) else Director(director)
         self.__actors: list = actors
         self.__genres: list = genres
         self.__runtime_minutes: int = 0
+        self.__rating: float = None
+        self.__votes: int = None
+        self.__revenue: float = None
+        self.__metascore: int = None
         self.__reviews: List[Review] = list()
         self.__poster: str = ""
 
@@ -217,6 +235,22 @@ class Movie:
     def runtime_minutes(self) -> int:
         return self.__runtime_minutes
 
+    @property
+    def rating(self) -> float:
+        return self.__rating
+
+    @property
+    def votes(self) -> int:
+        return self.__votes
+
+    @property
+    def revenue(self) -> float:
+        return self.__revenue
+
+    @property
+    def metascore(self) -> int:
+        return self.__metascore
+
     @property
     def reviews(self) -> Iterable[Review]:
         return iter(self.__reviews)
@@ -231,7 +265,7 @@ class Movie:
 
     @title.setter
     def title(self, title):
-        self.__title = title
+        self.__movie_title = title
 
     @release_date.setter
     def release_date(self, release_date):
@@ -253,6 +287,34 @@ class Movie:
         else:
             raise ValueError
 
+    @rating.setter
+    def rating(self, rating):
+        if 0 <= rating <= 10:
+            self.__rating = float(rating)
+        else:
+            raise ValueError
+
+    @votes.setter
+    def votes(self, votes):
+        if votes >= 0:
+            self.__votes = int(votes)
+        else:
+            raise ValueError
+
+    @revenue.setter
+    def revenue(self, revenue):
+        if revenue >= 0:
+            self.__revenue = float(revenue)
+        else:
+            raise ValueError
+
+    @metascore.setter
+    def metascore(self, metascore):
+        if 0 <= metascore <= 100:
+            self.__metascore = int(metascore)
+        else:
+            raise ValueError
+
     def __repr__(self) -> str:
         reprstring = "<Movie " + self.__movie_title + ", " + str(self.__release_date) + ">"
         return reprstring
@@ -301,6 +363,8 @@ class Movie:
 
 
 class WatchList:
+    __slots__ = ('__user', '__watchlist', '__size', 'i')
+
     def __init__(self, user: User):
         self.__user: User = user
         self.__watchlist: list = []
@@ -13,6 +13,7 @@ import cs235flix.utilities.utilities as utilities
 import cs235flix.utilities.services as util_services
 import cs235flix.movies.services as services
 
+from cs235flix.adapters.page_query import PageQuery
 from cs235flix.authentication.authentication import login_required
 from cs235flix.search.search import results_helper
 
@@ -78,6 +79,66 @@ def movies_by_date():
     )
 
 
+@movies_blueprint.route('/browse_by_filter', methods=['GET'])
+def movies_by_filter():
+    movies_per_page = 10
+
+    # Read query parameters. The filter parameters are carried over to every link on the page.
+    movie_filter = services.parse_movie_filter(request.args)
+    filter_args = services.filter_parameters(request.args)
+    movie_to_show_reviews = request.args.get('view_reviews_for')
+    cursor = request.args.get('cursor')
+
+    if cursor is None:
+        cursor = 0
+    else:
+        cursor = int(cursor)
+
+    movies, count = services.get_movies_by_filter(movie_filter, cursor, movies_per_page, repo.repo_instance)
+    services.mark_watchlist(movies, session.get('username'), repo.repo_instance)
+
+    first_movie_url = None
+    last_movie_url = None
+    next_movie_url = None
+    prev_movie_url = None
+
+    if cursor > 0:
+        # There are preceding movies
+        prev_movie_url = url_for('movies_bp.movies_by_filter', cursor=max(cursor - movies_per_page, 0), **filter_args)
+        first_movie_url = url_for('movies_bp.movies_by_filter', **filter_args)
+
+    if cursor + movies_per_page < count:
+        # There are further movies
+        next_movie_url = url_for('movies_bp.movies_by_filter', cursor=cursor + movies_per_page, **filter_args)
+
+        last_cursor = services.get_last_cursor(count, movies_per_page)
+        last_movie_url = url_for('movies_bp.movies_by_filter', cursor=last_cursor, **filter_args)
+
+    for movie in movies:
+        movie['view_review_url'] = url_for('movies_bp.movies_by_filter', view_reviews_for=movie['rank'], cursor=cursor,
+                                           **filter_args)
+        movie['add_review_url'] = url_for('movies_bp.review_on_movie', movie=movie['rank'])
+        movie['add_to_watchlist_url'] = url_for('movies_bp.add_to_watchlist', movie=movie['rank'], page='filter',
+                                                cursor=cursor, **filter_args)
+
+    if movie_to_show_reviews is not None:
+        movie_to_show_reviews = int(movie_to_show_reviews)
+
+    return render_template(
+        'movies/browse_movies.html',
+        title='Movies',
+        movies=movies,
+        count=count,
+        filter_args=filter_args,
+        show_reviews_for_movies=movie_to_show_reviews,
+        first_movie_url=first_movie_url,
+        last_movie_url=last_movie_url,
+        prev_movie_url=prev_movie_url,
+        next_movie_url=next_movie_url,
+        page='filter'
+    )
+
+
 @movies_blueprint.route('/review', methods=['GET', 'POST'])
 @login_required
 def review_on_movie():
@@ -112,7 +173,7 @@ def review_on_movie():
 
         # Cause the web browser to display the page of all movies that have the same date as the reviewed movie,
         # and display all reviews, including the new review.
-        if get_search_type == "actor" or get_search_type == "director" or get_search_type == "genres" or get_search_type == "movie":
+        if get_search_type in ("actor", "director", "genres", "movie", "description"):
             return redirect(
                 url_for('search_bp.results', search=get_search, cursor=int(get_search_cursor),
                         search_type=get_search_type))
@@ -169,6 +230,9 @@ def review_on_movie():
 @movies_blueprint.route('/watchlist', methods=['GET'])
 @login_required
 def watchlist():
+    # Obtain the username of the currently logged in user.
+    username = session['username']
+
     movies_per_page = 5
 
     # Read query parameters
@@ -180,12 +244,9 @@ def watchlist():
     else:
         cursor = int(cursor)
 
-    watch_list_list = services.get_watchlist(repo.repo_instance)
-    watchlist_dict = services.get_dict_watchlist(repo.repo_instance)
-
-    movie_ranks = services.get_movie_ranks(watch_list_list, repo.repo_instance)
-    watch_list = services.get_movies_in_watchlist(movie_ranks[cursor:cursor + movies_per_page], repo.repo_instance)
-    services.get_posters(watch_list, repo.repo_instance)
+    # Only the movies on this page are read from the user's watchlist.
+    watchlist_size = services.get_watchlist_size(username, repo.repo_instance)
+    watch_list = services.get_movies_in_watchlist(username, cursor, movies_per_page, repo.repo_instance)
 
     first_movie_url = None
     last_movie_url = None
@@ -197,18 +258,18 @@ def watchlist():
         prev_movie_url = url_for('movies_bp.watchlist', cursor=cursor - movies_per_page)
         first_movie_url = url_for('movies_bp.watchlist')
 
-    if cursor + movies_per_page < len(movie_ranks):
+    if cursor + movies_per_page < watchlist_size:
         # There are further movies
         next_movie_url = url_for('movies_bp.watchlist', cursor = cursor + movies_per_page)
 
-        last_cursor = movies_per_page * int(len(movie_ranks) / movies_per_page)
-        if len(movie_ranks) % movies_per_page == 0:
-            last_cursor -= movies_per_page
+        last_cursor = services.get_last_cursor(watchlist_size, movies_per_page)
         last_movie_url = url_for('movies_bp.watchlist', cursor=last_cursor)
 
     for movie in watch_list:
         movie['add_review_url'] = url_for('movies_bp.review_on_movie', movie=movie['rank'], search_type="watchlist", search_cursor=cursor)
         movie['view_review_url'] = url_for('movies_bp.watchlist', view_reviews_for=movie['rank'], cursor=cursor)
+        movie['remove_from_watchlist_url'] = url_for('movies_bp.remove_from_watchlist', movie=movie['rank'],
+                                                     cursor=cursor)
 
     if movie_to_show_reviews is not None:
         movie_to_show_reviews = int(movie_to_show_reviews)
@@ -240,7 +301,6 @@ def add_to_watchlist():
     name = request.args.get('name')
     movie_plural = request.args.get('movie_plural')
     count = request.args.get('count')
-    search_movie_poster = request.args.get('search_movie_poster')
     search_text = request.args.get('search_text')
     show_reviews_for_movies = request.args.get('show_reviews_for_movies')
     page = request.args.get('page')
@@ -259,14 +319,19 @@ def add_to_watchlist():
     years_dict = dict()
 
     # Add movie to the user's watchlist.
-    services.add_to_watchlist(int(movie_rank), repo.repo_instance)
+    services.add_to_watchlist(int(movie_rank), username, repo.repo_instance)
+
+    if page == "filter":
+        # Return to the same page of the filtered movies.
+        return redirect(url_for('movies_bp.movies_by_filter', cursor=cursor,
+                                **services.filter_parameters(request.args)))
 
     # If user added to watchlist via search page
     if page == "search":
         # Get list of movies previously on user's web page.
         movies_per_page = int(movies_per_page)
-        search_movies, specification, search, count, plural, first_movie_url, last_movie_url, next_movie_url, prev_movie_url, movie_for_poster = results_helper(
-            search_type, movie_to_show_reviews, search_cursor, movies_per_page)
+        search_movies, specification, search, count, plural, first_movie_url, last_movie_url, next_movie_url, prev_movie_url = results_helper(
+            search_text, search_type, movie_to_show_reviews, search_cursor, movies_per_page)
 
         redirect(url_for('search_bp.results', search=search_text, cursor=search_cursor, view_reviews_for=movie_rank))
 
@@ -301,7 +366,6 @@ def add_to_watchlist():
         movie_plural=movie_plural,
         page=page,
         search_type=search_type,
-        search_movie_poster=search_movie_poster,
         search_text=search_text,
         show_reviews_for_movies=show_reviews_for_movies,
         movies_title=target_date,
@@ -315,15 +379,24 @@ def add_to_watchlist():
     )
 
 
-def movies_by_date_helper(cursor: int, starting_cursor: int, max_cursor: int, prev_cursor: int, target_date: int,
-                          movie_to_show_reviews: int, movies_per_page: int):
-    global prev_max_cursor
-    starting_year_movies, previous_date2, next_date2 = services.get_movies_by_date(2006, repo.repo_instance)
-    starting_ranks_len = len(starting_year_movies)
-    starting_max_cursor = math.ceil(starting_ranks_len)
+@movies_blueprint.route('/remove_from_watchlist', methods=['GET'])
+@login_required
+def remove_from_watchlist():
+    # Obtain the username of the currently logged in user.
+    username = session['username']
+
+    # Read query parameters
+    movie_rank = int(request.args.get('movie'))
+    cursor = request.args.get('cursor')
+
+    # Remove movie from the user's watchlist, and return to the same page of the watchlist.
+    services.remove_from_watchlist(movie_rank, username, repo.repo_instance)
+
+    return redirect(url_for('movies_bp.watchlist', cursor=cursor))
 
-    current_max_cursor = starting_max_cursor
 
+def movies_by_date_helper(cursor: int, starting_cursor: int, max_cursor: int, prev_cursor: int, target_date: int,
+                          movie_to_show_reviews: int, movies_per_page: int):
     if cursor is None or cursor == "0" or cursor == '':
         # No cursor query parameter so initialise cursor to start at the beginning.
         cursor = 0
@@ -336,22 +409,15 @@ def movies_by_date_helper(cursor: int, starting_cursor: int, max_cursor: int, pr
     else:
         current_starting_cursor = 0
 
-    if max_cursor is not None and max_cursor != '':
-        current_max_cursor = int(max_cursor)
-
     if prev_cursor is not None:
         prev_cursor = int(prev_cursor)
 
-    # Fetch the first and last movies in the series
-    first_movie = services.get_first_date(repo.repo_instance)
-    last_movie = services.get_last_date(repo.repo_instance)
-
     if target_date is None:
         # No date query parameter, so return movies from earliest movie release date.
-        target_date = first_movie['year']
+        query = PageQuery.earliest_year()
     else:
         # Convert target_date from string to int.
-        target_date = int(target_date)
+        query = PageQuery.by_year(target_date)
 
     if movie_to_show_reviews is None:
         # No view-reviews query parameter, so set to a non-existent movie rank.
@@ -360,49 +426,42 @@ def movies_by_date_helper(cursor: int, starting_cursor: int, max_cursor: int, pr
         # Convert movie_to_show_reviews from string to int.
         movie_to_show_reviews = int(movie_to_show_reviews)
 
-    # Fetch movie(s) for the target date. This call also returns the previous and next dates for movies immediately
-    # before and after the target date.
-    movies, previous_date, next_date = services.get_movies_by_date(target_date, repo.repo_instance)
-
-    # Retrieve movie ranks for movies released in that year.
-    movie_ranks = services.get_movie_ranks(movies, repo.repo_instance)
-
-    # Retrieve the batch of movies to display on web page
-    movie_batch = services.get_movies_by_type(movie_ranks[cursor:cursor + movies_per_page], repo.repo_instance)
-    watch_list = services.get_watchlist(repo.repo_instance)
-
-    services.get_posters(movie_batch, repo.repo_instance)
-
-    for m in movie_batch:
-        for added_movie in watch_list:
-            if int(m['rank']) == int(added_movie.rank):
-                m['watchlist'] = True
+    # Fetch the batch of movies to display on web page for the target date with a single repository call. The page
+    # also carries the number of movies released in every year, and the previous and next dates for movies
+    # immediately before and after the target date.
+    movie_batch, page = util_services.get_movie_page(query, cursor, movies_per_page, session.get('username'),
+                                                     services.movies_to_dict, repo.repo_instance)
+    target_date = page.year
+    previous_date, next_date = page.previous_year, page.next_year
+    year_counts = page.year_counts
+    years_list = list(year_counts)
+    first_year = years_list[0]
+    last_year = years_list[-1]
+
+    current_max_cursor = year_counts[first_year]
+    if max_cursor is not None and max_cursor != '':
+        current_max_cursor = int(max_cursor)
 
     first_movie_url = None
     last_movie_url = None
     next_movie_url = None
     prev_movie_url = None
 
-    movie_ranks_len = len(movie_ranks)
+    movie_ranks_len = page.total
 
     # Get previous max cursor and previous cursor
     if previous_date is not None:
-        prev_movies, prev_previous_date, prev_next_date = services.get_movies_by_date(int(target_date) - 1, repo.repo_instance)
-        prev_max_cursor = math.ceil(len(prev_movies))
-        extra = int(len(prev_movies)) % 10
-        prev_cursor = int(len(prev_movies)) - extra
+        prev_max_cursor = year_counts[previous_date]
+        prev_cursor = services.get_last_cursor(prev_max_cursor, movies_per_page)
 
     # Get last max cursor and cursor
-    last_movies, last_previous_date, last_next_date = services.get_movies_by_date(int(last_movie['year']),
-                                                                                  repo.repo_instance)
-    extra = int(len(last_movies)) % 10
-    last_max_cursor = math.ceil(len(last_movies))
-    last_cursor = int(len(last_movies)) - extra
+    last_max_cursor = year_counts[last_year]
+    last_cursor = services.get_last_cursor(last_max_cursor, movies_per_page)
 
-    if len(movies) > 0:
+    if page.total > 0:
         # Generate the URL for the first navigation button for all pages except the first.
         if previous_date is not None or (cursor > 0 and previous_date is None):
-            first_movie_url = url_for('movies_bp.movies_by_date', date=first_movie['year'])
+            first_movie_url = url_for('movies_bp.movies_by_date', date=first_year)
 
         # Generate the URL for the next navigation button for the earliest date.
         if previous_date is None:
@@ -439,15 +498,13 @@ def movies_by_date_helper(cursor: int, starting_cursor: int, max_cursor: int, pr
 
         # Generate the URL for the last navigation button for all pages except the last.
         if next_date is None and (cursor + movies_per_page <= math.ceil(movie_ranks_len)) or next_date is not None:
-            last_movie_url = url_for('movies_bp.movies_by_date', date=last_movie['year'], cursor=last_cursor,
+            last_movie_url = url_for('movies_bp.movies_by_date', date=last_year, cursor=last_cursor,
                                      starting_cursor=0, max_cursor=last_max_cursor)
 
-        years_list = services.get_years(repo.repo_instance)
         years_url = []
         for year in years_list:
-            year_movies, year_previous_date, year_next_date = services.get_movies_by_date(int(year), repo.repo_instance)
             years_url.append(
-                url_for('movies_bp.movies_by_date', date=year, cursor=0, max_cursor=math.ceil(len(year_movies))))
+                url_for('movies_bp.movies_by_date', date=year, cursor=0, max_cursor=year_counts[year]))
         years_dict = services.get_years_dict(years_list, years_url, repo.repo_instance)
 
         return movie_batch, first_movie_url, last_movie_url, prev_movie_url, next_movie_url, target_date, years_dict
@@ -1,5 +1,7 @@
-from typing import Iterable, List
+import math
+from typing import Iterable
 
+from cs235flix.adapters.movie_filter import MovieFilter, NUMERIC_FIELDS
 from cs235flix.adapters.repository import AbstractRepository
 from cs235flix.domain.model import make_review, Movie, Review
 
@@ -99,22 +101,34 @@ def get_movies_by_type(rank_list: list, repo: AbstractRepository):
     return movies_as_dict
 
 
-def add_to_watchlist(movie_rank: int, repo: AbstractRepository):
+def add_to_watchlist(movie_rank: int, username: str, repo: AbstractRepository):
     # Check that the movie exists
     movie = repo.get_movie(movie_rank)
     if movie is None:
         raise NonExistentMovieException
 
     # Update the repository
-    repo.add_to_watchlist(movie)
+    repo.add_to_watchlist(username, movie)
 
-    add = repo.check_if_added(movie_rank)
 
+def remove_from_watchlist(movie_rank: int, username: str, repo: AbstractRepository):
+    # Check that the movie exists
+    movie = repo.get_movie(movie_rank)
+    if movie is None:
+        raise NonExistentMovieException
 
-def get_watchlist(repo: AbstractRepository):
-    watchlist = repo.get_movie_watchlist()
+    # Update the repository
+    repo.remove_from_watchlist(username, movie)
 
-    return watchlist
+
+def mark_watchlist(movies: list, username: str, repo: AbstractRepository):
+    # Flag the movies (in dict form) that are in the user's watchlist, with one repository call for the whole page.
+    if username is None:
+        return
+
+    added = repo.check_if_added_many(username, [movie['rank'] for movie in movies])
+    for movie in movies:
+        movie['watchlist'] = movie['rank'] in added
 
 
 def search_for_type(search: str, search_type: str, repo: AbstractRepository):
@@ -124,15 +138,12 @@ def search_for_type(search: str, search_type: str, repo: AbstractRepository):
     return movies
 
 
-def get_dict_watchlist(repo: AbstractRepository):
-    watchlist = repo.get_movie_watchlist()
+def get_watchlist_size(username: str, repo: AbstractRepository):
+    return repo.get_watchlist_size(username)
 
-    watchlist_as_dict = movies_to_dict(watchlist)
-    return watchlist_as_dict
 
-
-def get_movies_in_watchlist(rank_list: list, repo: AbstractRepository):
-    movies = repo.get_movies_by_rank(rank_list)
+def get_movies_in_watchlist(username: str, cursor: int, movies_per_page: int, repo: AbstractRepository):
+    movies = repo.get_movie_watchlist(username, cursor, movies_per_page)
 
     # Convert Movies to dictionary form.
     movies_as_dict = movies_to_dict(movies)
@@ -140,14 +151,51 @@ def get_movies_in_watchlist(rank_list: list, repo: AbstractRepository):
     return movies_as_dict
 
 
+def filter_parameters(args):
+    # Returns the query parameters of args that describe a movie filter: <field>_min and <field>_max bounds for the
+    # numeric fields, sort (a field to sort by) and order ("asc" or "desc"). Empty parameters are left out.
+    names = [field + suffix for field in NUMERIC_FIELDS for suffix in ('_min', '_max')] + ['sort', 'order']
+    return {name: args.get(name) for name in names if args.get(name) not in (None, '')}
+
+
+def parse_movie_filter(args) -> MovieFilter:
+    # Reads a MovieFilter from the query parameters described in filter_parameters. Bounds that are not numbers and
+    # unknown sort fields are ignored.
+    ranges = {field: (_read_bound(args.get(field + '_min')), _read_bound(args.get(field + '_max')))
+              for field in NUMERIC_FIELDS}
+    sort_by = args.get('sort')
+    if sort_by not in NUMERIC_FIELDS:
+        sort_by = None
+    return MovieFilter(ranges, sort_by, args.get('order') == 'desc')
+
+
+def _read_bound(value):
+    try:
+        bound = float(value)
+    except (TypeError, ValueError):
+        return None
+    return bound if math.isfinite(bound) else None
+
+
+def get_movies_by_filter(movie_filter: MovieFilter, cursor: int, movies_per_page: int, repo: AbstractRepository):
+    # Returns the page of movies (as dicts) from cursor, and the number of movies matching movie_filter.
+    movies, count = repo.get_movies_by_filter(movie_filter, cursor, movies_per_page)
+
+    return movies_to_dict(movies), count
+
+
 def get_years(repo: AbstractRepository):
     years_list = repo.years_list()
 
     return years_list
 
 
-def get_posters(movies: List[Movie], repo: AbstractRepository):
-    repo.get_posters_by_movies(movies)
+def get_last_cursor(count: int, movies_per_page: int):
+    # Returns the cursor of the last page of a list of count movies.
+    last_cursor = count - count % movies_per_page
+    if last_cursor == count and count > 0:
+        last_cursor -= movies_per_page
+    return last_cursor
 
 
 # ============================================
@@ -164,6 +212,11 @@ def movie_to_dict(movie: Movie):
         'director': movie.director,
         'actors': movie.actors,
         'genres': movie.genres,
+        'runtime': movie.runtime_minutes or None,
+        'rating': movie.rating,
+        'votes': movie.votes,
+        'revenue': movie.revenue,
+        'metascore': movie.metascore,
         'reviews': reviews_to_dict(movie.reviews),
         'watchlist': False,
         'poster': None
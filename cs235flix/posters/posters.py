@@ -0,0 +1,42 @@
+from hashlib import sha1
+
+from flask import Blueprint, current_app, abort, redirect, request, url_for, make_response, jsonify
+
+import cs235flix.adapters.repository as repo
+import cs235flix.posters.services as services
+
+# Configure Blueprint.
+posters_blueprint = Blueprint(
+    'posters_bp', __name__)
+
+
+@posters_blueprint.route('/poster/<int:rank>', methods=['GET'])
+def poster(rank):
+    # Pages link their <img> tags here rather than to OMDb, so rendering a page never waits for poster lookups.
+    max_age = current_app.config.get('POSTER_MAX_AGE', 7 * 24 * 60 * 60)
+
+    try:
+        poster_url = services.get_poster(rank, repo.repo_instance)
+    except services.NonExistentMovieException:
+        abort(404)
+    except services.PosterUnavailableException:
+        # OMDb could not be reached in time; only let browsers keep the placeholder briefly so the poster is retried.
+        poster_url = url_for('static', filename='images/poster_placeholder.svg')
+        max_age = 60
+
+    etag = sha1(poster_url.encode('utf-8')).hexdigest()
+
+    if request.if_none_match.contains(etag):
+        response = make_response('', 304)
+    else:
+        response = redirect(poster_url)
+
+    response.set_etag(etag)
+    response.cache_control.public = True
+    response.cache_control.max_age = max_age
+    return response
+
+
+@posters_blueprint.route('/poster/prefetch_status', methods=['GET'])
+def prefetch_status():
+    return jsonify(services.get_prefetch_status())
@@ -0,0 +1,29 @@
+import cs235flix.adapters.poster_prefetch as poster_prefetch
+from cs235flix.adapters.repository import AbstractRepository
+
+
+class NonExistentMovieException(Exception):
+    pass
+
+
+class PosterUnavailableException(Exception):
+    pass
+
+
+def get_poster(movie_rank: int, repo: AbstractRepository):
+    # Returns the poster URL for the movie, or the placeholder if OMDb has no poster for it. The poster is resolved on
+    # the shared resolver pool, so a slow or failing OMDb lookup holds the request up for at most the resolver's
+    # deadline.
+    movie = repo.get_movie(movie_rank)
+    if movie is None:
+        raise NonExistentMovieException
+
+    posters = [{'title': movie.title, 'year': movie.release_date}]
+    repo.get_posters_by_movies(posters)
+    if not posters[0]['poster_resolved']:
+        raise PosterUnavailableException
+    return posters[0]['poster']
+
+
+def get_prefetch_status():
+    return poster_prefetch.get_prefetch_status()
@@ -1,12 +1,17 @@
-from flask import Blueprint, render_template, redirect, url_for, request
+import uuid
+
+from flask import Blueprint, render_template, redirect, url_for, request, session, jsonify
 
 from flask_wtf import FlaskForm
 from wtforms import StringField, SubmitField
 from wtforms.validators import DataRequired, Length
 
 import cs235flix.search.services as services
+import cs235flix.utilities.services as util_services
 import cs235flix.adapters.repository as repo
 
+from cs235flix.adapters.page_query import PageQuery
+
 # Configure Blueprint.
 search_blueprint = Blueprint(
     'search_bp', __name__
@@ -19,11 +24,8 @@ def actor():
 
     if form.validate_on_submit():
         # Successful POST, i.e. the input for actor has passed the validation check.
-        # Set the search to a variable.
-        services.set_search(form.actor.data, repo.repo_instance)
-
-        # All is well, redirect user to results page.
-        return redirect(url_for('search_bp.results', search_type="actor"))
+        # All is well, redirect user to results page, which carries the search in its URL.
+        return redirect(url_for('search_bp.results', search_type="actor", search=form.actor.data))
 
     # Request the display page
     return render_template(
@@ -41,11 +43,8 @@ def director():
 
     if form.validate_on_submit():
         # Successful POST, i.e. the input for director has passed the validation check.
-        # Set the search to a variable.
-        services.set_search(form.director.data, repo.repo_instance)
-
-        # All is well, redirect user to results page.
-        return redirect(url_for('search_bp.results', search_type="director"))
+        # All is well, redirect user to results page, which carries the search in its URL.
+        return redirect(url_for('search_bp.results', search_type="director", search=form.director.data))
 
     # Request the display page
     return render_template(
@@ -63,11 +62,8 @@ def genre():
 
     if form.validate_on_submit():
         # Successful POST, i.e. the input for genre/genres has passed the validation check.
-        # Set the search to a variable.
-        services.set_search(form.genre.data, repo.repo_instance)
-
-        # All is well, redirect user to results page.
-        return redirect(url_for('search_bp.results', search_type="genres"))
+        # All is well, redirect user to results page, which carries the search in its URL.
+        return redirect(url_for('search_bp.results', search_type="genres", search=form.genre.data))
 
     # Request the display page
     return render_template(
@@ -85,11 +81,8 @@ def movie():
 
     if form.validate_on_submit():
         # Successful POST, i.e. the input for movie has passed the validation check.
-        # Set the search to a variable.
-        services.set_search(form.movie.data, repo.repo_instance)
-
-        # All is well, redirect user to results page.
-        return redirect(url_for('search_bp.results', search_type="movie"))
+        # All is well, redirect user to results page, which carries the search in its URL.
+        return redirect(url_for('search_bp.results', search_type="movie", search=form.movie.data))
 
     # Request the display page
     return render_template(
@@ -101,18 +94,47 @@ def movie():
     )
 
 
+@search_blueprint.route('/description', methods=['GET', 'POST'])
+def description():
+    form = DescriptionSearchForm()
+
+    if form.validate_on_submit():
+        # Successful POST, i.e. the input for description has passed the validation check.
+        # All is well, redirect user to results page, which carries the search in its URL.
+        return redirect(url_for('search_bp.results', search_type="description", search=form.description.data))
+
+    # Request the display page
+    return render_template(
+        'search/search_page.html',
+        title='Search results',
+        search_variable="description",
+        handler_url=url_for('search_bp.description'),
+        form=form
+    )
+
+
+@search_blueprint.route('/autocomplete', methods=['GET'])
+def autocomplete():
+    # Completions of the q parameter, optionally only of one search type, as JSON for search forms to suggest while
+    # the user types.
+    completions = services.get_completions(request.args.get('q'), request.args.get('type'),
+                                           request.args.get('limit'), repo.repo_instance)
+    return jsonify(completions)
+
+
 @search_blueprint.route('/results', methods=['GET'])
 def results():
     movies_per_page = 5
 
     # Read query parameters
     cursor = request.args.get('cursor')
+    search = request.args.get('search', "")
     search_type = request.args.get('search_type')
     movie_to_show_reviews = request.args.get('view_reviews_for')
     added_movie = request.args.get('added_movie')
 
-    movies, specification, search, count, plural, first_movie_url, last_movie_url, next_movie_url, prev_movie_url, \
-        movie_for_poster = results_helper(search_type, movie_to_show_reviews, cursor, movies_per_page)
+    movies, specification, search, count, plural, first_movie_url, last_movie_url, next_movie_url, prev_movie_url = \
+        results_helper(search, search_type, movie_to_show_reviews, cursor, movies_per_page)
 
     if movie_to_show_reviews is not None:
         movie_to_show_reviews = int(movie_to_show_reviews)
@@ -129,7 +151,6 @@ def results():
         prev_movie_url=prev_movie_url,
         page="search",
         search_type=search_type,
-        search_movie_poster=movie_for_poster,
         search_text=str(search),
         show_reviews_for_movies=movie_to_show_reviews,
         added_movie=added_movie,
@@ -137,10 +158,14 @@ def results():
     )
 
 
-def results_helper(search_type: str, movie_to_show_reviews: int, cursor: int, movies_per_page: int):
-    search = services.get_search(repo.repo_instance)
-    movies_list = services.search_for_type(search, search_type, repo.repo_instance)
-    count = len(movies_list)
+def results_helper(search: str, search_type: str, movie_to_show_reviews: int, cursor: int, movies_per_page: int):
+    if 'search_session' not in session:
+        # Identifies the session's searches, so that each can be refined from the previous one.
+        session['search_session'] = uuid.uuid4().hex
+
+    # Retrieve the ranks of the movies matching the search, cached for paging through them.
+    movie_ranks = services.search_ranks(search, search_type, repo.repo_instance, session['search_session'])
+    count = len(movie_ranks)
     plural = "movies"
 
     if movie_to_show_reviews is None:
@@ -160,19 +185,9 @@ def results_helper(search_type: str, movie_to_show_reviews: int, cursor: int, mo
         # Convert cursor from string to int
         cursor = int(cursor)
 
-    # Retrieve movie ranks for movies that have starring actor.
-    movie_ranks = services.get_movie_ranks(movies_list, repo.repo_instance)
-
-    # Retrieve the batch of movies to display on web page.
-    movies = services.get_movies_by_type(movie_ranks[cursor:cursor + movies_per_page], repo.repo_instance)
-    watch_list = services.get_watchlist(repo.repo_instance)
-
-    services.get_posters(movies, repo.repo_instance)
-
-    for m in movies:
-        for added_movie in watch_list:
-            if int(m['rank']) == int(added_movie.rank):
-                m['watchlist'] = True
+    # Retrieve the batch of movies to display on web page, with the cursors to navigate from it.
+    movies, page = util_services.get_movie_page(PageQuery.by_ranks(movie_ranks), cursor, movies_per_page,
+                                                session.get('username'), services.movies_to_dict, repo.repo_instance)
 
     first_movie_url = None
     last_movie_url = None
@@ -185,34 +200,26 @@ def results_helper(search_type: str, movie_to_show_reviews: int, cursor: int, mo
         specification = "by director '"
     elif search_type == "movie":
         specification = "by the name '"
+    elif search_type == "description":
+        specification = "matching '"
     else:
         specification = "with genre(s) '"
 
-    if len(movies) > 0:
-        movie_for_poster = str(search)
-    else:
-        movie_for_poster = "Invalidmovietitle"
-
     if cursor > 0:
         # There are preceding movies, so generate URLs for the 'previous' and 'first' navigation buttons.
-        prev_movie_url = url_for('search_bp.results', search=search, cursor=cursor - movies_per_page,
+        prev_movie_url = url_for('search_bp.results', search=search, cursor=page.previous_cursor,
                                  search_type=search_type)
-        first_movie_url = url_for('search_bp.results', search=search)
+        first_movie_url = url_for('search_bp.results', search=search, search_type=search_type)
 
-    if cursor + movies_per_page < len(movie_ranks):
+    if page.next_cursor is not None:
         # There are further movies, so generate URLs for the 'next' and 'last' navigation buttons.
-        next_movie_url = url_for('search_bp.results', search=search, cursor=cursor + movies_per_page,
-                                 search_type=search_type)
-
-        last_cursor = movies_per_page * int(len(movie_ranks) / movies_per_page)
-        if len(movie_ranks) % movies_per_page == 0:
-            last_cursor -= movies_per_page
-        last_movie_url = url_for('search_bp.results', search=search, cursor=last_cursor, search_type=search_type)
+        next_movie_url = url_for('search_bp.results', search=search, cursor=page.next_cursor, search_type=search_type)
+        last_movie_url = url_for('search_bp.results', search=search, cursor=page.last_cursor, search_type=search_type)
 
     # Construct urls for viewing movie reviews and adding reviews.
     for m in movies:
 
-        m['view_review_url'] = url_for('search_bp.results', search_cursor=cursor, search_page="search",
+        m['view_review_url'] = url_for('search_bp.results', search=search, cursor=cursor, search_page="search",
                                        view_reviews_for=m['rank'], search_type=search_type)
         m['add_review_url'] = url_for('movies_bp.review_on_movie', movie=m['rank'], search_page="search", search=search,
                                       search_cursor=cursor, search_type=search_type)
@@ -220,10 +227,9 @@ def results_helper(search_type: str, movie_to_show_reviews: int, cursor: int, mo
                                             search_cursor=cursor, search_type=search_type, search_text=search,
                                             show_reviews_for_movies=movie_to_show_reviews,
                                             name=specification + str(search).capitalize() + "'", movie_plural=plural,
-                                            count=count, search_movie_poster=movie_for_poster, page="search",
-                                            movies_per_page=movies_per_page)
+                                            count=count, page="search", movies_per_page=movies_per_page)
 
-    return movies, specification, search, count, plural, first_movie_url, last_movie_url, next_movie_url, prev_movie_url, movie_for_poster
+    return movies, specification, search, count, plural, first_movie_url, last_movie_url, next_movie_url, prev_movie_url
 
 
 class ActorSearchForm(FlaskForm):
@@ -255,3 +261,11 @@ class MovieSearchForm(FlaskForm):
         DataRequired(message='Input required')
     ])
     submit = SubmitField('Search')
+
+
+class DescriptionSearchForm(FlaskForm):
+    description = StringField('Search for Movies by words in their title or description', [
+        DataRequired(message='Input required'),
+        Length(min=3, message='Input too short')
+    ])
+    submit = SubmitField('Search')
@@ -1,3 +1,6 @@
+import cs235flix.adapters.result_cache as result_cache
+import cs235flix.adapters.search_refinement as search_refinement
+from cs235flix.adapters.prefix_index import AUTOCOMPLETE_LIMIT, COMPLETION_TYPES
 from cs235flix.adapters.repository import AbstractRepository
 from cs235flix.domain.model import Movie, Review
 from typing import Iterable
@@ -11,23 +14,41 @@ class UnknownUserException(Exception):
     pass
 
 
-def set_search(search: str, repo: AbstractRepository):
-    # Set the search to a variable in repo.
-    repo.set_search(search)
+def search_for_type(search: str, search_type: str, repo: AbstractRepository, session_id: str = None):
+    # Get list of movies with actor,director, genre(s). A search extending the previous search of the same session
+    # (session_id) is refined from that search's results where possible, rather than searching the whole catalog.
+    if session_id is not None:
+        return search_refinement.cache_instance.search(session_id, search, search_type, repo.get_catalog_version(),
+                                                       lambda: repo.get_movie_by_type(search, search_type))
 
+    movies = repo.get_movie_by_type(search, search_type)
 
-def get_search(repo: AbstractRepository):
-    # Retrieve the search user input
-    search = repo.get_search()
+    return movies
 
-    return search
 
+def search_ranks(search: str, search_type: str, repo: AbstractRepository, session_id: str = None):
+    # Get the ranks of the movies matching search, in the order search_for_type finds them. The ranks of recent
+    # searches are cached for the version of the catalog they were found in, so that paging through the results of a
+    # search only fetches the movies of each page.
+    return result_cache.cache_instance.ranks(
+        search, search_type, repo.get_catalog_version(),
+        lambda: get_movie_ranks(search_for_type(search, search_type, repo, session_id), repo))
 
-def search_for_type(search: str, search_type: str, repo: AbstractRepository):
-    # Get list of movies with actor,director, genre(s).
-    movies = repo.get_movie_by_type(search, search_type)
 
-    return movies
+def get_completions(prefix: str, search_type: str, limit: str, repo: AbstractRepository):
+    # Completions of prefix as dicts, best first. An unknown search type completes every type, and a limit that is
+    # not a number up to AUTOCOMPLETE_LIMIT is replaced by AUTOCOMPLETE_LIMIT.
+    if search_type not in COMPLETION_TYPES:
+        search_type = None
+    try:
+        limit = int(limit)
+    except (TypeError, ValueError):
+        limit = AUTOCOMPLETE_LIMIT
+    if not 0 < limit <= AUTOCOMPLETE_LIMIT:
+        limit = AUTOCOMPLETE_LIMIT
+
+    return [{'type': completed_type, 'name': name, 'rank': rank}
+            for completed_type, name, rank in repo.get_completions(prefix or "", search_type, limit)]
 
 
 def get_movie_ranks(movies: list, repo: AbstractRepository):
@@ -36,15 +57,6 @@ def get_movie_ranks(movies: list, repo: AbstractRepository):
     return rank_list
 
 
-def get_movies_by_type(rank_list: list, repo: AbstractRepository):
-    movies = repo.get_movies_by_rank(rank_list)
-
-    # Convert Movies to dictionary form.
-    movies_as_dict = movies_to_dict(movies)
-
-    return movies_as_dict
-
-
 def get_movie(movie_rank: int, repo: AbstractRepository):
     movie = repo.get_movie(movie_rank)
 
@@ -63,22 +75,12 @@ def get_reviews_for_movie(movie_rank, repo: AbstractRepository):
     return reviews_to_dict(movie.reviews)
 
 
-def check_if_added(movie_rank: int, repo: AbstractRepository):
-    add = repo.check_if_added(movie_rank)
+def check_if_added(movie_rank: int, username: str, repo: AbstractRepository):
+    add = repo.check_if_added(username, movie_rank)
 
     return add
 
 
-def get_watchlist(repo: AbstractRepository):
-    watchlist = repo.get_movie_watchlist()
-
-    return watchlist
-
-
-def get_posters(movies: Iterable[Movie], repo: AbstractRepository):
-    repo.get_posters_by_movies(movies)
-
-
 # Functions to convert model entities to dicts
 # ============================================
 
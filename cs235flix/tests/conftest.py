@@ -1,22 +1,65 @@
 import os
 import pytest
 
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker, clear_mappers
+from sqlalchemy.pool import StaticPool
+
 from cs235flix import create_app
-from cs235flix.adapters import memory_repository
+from cs235flix.adapters import columnar_repository, database_repository, memory_repository, omdb_client
+from cs235flix.adapters.columnar_repository import ColumnarRepository
+from cs235flix.adapters.database_repository import SqlAlchemyRepository
 from cs235flix.adapters.memory_repository import MemoryRepository
+from cs235flix.adapters.orm import metadata, map_model_to_tables
+from cs235flix.adapters.seed_passwords import LAZY
+from cs235flix.tests.omdb_stub import OmdbStub
 
 TEST_DATA_PATH = os.path.abspath("cs235flix/tests/data")
 """TEST_DATA_PATH = os.path.join('C:', os.sep, 'Users', 'Ella', 'Documents', 'Uni', 'COMPSCI_235', 'CS235-Flix',
                               'cs235flix', 'tests', 'data', 'Data1000Movies.csv')"""
 
 
-@pytest.fixture
-def in_memory_repo():
-    repo = MemoryRepository()
-    memory_repository.populate(TEST_DATA_PATH, repo)
+@pytest.fixture(params=['memory', 'columnar', 'mapped'])
+def in_memory_repo(request, tmp_path_factory):
+    # Both in-memory repository implementations, the columnar one also with its movies mapped from a catalog file, are
+    # run through the same tests.
+    if request.param == 'columnar':
+        repo = ColumnarRepository()
+        columnar_repository.populate(TEST_DATA_PATH, repo)
+    elif request.param == 'mapped':
+        repo = ColumnarRepository()
+        columnar_repository.populate(TEST_DATA_PATH, repo,
+                                     catalog_path=str(tmp_path_factory.mktemp('catalog') / 'movies.catalog'))
+    else:
+        repo = MemoryRepository()
+        memory_repository.populate(TEST_DATA_PATH, repo)
     return repo
 
 
+@pytest.fixture
+def database_repo():
+    # A SqlAlchemyRepository over an in-memory SQLite database populated with the test movies and users.
+    engine = create_engine('sqlite://', connect_args={'check_same_thread': False}, poolclass=StaticPool)
+    metadata.create_all(engine)
+    map_model_to_tables()
+    database_repository.populate(engine, TEST_DATA_PATH, LAZY)
+    repo = SqlAlchemyRepository(sessionmaker(autocommit=False, autoflush=True, bind=engine))
+    yield repo
+    repo.close_session()
+    clear_mappers()
+
+
+@pytest.fixture
+def omdb_stub():
+    stub = OmdbStub().start()
+    default_url = omdb_client.client.url
+    omdb_client.configure(url=stub.url)
+    omdb_client.breaker.reset()
+    yield stub
+    omdb_client.configure(url=default_url)
+    stub.stop()
+
+
 @pytest.fixture
 def client():
     my_app = create_app({
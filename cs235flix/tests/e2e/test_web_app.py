@@ -1,7 +1,12 @@
+import time
+
 import pytest
 
 from flask import session
 
+from cs235flix import create_app
+from cs235flix.tests.conftest import TEST_DATA_PATH
+
 
 def test_register(client):
     # Check that we retrieve the register page.
@@ -99,3 +104,178 @@ def test_movies_with_date(client):
     # Check that movies on the requested date are included on the page.
     assert b'1408' in response.data
     assert b'A man who specializes in debunking' in response.data
+
+
+def test_poster_redirects_to_poster_url(omdb_stub, client):
+    omdb_stub.posters = {'Guardians of the Galaxy': 'http://posters/guardians.jpg'}
+
+    response = client.get('/poster/1')
+    assert response.status_code == 302
+    assert response.headers['Location'] == 'http://posters/guardians.jpg'
+    assert response.headers['ETag'] is not None
+    assert 'max-age=604800' in response.headers['Cache-Control']
+
+
+def test_poster_is_not_modified_for_matching_etag(omdb_stub, client):
+    omdb_stub.posters = {'Guardians of the Galaxy': 'http://posters/guardians.jpg'}
+    etag = client.get('/poster/1').headers['ETag']
+
+    response = client.get('/poster/1', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+
+    # The second request was answered from the poster cache.
+    assert omdb_stub.request_count() == 1
+
+
+def test_poster_redirects_to_placeholder_when_movie_has_no_poster(omdb_stub, client):
+    response = client.get('/poster/1')
+    assert response.status_code == 302
+    assert response.headers['Location'].endswith('/static/images/poster_placeholder.svg')
+
+
+def test_poster_redirects_to_placeholder_when_lookup_is_slow(omdb_stub):
+    omdb_stub.posters = {'Guardians of the Galaxy': 'http://posters/guardians.jpg'}
+    omdb_stub.delay = 1.0
+    client = create_app({
+        'TESTING': True,
+        'TEST_DATA_PATH': TEST_DATA_PATH,
+        'WTF_CSRF_ENABLED': False,
+        'POSTER_BATCH_DEADLINE': 0.2
+    }).test_client()
+
+    start = time.perf_counter()
+    response = client.get('/poster/1')
+    elapsed = time.perf_counter() - start
+
+    # The request is only held up for the resolver's deadline, and the placeholder is only cached briefly.
+    assert elapsed < 0.8
+    assert response.status_code == 302
+    assert response.headers['Location'].endswith('/static/images/poster_placeholder.svg')
+    assert 'max-age=60' in response.headers['Cache-Control']
+
+
+def test_poster_for_non_existent_movie(client):
+    response = client.get('/poster/1001')
+    assert response.status_code == 404
+
+
+def test_browse_movies_does_not_look_up_posters(omdb_stub, client):
+    response = client.get('/browse_by_date?date=2007&cursor=0&max_cursor=53')
+    assert response.status_code == 200
+
+    # Posters are linked through the poster endpoint instead of being looked up while rendering the page.
+    assert b'/poster/' in response.data
+    assert omdb_stub.request_count() == 0
+
+
+def test_prefetch_status_when_prefetch_is_disabled(client):
+    response = client.get('/poster/prefetch_status')
+    assert response.status_code == 200
+    assert response.get_json() == {'enabled': False}
+
+
+def test_watchlist_is_kept_per_user(client, auth):
+    auth.login()
+    client.get('/add_to_watchlist?movie=1&page=year&target_date=2014&movies_per_page=10')
+
+    response = client.get('/watchlist')
+    assert b'Guardians of the Galaxy' in response.data
+
+    # Another user's watchlist is empty.
+    auth.login('eggy', 'mvNNbc1eLA$i')
+    response = client.get('/watchlist')
+    assert b'Guardians of the Galaxy' not in response.data
+
+
+def test_can_remove_from_watchlist(client, auth):
+    auth.login()
+    client.get('/add_to_watchlist?movie=1&page=year&target_date=2014&movies_per_page=10')
+
+    response = client.get('/remove_from_watchlist?movie=1')
+    assert response.headers['Location'] == 'http://localhost/watchlist'
+    assert b'Guardians of the Galaxy' not in client.get('/watchlist').data
+
+
+def test_browse_by_date_marks_watchlisted_movies(client, auth):
+    auth.login()
+    client.get('/add_to_watchlist?movie=277&page=year&target_date=2014&movies_per_page=10')
+
+    response = client.get('/browse_by_date?date=2014')
+    assert response.data.count(b'Added to Watchlist') == 1
+
+    # Movies are only marked for the user who added them.
+    auth.login('eggy', 'mvNNbc1eLA$i')
+    response = client.get('/browse_by_date?date=2014')
+    assert b'Added to Watchlist' not in response.data
+
+
+def test_browse_by_filter(client):
+    response = client.get('/browse_by_filter?rating_min=7.5&runtime_min=90&runtime_max=120&sort=votes&order=desc')
+    assert response.status_code == 200
+    assert b'108 found' in response.data
+
+    # The best voted movie comes first, and the page links keep the filter.
+    assert response.data.index('WALL·E'.encode()) < response.data.index(b'Slumdog Millionaire')
+    assert b'/browse_by_filter?cursor=10&amp;runtime_min=90&amp;runtime_max=120&amp;rating_min=7.5&amp;sort=votes' \
+           b'&amp;order=desc' in response.data
+    assert b'The Dark Knight' not in response.data
+
+
+def test_browse_by_filter_ignores_invalid_bounds(client):
+    response = client.get('/browse_by_filter?rating_min=high&sort=popularity')
+    assert response.status_code == 200
+    assert b'1000 found' in response.data
+
+
+def test_add_to_watchlist_from_filtered_movies(client, auth):
+    auth.login()
+    response = client.get('/add_to_watchlist?movie=55&page=filter&cursor=0&rating_min=7.5&sort=votes')
+    assert response.headers['Location'] == 'http://localhost/browse_by_filter?cursor=0&rating_min=7.5&sort=votes'
+
+    response = client.get('/browse_by_filter?rating_min=7.5&sort=votes&order=desc')
+    assert response.data.count(b'Added to Watchlist') == 1
+
+
+def test_search_by_description(client):
+    response = client.get('/description')
+    assert response.status_code == 200
+
+    response = client.post('/description', data={'description': 'intergalactic criminals'})
+    assert response.headers['Location'] == \
+           'http://localhost/results?search_type=description&search=intergalactic+criminals'
+
+    # The most relevant movie comes first.
+    response = client.get('/results?search_type=description&search=intergalactic+criminals')
+    assert b'Movies matching &#39;Intergalactic criminals&#39;' in response.data
+    assert response.data.index(b'Guardians of the Galaxy') < response.data.index(b'Jupiter Ascending')
+
+
+def test_searches_are_carried_in_their_urls(client):
+    first, second = client, client.application.test_client()
+    response = first.post('/actor', data={'actor': 'chris'})
+    assert response.headers['Location'] == 'http://localhost/results?search_type=actor&search=chris'
+    second.post('/director', data={'director': 'James Gunn'})
+
+    # Another user's search doesn't change the results of the first.
+    response = first.get('/results?search_type=actor&search=chris')
+    assert b'Movies with actor &#39;Chris&#39;' in response.data
+    assert b"href='/results?search=chris&amp;cursor=5&amp;search_type=actor'" in response.data
+
+    response = second.get('/results?search_type=director&search=James+Gunn')
+    assert b'Movies by director &#39;James gunn&#39;' in response.data
+    assert b'Guardians of the Galaxy' in response.data
+
+
+def test_autocomplete(client):
+    response = client.get('/autocomplete?q=chris&type=actor&limit=2')
+    assert response.status_code == 200
+    assert response.get_json() == [{'type': 'actor', 'name': 'Chris Pratt', 'rank': 1},
+                                   {'type': 'actor', 'name': 'Christopher Mintz-Plasse', 'rank': 24}]
+
+    # Unknown types and limits are ignored.
+    response = client.get('/autocomplete?q=g&type=genre&limit=many')
+    assert len(response.get_json()) == 10
+    assert response.get_json()[:2] == [{'type': 'movie', 'name': 'Guardians of the Galaxy', 'rank': 1},
+                                       {'type': 'director', 'name': 'James Gunn', 'rank': 1}]
+
+    assert client.get('/autocomplete').get_json() == []
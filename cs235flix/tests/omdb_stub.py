@@ -0,0 +1,83 @@
+import json
+import threading
+import time
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+
+class _QuietServer(ThreadingHTTPServer):
+    def handle_error(self, request, client_address):
+        # Clients that time out close the connection mid-response; that is expected here.
+        pass
+
+
+class OmdbStub:
+    """ Minimal stand-in for the OMDb search API, served from a local thread.
+
+    posters maps titles to poster URLs; searches for any other title get OMDb's "Movie not found!" response. Each
+    request sleeps for delay seconds (or delays[title] if set) before answering, and every searched title is recorded
+    in requests. Setting status to something other than 200 makes every request fail with that HTTP status.
+    """
+
+    def __init__(self, posters=None, delay: float = 0.0):
+        self.posters = dict(posters or {})
+        self.delay = delay
+        self.delays = dict()
+        self.status = 200
+        self.requests = []
+        self._lock = threading.Lock()
+        self._server = _QuietServer(('127.0.0.1', 0), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self._server.server_address
+        return 'http://%s:%d' % (host, port)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def request_count(self, title=None):
+        with self._lock:
+            if title is None:
+                return len(self.requests)
+            return self.requests.count(title)
+
+    def _respond(self, title):
+        with self._lock:
+            self.requests.append(title)
+        time.sleep(self.delays.get(title, self.delay))
+
+        if title not in self.posters:
+            return {'Response': 'False', 'Error': 'Movie not found!'}
+        return {
+            'Search': [{'Title': title, 'Year': '', 'imdbID': 'tt0000000', 'Type': 'movie',
+                        'Poster': self.posters[title]}],
+            'totalResults': '1',
+            'Response': 'True'
+        }
+
+    def _make_handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                query = parse_qs(urlparse(self.path).query)
+                body = json.dumps(stub._respond(query.get('s', [''])[0])).encode('utf-8')
+                self.send_response(stub.status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
@@ -0,0 +1,31 @@
+import pytest
+
+from cs235flix.adapters.bloom_filter import BloomFilter
+
+
+def test_added_items_are_always_found():
+    bloom_filter = BloomFilter(1000)
+    names = ['user%d' % i for i in range(1000)]
+    for name in names:
+        bloom_filter.add(name)
+
+    assert all(name in bloom_filter for name in names)
+    assert len(bloom_filter) == 1000
+
+
+def test_false_positive_rate_is_near_error_rate():
+    bloom_filter = BloomFilter(1000, error_rate=0.01)
+    for i in range(1000):
+        bloom_filter.add('user%d' % i)
+
+    false_positives = sum(1 for i in range(10000) if 'free%d' % i in bloom_filter)
+    assert false_positives < 300
+
+
+def test_empty_filter_contains_nothing():
+    assert 'ella' not in BloomFilter(10)
+
+
+def test_capacity_must_be_positive():
+    with pytest.raises(ValueError):
+        BloomFilter(0)
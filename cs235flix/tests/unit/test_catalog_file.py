@@ -0,0 +1,103 @@
+import os
+
+import pytest
+
+from cs235flix.adapters import catalog_file, columnar_repository
+from cs235flix.adapters.catalog_file import MappedCatalog
+from cs235flix.adapters.catalog_snapshot import file_hash
+from cs235flix.adapters.columnar_repository import ColumnarRepository
+from cs235flix.tests.conftest import TEST_DATA_PATH
+
+SOURCE_HASH = file_hash(os.path.join(TEST_DATA_PATH, 'Data1000Movies.csv'))
+
+
+@pytest.fixture
+def catalogs(tmp_path):
+    # The same movies as a catalog in memory and mapped from a catalog file.
+    repo = ColumnarRepository()
+    columnar_repository.load_movies(TEST_DATA_PATH, repo)
+    path = str(tmp_path / 'movies.catalog')
+    repo.save_catalog_file(path, SOURCE_HASH)
+    return repo._catalog, catalog_file.map_catalog(path, SOURCE_HASH)
+
+
+def test_mapped_catalog_has_the_same_records(catalogs):
+    catalog, mapped = catalogs
+
+    assert isinstance(mapped, MappedCatalog)
+    assert len(mapped) == len(catalog) == 1000
+    # Missing ratings and revenues are NaN, which never equals itself, so records are compared by their repr.
+    assert [repr(record) for record in mapped.records()] == [repr(record) for record in catalog.records()]
+    assert list(mapped.release_years) == list(catalog.release_years)
+    assert all(list(mapped.rows_by_year[year]) == list(catalog.rows_by_year[year]) for year in catalog.release_years)
+    assert mapped.row_of_rank(1) == catalog.row_of_rank(1)
+
+
+def test_mapped_catalog_reads_columns_in_place(catalogs):
+    catalog, mapped = catalogs
+
+    assert isinstance(mapped.ranks, memoryview)
+    assert mapped.ranks.readonly
+    assert isinstance(mapped.titles.buffers()[0], memoryview)
+
+
+@pytest.mark.parametrize('index, search', [
+    ('actors', 'Chris Pratt'), ('actors', 'pratt'), ('actors', 'ris pra'), ('actors', 'Chirs Prat'),
+    ('directors', 'James Gunn'), ('directors', 'gunn'), ('directors', 'Jmes Gun'),
+])
+def test_mapped_name_index_matches_like_the_name_index(catalogs, index, search):
+    catalog, mapped = catalogs
+
+    assert getattr(mapped, index).search(search) == getattr(catalog, index).search(search)
+
+
+@pytest.mark.parametrize('search', ['Guardians of the Galaxy', 'galaxy', 'Amélie', 'Gaurdians of the Galxy'])
+def test_mapped_title_index_matches_like_the_title_index(catalogs, search):
+    catalog, mapped = catalogs
+
+    assert mapped.title_index.search(search) == catalog.title_index.search(search)
+
+
+def test_mapped_catalog_searches_genres(catalogs):
+    catalog, mapped = catalogs
+
+    assert mapped.genre_bitmaps.slots('Action, -Comedy') == catalog.genre_bitmaps.slots('Action, -Comedy')
+
+
+@pytest.mark.parametrize('search', ['intergalactic criminals', 'zombies', 'Amélie', 'the of and'])
+def test_mapped_text_index_matches_like_the_text_index(catalogs, search):
+    catalog, mapped = catalogs
+
+    assert mapped.text_index.search(search) == catalog.text_index.search(search)
+
+
+def test_catalog_file_of_other_data_is_not_mapped(tmp_path):
+    path = str(tmp_path / 'movies.catalog')
+    repo = ColumnarRepository()
+    columnar_repository.load_movies(TEST_DATA_PATH, repo)
+    repo.save_catalog_file(path, SOURCE_HASH)
+
+    assert catalog_file.map_catalog(path, 'hash of some other file') is None
+    assert not ColumnarRepository().map_catalog_file(path, 'hash of some other file')
+
+
+def test_damaged_catalog_file_is_rewritten(tmp_path):
+    path = tmp_path / 'movies.catalog'
+    path.write_bytes(b'not a catalog')
+
+    repo = ColumnarRepository()
+    columnar_repository.load_movies(TEST_DATA_PATH, repo, str(path))
+
+    assert repo.get_number_of_movies() == 1000
+    assert repo.get_movie(1).title == 'Guardians of the Galaxy'
+    assert catalog_file.map_catalog(str(path), SOURCE_HASH) is not None
+
+
+def test_truncated_catalog_file_is_not_mapped(tmp_path):
+    path = tmp_path / 'movies.catalog'
+    repo = ColumnarRepository()
+    columnar_repository.load_movies(TEST_DATA_PATH, repo)
+    repo.save_catalog_file(str(path), SOURCE_HASH)
+    path.write_bytes(path.read_bytes()[:len(path.read_bytes()) // 2])
+
+    assert catalog_file.map_catalog(str(path), SOURCE_HASH) is None
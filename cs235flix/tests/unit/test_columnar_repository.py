@@ -0,0 +1,97 @@
+import gc
+import math
+
+from cs235flix.adapters import columnar_repository, memory_repository
+from cs235flix.adapters.columnar_catalog import ColumnarCatalog, StringColumn, NameIndex
+from cs235flix.adapters.columnar_repository import ColumnarRepository
+from cs235flix.adapters.memory_repository import MemoryRepository
+from cs235flix.adapters.page_query import PageQuery
+from cs235flix.domain.model import Movie
+from cs235flix.tests.conftest import TEST_DATA_PATH
+
+
+def test_string_column_round_trips_strings():
+    strings = ['Guardians of the Galaxy', '', 'Amélie', 'Pokémon Detective Pikachu']
+    column = StringColumn(strings)
+
+    assert len(column) == 4
+    assert [column[i] for i in range(4)] == strings
+
+
+def test_name_index_stores_names_in_both_directions():
+    index = NameIndex([['Chris Pratt', 'Zoe Saldana'], ['Zoe Saldana'], [], ['chris  pratt']])
+
+    assert index.names_of_row(0) == ['Chris Pratt', 'Zoe Saldana']
+    assert index.names_of_row(2) == []
+    assert index.names_of_row(3) == ['Chris Pratt']
+    assert index.rows_of_name(index.ids['zoe saldana']) == [0, 1]
+    assert index.search('pratt') == [0, 3]
+
+
+def test_columnar_repository_reads_numeric_columns():
+    repo = ColumnarRepository()
+    columnar_repository.load_movies(TEST_DATA_PATH, repo)
+
+    catalog = repo._catalog
+    row = catalog.row_of_rank(1)
+    assert catalog.runtimes[row] == 121
+    assert math.isclose(catalog.ratings[row], 8.1, rel_tol=1e-6)
+    assert catalog.votes[row] == 757074
+    assert math.isclose(catalog.revenues[row], 333.13)
+    assert catalog.metascores[row] == 76
+    assert repo.get_movie(1).runtime_minutes == 121
+
+
+def test_columnar_repository_answers_searches_like_memory_repository():
+    memory_repo = MemoryRepository()
+    memory_repository.load_movies(TEST_DATA_PATH, memory_repo)
+    columnar_repo = ColumnarRepository()
+    columnar_repository.load_movies(TEST_DATA_PATH, columnar_repo)
+
+    for search, type_var in [("chris", "actor"), ("chirs prat", "actor"), ("james gunn", "director"),
+                             ("Action, -Comedy", "genres"), ("sci", "genres"), ("the", "movie"),
+                             ("Gaurdians of the Galaxy", "movie"), ("zzzzqqqq", "actor")]:
+        assert [movie.rank for movie in columnar_repo.get_movie_by_type(search, type_var)] == \
+               [movie.rank for movie in memory_repo.get_movie_by_type(search, type_var)]
+
+    for year in memory_repo.years_list():
+        assert [movie.rank for movie in columnar_repo.get_movies_by_date(year)] == \
+               [movie.rank for movie in memory_repo.get_movies_by_date(year)]
+    page = columnar_repo.get_movie_page(PageQuery.by_year(2009), 0, 5)
+    expected = memory_repo.get_movie_page(PageQuery.by_year(2009), 0, 5)
+    assert page.year_counts == expected.year_counts
+    assert (page.previous_year, page.next_year) == (expected.previous_year, expected.next_year)
+
+
+def test_columnar_repository_only_keeps_movies_in_use():
+    repo = ColumnarRepository()
+    columnar_repository.load_movies(TEST_DATA_PATH, repo)
+
+    movie = repo.get_movie(1)
+    assert repo.get_movie(1) is movie
+    assert len(repo._movies) == 1
+
+    del movie
+    gc.collect()
+    assert len(repo._movies) == 0
+
+
+def test_columnar_repository_merges_single_movies_in_one_rebuild(monkeypatch):
+    repo = ColumnarRepository()
+    columnar_repository.load_movies(TEST_DATA_PATH, repo)
+    builds = []
+    build = ColumnarCatalog.build
+    monkeypatch.setattr(ColumnarCatalog, 'build', lambda records: builds.append(len(records)) or build(records))
+
+    # Adding movies one at a time only appends them to the pending segment.
+    movies = [Movie("Testing %d" % rank, 2020, rank, "", "Ron Clements", [], []) for rank in range(1001, 1004)]
+    for movie in movies:
+        repo.add_movie(movie)
+    assert builds == []
+
+    # The next read merges them all into the catalog at once.
+    assert repo.get_number_of_movies() == 1003
+    assert builds == [1003]
+    assert repo.get_movie(1002) is movies[1]
+    assert [movie.rank for movie in repo.get_movies_by_date(2020)] == [1001, 1002, 1003]
+    assert builds == [1003]
@@ -0,0 +1,237 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from cs235flix.adapters import memory_repository
+from cs235flix.adapters.memory_repository import MemoryRepository
+from cs235flix.adapters.movie_filter import MovieFilter
+from cs235flix.adapters.page_query import PageQuery
+from cs235flix.adapters.repository import RepositoryException
+from cs235flix.adapters.text_index import TEXT_SEARCH_LIMIT
+from cs235flix.domain.model import Actor, Movie, Review, make_review
+from cs235flix.tests.conftest import TEST_DATA_PATH
+
+
+@pytest.fixture(scope='module')
+def memory_repo():
+    repo = MemoryRepository()
+    memory_repository.load_movies(TEST_DATA_PATH, repo)
+    # Built now, as reading the movies' titles fails once the database repository's mapping has been cleared.
+    repo.build_completions()
+    return repo
+
+
+@pytest.fixture
+def statements():
+    # The SQL statements run while a test runs.
+    executed = []
+
+    def record(connection, cursor, statement, *args):
+        executed.append(statement)
+
+    event.listen(Engine, 'before_cursor_execute', record)
+    yield executed
+    event.remove(Engine, 'before_cursor_execute', record)
+
+
+def test_repository_can_retrieve_a_movie(database_repo):
+    movie = database_repo.get_movie(1)
+
+    assert movie.title == 'Guardians of the Galaxy'
+    assert database_repo.get_movie(1001) is None
+
+
+def test_repository_can_retrieve_movies_by_rank(database_repo):
+    movies = database_repo.get_movies_by_rank([3, 1001, 1])
+
+    assert [movie.rank for movie in movies] == [3, 1]
+
+
+def test_repository_can_retrieve_movies_by_date(database_repo, memory_repo):
+    assert [movie.rank for movie in database_repo.get_movies_by_date(2009)] == \
+           [movie.rank for movie in memory_repo.get_movies_by_date(2009)]
+    assert database_repo.years_list() == memory_repo.years_list()
+
+
+def test_repository_can_retrieve_dates_of_neighbouring_movies(database_repo):
+    movie = database_repo.get_movie(1)
+
+    assert database_repo.get_date_of_previous_movie(movie) == 2013
+    assert database_repo.get_date_of_next_movie(movie) == 2015
+
+
+def test_repository_can_get_a_page_of_the_movies_of_a_year(database_repo, memory_repo, statements):
+    database_repo.add_to_watchlist('ella', database_repo.get_movies_by_date(2009)[6])
+    statements.clear()
+    page = database_repo.get_movie_page(PageQuery.by_year(2009), 5, 5, 'ella')
+    expected = memory_repo.get_movie_page(PageQuery.by_year(2009), 5, 5)
+
+    # The movies, the year's total and neighbours and the watchlist flags all come from one query.
+    assert len(statements) == 1
+    assert [movie.rank for movie in page.movies] == [movie.rank for movie in expected.movies]
+    assert page.total == expected.total == 51
+    assert (page.previous_cursor, page.next_cursor, page.last_cursor) == (0, 10, 50)
+    assert page.watchlisted == {page.movies[1].rank}
+    assert (page.previous_year, page.next_year, page.year) == (2008, 2010, 2009)
+    assert page.year_counts == expected.year_counts
+
+
+def test_repository_can_get_a_page_of_the_movies_of_the_earliest_year(database_repo, memory_repo):
+    page = database_repo.get_movie_page(PageQuery.earliest_year(), 0, 5)
+    expected = memory_repo.get_movie_page(PageQuery.earliest_year(), 0, 5)
+
+    assert page.year == 2006
+    assert [movie.rank for movie in page.movies] == [movie.rank for movie in expected.movies]
+    assert page.total == page.year_counts[2006]
+    assert page.watchlisted == set()
+
+
+def test_repository_can_get_a_page_of_a_year_without_movies(database_repo, memory_repo):
+    page = database_repo.get_movie_page(PageQuery.by_year(2002), 0, 5)
+
+    assert (page.movies, page.total, page.previous_year, page.next_year) == ([], 0, None, None)
+    assert page.year == 2002
+    assert page.year_counts == memory_repo.get_movie_page(PageQuery.by_year(2002), 0, 5).year_counts
+
+
+def test_repository_can_get_a_page_of_the_movies_with_ranks(database_repo, statements):
+    database_repo.add_to_watchlist('ella', database_repo.get_movie(7))
+    statements.clear()
+    page = database_repo.get_movie_page(PageQuery.by_ranks([3, 9, 1, 1001, 7, 2]), 1, 4, 'ella')
+
+    # Ranks without a movie are left out of the page, but still counted.
+    assert len(statements) == 1
+    assert [movie.rank for movie in page.movies] == [9, 1, 7]
+    assert page.total == 6
+    assert (page.previous_cursor, page.next_cursor, page.last_cursor) == (0, 5, 4)
+    assert page.watchlisted == {7}
+    assert (page.previous_year, page.next_year) == (None, None)
+
+
+def test_repository_keeps_watchlists_in_order(database_repo):
+    for rank in [5, 2, 9]:
+        database_repo.add_to_watchlist('ella', database_repo.get_movie(rank))
+    database_repo.add_to_watchlist('ella', database_repo.get_movie(2))
+
+    assert [movie.rank for movie in database_repo.get_movie_watchlist('ella')] == [5, 2, 9]
+    assert [movie.rank for movie in database_repo.get_movie_watchlist('ella', 1, 1)] == [2]
+    assert database_repo.get_watchlist_size('ella') == 3
+    assert database_repo.check_if_added('ella', 9)
+    assert not database_repo.check_if_added('eggy', 9)
+    assert database_repo.check_if_added_many('ella', [1, 2, 9]) == {2, 9}
+
+    database_repo.remove_from_watchlist('ella', database_repo.get_movie(2))
+    assert [movie.rank for movie in database_repo.get_movie_watchlist('ella')] == [5, 9]
+    assert database_repo.get_watchlist_size('eggy') == 0
+
+
+def test_repository_can_add_a_review(database_repo):
+    user = database_repo.get_user('ella')
+    review = make_review("Could be better", user, database_repo.get_movie(2), 3, datetime.today())
+
+    database_repo.add_review(review)
+
+    assert database_repo.get_reviews() == [review]
+    assert list(database_repo.get_movie(2).reviews) == [review]
+
+
+def test_repository_does_not_add_a_review_without_a_user(database_repo):
+    review = Review(None, database_repo.get_movie(2), "Could be better", 3, datetime.today())
+
+    with pytest.raises(RepositoryException):
+        database_repo.add_review(review)
+
+
+def test_populate_loads_numeric_fields(database_repo):
+    movie = database_repo.get_movie(1)
+
+    assert (movie.runtime_minutes, movie.rating, movie.votes, movie.revenue, movie.metascore) == \
+           (121, 8.1, 757074, 333.13, 76)
+
+
+def test_repository_can_filter_movies_by_numeric_fields(database_repo, memory_repo):
+    for movie_filter in [MovieFilter({'rating': (7.5, None), 'runtime': (90, 120)}, sort_by='votes', descending=True),
+                         MovieFilter({'revenue': (None, 1.0)}, sort_by='revenue'),
+                         MovieFilter(sort_by='metascore', descending=True)]:
+        movies, total = database_repo.get_movies_by_filter(movie_filter, 0, 10)
+        expected_movies, expected_total = memory_repo.get_movies_by_filter(movie_filter, 0, 10)
+
+        assert total == expected_total
+        assert [movie.rank for movie in movies] == [movie.rank for movie in expected_movies]
+
+    movies, total = database_repo.get_movies_by_filter(MovieFilter(sort_by='metascore', descending=True), 936)
+    assert len(movies) == 64
+    assert all(movie.metascore is None for movie in movies)
+
+
+def test_repository_searches_names_as_the_memory_repository_does(database_repo, memory_repo):
+    # Exact names, whole words of names, parts of names and misspelt names, as in the memory repository.
+    for search, type_var in [("Chris Pratt", "actor"), ("chris", "actor"), ("pratt", "actor"), ("chirs prat", "actor"),
+                             ("James Gunn", "director"), ("gunn", "director"), ("jmes gun", "director"),
+                             ("guardians", "movie"), ("Gaurdians of the Galaxy", "movie"), ("the", "movie")]:
+        assert [movie.rank for movie in database_repo.get_movie_by_type(search, type_var)] == \
+               [movie.rank for movie in memory_repo.get_movie_by_type(search, type_var)]
+
+
+def test_repository_finds_no_movies_for_unknown_names(database_repo):
+    assert database_repo.get_movie_by_type("zzzzqqqq", "actor") == []
+
+
+def test_repository_finds_movies_of_added_names(database_repo):
+    movie = Movie("Testing", 2020, 1001, "Testing description", "Ron Clements", [Actor("Testing Actor")], [])
+    database_repo.get_movie_by_type("chris", "actor")
+    database_repo.add_movie(movie)
+
+    # The names are read again once movies have been added.
+    assert [movie.rank for movie in database_repo.get_movie_by_type("testing actr", "actor")] == [1001]
+
+
+def test_repository_searches_genres_as_the_memory_repository_does(database_repo, memory_repo):
+    for search in ["Action", "Action, -Comedy", "Comedy|Drama", "Action, Comedy|Drama, -Horror", "sci"]:
+        assert [movie.rank for movie in database_repo.get_movie_by_type(search, "genres")] == \
+               [movie.rank for movie in memory_repo.get_movie_by_type(search, "genres")]
+        assert database_repo.get_number_of_movies_by_genres(search) == \
+               memory_repo.get_number_of_movies_by_genres(search)
+
+
+def test_repository_finds_no_movies_for_an_empty_genre_search(database_repo):
+    assert database_repo.get_movie_by_type(" , |", "genres") == []
+    assert database_repo.get_number_of_movies_by_genres("") == 0
+
+
+def test_repository_searches_descriptions_on_words_and_their_stems(database_repo, memory_repo):
+    movies = database_repo.get_movie_by_type("Intergalactic criminals", "description")
+    ranks = [movie.rank for movie in movies]
+
+    # Movies are listed in title order rather than ranked.
+    assert 1 in ranks
+    assert [movie.title for movie in movies] == sorted(movie.title for movie in movies)
+
+    # Every movie the text index finds is found, whether it matches a word of the search or only its stem.
+    for search in ["Intergalactic criminals", "running", "happy"]:
+        assert set(movie.rank for movie in memory_repo.get_movie_by_type(search, "description")) <= \
+            set(movie.rank for movie in database_repo.get_movie_by_type(search, "description"))
+
+
+def test_repository_limits_description_searches(database_repo):
+    assert len(database_repo.get_movie_by_type("A group of friends", "description")) == TEXT_SEARCH_LIMIT
+
+
+def test_repository_finds_no_movies_for_a_description_search_of_stop_words(database_repo):
+    assert database_repo.get_movie_by_type("the of", "description") == []
+
+
+def test_repository_completes_names_as_the_memory_repository_does(database_repo, memory_repo):
+    for prefix, search_type in [("chris", None), ("gu", None), ("the", "movie"), ("b", None), ("pratt", "actor"),
+                                ("gunn", "director")]:
+        assert database_repo.get_completions(prefix, search_type) == memory_repo.get_completions(prefix, search_type)
+
+
+def test_repository_completes_names_of_added_movies(database_repo):
+    database_repo.get_completions("test")
+    database_repo.add_movie(Movie("Testing", 2020, 1001, "Testing description", "Ron Clements",
+                                  [Actor("Testing Actor")], []))
+
+    assert ("actor", "Testing Actor", 1001) in database_repo.get_completions("test")
@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from cs235flix.domain.model import Movie, User, make_review
+from cs235flix.domain.model import Actor, Director, Genre, Movie, User, WatchList, make_review
 
 import pytest
 
@@ -44,6 +44,13 @@ def test_movie_construction(movie):
     assert movie.genres == "Animation,Adventure,Comedy"
 
 
+def test_movie_construction_with_director_instance():
+    director = Director("Ron Clements")
+    movie = Movie("Moana", 2016, "14", "", director, [], [])
+
+    assert movie.director is director
+
+
 def test_movie_less_than_operator(movie):
     movie_1 = movie
     movie_2 = Movie(
@@ -75,3 +82,46 @@ def test_make_review_establishes_relationships(movie, user):
 
     # Check that the Comment knows about the Article.
     assert review.movie is movie
+
+
+def test_unmapped_model_objects_have_no_instance_dict(movie, user):
+    # User, Review and Movie keep theirs, which SQLAlchemy needs to map them.
+    for model_object in [Actor("Chris Pratt"), Genre("Action"), movie.director, WatchList(user)]:
+        assert not hasattr(model_object, '__dict__')
+
+
+def test_movie_reviews_are_empty_until_a_review_is_made(movie, user):
+    assert list(movie.reviews) == []
+    assert movie.number_of_reviews == 0
+
+    review = make_review("Great movie!", user, movie, 9)
+    assert list(movie.reviews) == [review]
+    assert movie.number_of_reviews == 1
+
+
+def test_movie_numeric_fields(movie):
+    assert (movie.rating, movie.votes, movie.revenue, movie.metascore) == (None, None, None, None)
+
+    movie.rating = 7.6
+    movie.votes = 118151
+    movie.revenue = 248.75
+    movie.metascore = 81
+    assert (movie.rating, movie.votes, movie.revenue, movie.metascore) == (7.6, 118151, 248.75, 81)
+
+    with pytest.raises(ValueError):
+        movie.rating = 11
+    with pytest.raises(ValueError):
+        movie.votes = -1
+    with pytest.raises(ValueError):
+        movie.metascore = 101
+    assert (movie.rating, movie.votes, movie.metascore) == (7.6, 118151, 81)
+
+
+def test_actor_colleagues():
+    actor = Actor("Chris Pratt")
+    colleague = Actor("Zoe Saldana")
+    assert not actor.check_if_this_actor_worked_with(colleague)
+
+    actor.add_actor_colleague(colleague)
+    assert actor.check_if_this_actor_worked_with(colleague)
+    assert not colleague.check_if_this_actor_worked_with(actor)
@@ -0,0 +1,44 @@
+from cs235flix.adapters.genre_index import GenreIndex, parse_genre_query
+
+
+def make_index():
+    index = GenreIndex()
+    index.add('alien', ['Sci-Fi', 'Horror'])
+    index.add('moana', ['Animation', 'Comedy'])
+    index.add('arrival', ['Sci-Fi', 'Drama'])
+    index.add('sing', ['Animation', 'Comedy', 'Family'])
+    return index
+
+
+def test_parse_genre_query():
+    assert parse_genre_query(" Action, Comedy|Drama , -Horror,") == [
+        (False, ['action']), (False, ['comedy', 'drama']), (True, ['horror'])
+    ]
+
+
+def test_genres_are_combined_with_and():
+    index = make_index()
+
+    assert index.movies("Animation, Family") == ['sing']
+    assert index.count("Animation, Family") == 1
+
+
+def test_alternatives_are_combined_with_or():
+    index = make_index()
+
+    assert index.movies("Horror|Drama") == ['alien', 'arrival']
+
+
+def test_negated_genres_are_excluded():
+    index = make_index()
+
+    assert index.movies("Sci-Fi, -Horror") == ['arrival']
+    assert index.movies("-Comedy") == ['alien', 'arrival']
+
+
+def test_partial_genre_names_match():
+    index = make_index()
+
+    assert index.count("sci") == 2
+    assert index.movies("Western") == []
+    assert index.count("") == 0
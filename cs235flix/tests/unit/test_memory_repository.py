@@ -1,9 +1,20 @@
+import os
+import threading
+import time
+
 from datetime import datetime
 from typing import List
 
 import pytest
-from cs235flix.domain.model import Movie, User, Review, make_review
+from werkzeug.security import generate_password_hash
+from cs235flix.domain.model import Actor, Genre, Movie, User, Review, make_review
 from cs235flix.adapters.repository import RepositoryException
+from cs235flix.adapters import catalog_snapshot, columnar_catalog, memory_repository, movie_catalog
+from cs235flix.adapters.bloom_filter import BloomFilter
+from cs235flix.adapters.memory_repository import MemoryRepository, MovieFileCSVReader
+from cs235flix.adapters.movie_filter import MovieFilter
+from cs235flix.adapters.page_query import PageQuery
+from cs235flix.tests.conftest import TEST_DATA_PATH
 
 
 def test_repository_can_add_a_user(in_memory_repo):
@@ -22,7 +33,7 @@ def test_repository_can_retrieve_a_user(in_memory_repo):
 
 
 def test_repository_does_not_retrieve_a_non_existent_user(in_memory_repo):
-    user = in_memory_repo.get_user('Ella')
+    user = in_memory_repo.get_user('Bella')
     assert user is None
 
 
@@ -190,4 +201,402 @@ def test_repository_can_retrieve_reviews(in_memory_repo):
 
     in_memory_repo.add_review(review)
 
-    assert len(in_memory_repo.get_reviews()) == 1
\ No newline at end of file
+    assert len(in_memory_repo.get_reviews()) == 1
+
+
+def test_repository_can_retrieve_years_list(in_memory_repo):
+    years = in_memory_repo.years_list()
+
+    assert years == list(range(2006, 2017))
+
+
+def test_repository_indexes_added_movie_by_date(in_memory_repo):
+    movie = Movie("Testing", 2020, 1001, "Testing description", "Ron Clements", [], [])
+    in_memory_repo.add_movie(movie)
+
+    assert in_memory_repo.get_movies_by_date(2020) == [movie]
+    assert in_memory_repo.years_list()[-1] == 2020
+    assert in_memory_repo.get_last_movie_by_date() is movie
+    assert in_memory_repo.get_date_of_previous_movie(movie) == 2016
+    assert in_memory_repo.get_date_of_next_movie(in_memory_repo.get_movie(97)) == 2020
+
+
+def test_repository_updates_year_navigation_for_added_movie(in_memory_repo):
+    in_memory_repo.add_movie(Movie("Testing", 2020, 1001, "Testing description", "Ron Clements", [], []))
+
+    page = in_memory_repo.get_movie_page(PageQuery.by_year(2020), 0, 5)
+    assert (page.total, page.previous_year, page.next_year) == (1, 2016, None)
+    assert page.year_counts[2020] == 1
+    assert in_memory_repo.get_movie_page(PageQuery.by_year(2016), 0, 5).next_year == 2020
+
+
+def test_repository_can_search_movies_by_actor(in_memory_repo):
+    movies = in_memory_repo.get_movie_by_type("Chris Pratt", "actor")
+    assert [movie.title for movie in movies] == sorted(movie.title for movie in movies)
+    assert 'Guardians of the Galaxy' in [movie.title for movie in movies]
+
+    # A surname on its own and a partial name find the same movies.
+    assert in_memory_repo.get_movie_by_type("pratt", "actor") == movies
+    assert set(movies) <= set(in_memory_repo.get_movie_by_type("prat", "actor"))
+
+
+def test_repository_can_search_movies_by_director(in_memory_repo):
+    movies = in_memory_repo.get_movie_by_type("james gunn", "director")
+
+    assert [movie.rank for movie in movies] == [1, 909, 938]
+
+
+def test_repository_can_search_movies_by_multiple_genres(in_memory_repo):
+    movies = in_memory_repo.get_movie_by_type("Action, Sci-Fi, Adventure", "genres")
+
+    assert len(movies) > 0
+    for movie in movies:
+        genre_names = [genre.genre_name for genre in movie.genres]
+        assert {'Action', 'Sci-Fi', 'Adventure'} <= set(genre_names)
+
+
+def test_repository_can_search_added_movie(in_memory_repo):
+    movie = Movie("Testing", 2020, 1001, "Testing description", "Ron Clements", [Actor("Testing Actor")],
+                  [Genre("Testing")])
+    in_memory_repo.add_movie(movie)
+
+    assert in_memory_repo.get_movie_by_type("testing actor", "actor") == [movie]
+    assert in_memory_repo.get_movie_by_type("testing", "genres") == [movie]
+    assert in_memory_repo.get_movie_by_type("Testing", "movie") == [movie]
+
+
+def test_repository_search_tolerates_typos_in_names(in_memory_repo):
+    movies = in_memory_repo.get_movie_by_type("chirs prat", "actor")
+    assert 'Guardians of the Galaxy' in [movie.title for movie in movies]
+
+    movies = in_memory_repo.get_movie_by_type("jmes gun", "director")
+    assert movies[0].director.director_full_name == "James Gunn"
+
+
+def test_repository_can_search_movies_by_partial_title(in_memory_repo):
+    movies = in_memory_repo.get_movie_by_type("guardians of", "movie")
+    assert [movie.title for movie in movies] == ['Guardians of the Galaxy']
+
+    movies = in_memory_repo.get_movie_by_type("Gaurdians of the Galaxy", "movie")
+    assert movies[0].title == 'Guardians of the Galaxy'
+
+
+def test_repository_can_search_movies_by_description(in_memory_repo):
+    movies = in_memory_repo.get_movie_by_type("intergalactic criminals", "description")
+    assert [movie.rank for movie in movies[:3]] == [1, 373, 288]
+
+    # Words are stemmed, so "zombies" finds movies about a zombie.
+    movies = in_memory_repo.get_movie_by_type("zombies apocalypse", "description")
+    assert movies[0].title == 'Scouts Guide to the Zombie Apocalypse'
+
+    assert in_memory_repo.get_movie_by_type("the of and", "description") == []
+
+    movie = Movie("Testing", 2020, 1001, "A zyzzyva goes to the moon", "Ron Clements", [], [])
+    in_memory_repo.add_movie(movie)
+    assert in_memory_repo.get_movie_by_type("zyzzyva", "description") == [movie]
+
+
+def test_repository_completes_titles_and_names(in_memory_repo):
+    assert in_memory_repo.get_completions("guard", limit=3) == [('movie', 'Guardians of the Galaxy', 1)]
+    assert in_memory_repo.get_completions("chris", "actor", 2) == [('actor', 'Chris Pratt', 1),
+                                                                   ('actor', 'Christopher Mintz-Plasse', 24)]
+    assert in_memory_repo.get_completions("gunn") == [('director', 'James Gunn', 1)]
+    assert in_memory_repo.get_completions("") == []
+
+    in_memory_repo.add_movie(Movie("Guarded", 2020, 1001, "Testing description", "Ron Clements", [], []))
+    assert [name for search_type, name, rank in in_memory_repo.get_completions("guard")] == \
+           ['Guardians of the Galaxy', 'Guarded']
+
+
+def test_populated_repository_completes_without_building_indexes(in_memory_repo, monkeypatch):
+    # populate builds the prefix indexes, so the first keystroke does not have to.
+    def build_completions(*args):
+        raise AssertionError('prefix indexes built on first completion')
+
+    monkeypatch.setattr(movie_catalog, 'Completions', build_completions)
+    monkeypatch.setattr(columnar_catalog, 'Completions', build_completions)
+    assert in_memory_repo.get_completions("guard", limit=3) == [('movie', 'Guardians of the Galaxy', 1)]
+
+
+def test_concurrent_first_completions_build_indexes_once(monkeypatch):
+    repo = MemoryRepository()
+    memory_repository.load_movies(TEST_DATA_PATH, repo)
+    builds = []
+    build_completions = movie_catalog.Completions
+
+    def slow_build_completions(*args):
+        builds.append(threading.current_thread().name)
+        time.sleep(0.05)
+        return build_completions(*args)
+
+    monkeypatch.setattr(movie_catalog, 'Completions', slow_build_completions)
+    threads = [threading.Thread(target=repo.get_completions, args=("guard",)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(builds) == 1
+
+
+def test_repository_search_without_close_matches_is_empty(in_memory_repo):
+    assert in_memory_repo.get_movie_by_type("zzzzqqqq", "actor") == []
+
+
+def test_repository_can_search_movies_by_alternative_and_excluded_genres(in_memory_repo):
+    movies = in_memory_repo.get_movie_by_type("Animation|Family, -Comedy", "genres")
+
+    assert len(movies) > 0
+    assert [movie.title for movie in movies] == sorted(movie.title for movie in movies)
+    for movie in movies:
+        genre_names = set(genre.genre_name for genre in movie.genres)
+        assert genre_names & {'Animation', 'Family'}
+        assert 'Comedy' not in genre_names
+
+
+def test_repository_can_count_movies_by_genres(in_memory_repo):
+    movies = in_memory_repo.get_movie_by_type("Action, Sci-Fi, Adventure", "genres")
+
+    assert in_memory_repo.get_number_of_movies_by_genres("Action, Sci-Fi, Adventure") == len(movies)
+
+
+def test_repository_finds_users_regardless_of_case(in_memory_repo):
+    user = User('Dave', '123456789')
+    in_memory_repo.add_user(user)
+
+    assert in_memory_repo.get_user('DAVE') is user
+    assert in_memory_repo.has_user('dave')
+    assert not in_memory_repo.has_user('bella')
+
+
+def test_repository_with_user_filter_checks_usernames():
+    repo = MemoryRepository(BloomFilter(100))
+    repo.add_user(User('Ella', '123456789'))
+
+    assert repo.has_user('ella')
+    assert not repo.has_user('bella')
+
+
+def test_repository_keeps_a_watchlist_per_user(in_memory_repo):
+    movie = in_memory_repo.get_movie(1)
+    in_memory_repo.add_to_watchlist('ella', movie)
+    in_memory_repo.add_to_watchlist('ella', in_memory_repo.get_movie(7))
+
+    assert in_memory_repo.get_movie_watchlist('ELLA') == [movie, in_memory_repo.get_movie(7)]
+    assert in_memory_repo.get_movie_watchlist('ella', 1, 5) == [in_memory_repo.get_movie(7)]
+    assert in_memory_repo.get_watchlist_size('ella') == 2
+    assert in_memory_repo.check_if_added('ella', 1)
+    assert not in_memory_repo.check_if_added('eggy', 1)
+    assert in_memory_repo.check_if_added_many('ella', [1, 2, 7]) == {1, 7}
+
+    in_memory_repo.remove_from_watchlist('ella', movie)
+    assert not in_memory_repo.check_if_added('ella', 1)
+
+
+def test_repository_can_get_a_page_of_the_movies_of_a_year(in_memory_repo):
+    in_memory_repo.add_to_watchlist('ella', in_memory_repo.get_movies_by_date(2009)[6])
+    page = in_memory_repo.get_movie_page(PageQuery.by_year(2009), 5, 5, 'ella')
+
+    assert page.movies == in_memory_repo.get_movies_by_date(2009)[5:10]
+    assert page.total == 51
+    assert (page.previous_cursor, page.next_cursor, page.last_cursor) == (0, 10, 50)
+    assert page.watchlisted == {page.movies[1].rank}
+    assert (page.previous_year, page.next_year) == (2008, 2010)
+
+    page = in_memory_repo.get_movie_page(PageQuery.by_year(2006), 0, 5)
+    assert page.previous_year is None
+    assert page.previous_cursor is None
+    assert page.watchlisted == set()
+
+    page = in_memory_repo.get_movie_page(PageQuery.by_year(2002), 0, 5)
+    assert (page.movies, page.total, page.previous_year, page.next_year) == ([], 0, None, None)
+    assert page.year == 2002
+    assert list(page.year_counts) == in_memory_repo.years_list()
+    assert page.year_counts[2009] == 51
+
+
+def test_repository_can_get_a_page_of_the_movies_of_the_earliest_year(in_memory_repo):
+    page = in_memory_repo.get_movie_page(PageQuery.earliest_year(), 0, 5)
+
+    assert page.year == 2006
+    assert page.movies == in_memory_repo.get_movies_by_date(2006)[:5]
+    assert list(page.year_counts) == in_memory_repo.years_list()
+    assert page.total == page.year_counts[2006]
+
+
+def test_repository_can_get_a_page_of_the_movies_with_ranks(in_memory_repo):
+    in_memory_repo.add_to_watchlist('ella', in_memory_repo.get_movie(7))
+    page = in_memory_repo.get_movie_page(PageQuery.by_ranks([3, 9, 1, 1001, 7, 2]), 1, 4, 'ELLA')
+
+    # Ranks without a movie are left out of the page, but still counted.
+    assert [movie.rank for movie in page.movies] == [9, 1, 7]
+    assert page.total == 6
+    assert (page.previous_cursor, page.next_cursor, page.last_cursor) == (0, 5, 4)
+    assert page.watchlisted == {7}
+    assert (page.previous_year, page.next_year) == (None, None)
+
+
+def test_csv_reader_shares_one_instance_per_entity():
+    reader = MovieFileCSVReader(os.path.join(TEST_DATA_PATH, 'Data1000Movies.csv'))
+    reader.read_csv_file()
+    movies = reader.dataset_of_movies
+
+    chris_pratt = [actor for movie in movies for actor in movie.actors if actor.actor_full_name == 'Chris Pratt']
+    assert len(chris_pratt) > 1
+    assert all(actor is chris_pratt[0] for actor in chris_pratt)
+
+    gunn_movies = [movie for movie in movies if movie.director.director_full_name == 'James Gunn']
+    assert all(movie.director is gunn_movies[0].director for movie in gunn_movies)
+
+    assert len(reader.dataset_of_genres) == len(set(reader.dataset_of_genres)) == 20
+    assert len(reader.dataset_of_actors) == len(set(reader.dataset_of_actors))
+
+
+def test_bulk_load_matches_adding_movies_one_at_a_time():
+    reader = MovieFileCSVReader(os.path.join(TEST_DATA_PATH, 'Data1000Movies.csv'))
+    reader.read_csv_file()
+    movies = reader.dataset_of_movies
+
+    bulk_repo = MemoryRepository()
+    bulk_repo.add_movies(movies)
+    incremental_repo = MemoryRepository()
+    for movie in movies:
+        incremental_repo.add_movie(movie)
+
+    assert bulk_repo.get_number_of_movies() == incremental_repo.get_number_of_movies() == 1000
+    assert bulk_repo.get_first_movie() is incremental_repo.get_first_movie()
+    assert bulk_repo.get_last_movie() is incremental_repo.get_last_movie()
+    assert bulk_repo.years_list() == incremental_repo.years_list()
+    assert bulk_repo.get_movie_page(PageQuery.by_year(2009), 0, 5).year_counts == \
+        incremental_repo.get_movie_page(PageQuery.by_year(2009), 0, 5).year_counts
+    for year in bulk_repo.years_list():
+        assert bulk_repo.get_movies_by_date(year) == incremental_repo.get_movies_by_date(year)
+    for search, type_var in [("chris", "actor"), ("james gunn", "director"), ("Action, -Comedy", "genres"),
+                             ("the", "movie"), ("chirs prat", "actor")]:
+        assert bulk_repo.get_movie_by_type(search, type_var) == incremental_repo.get_movie_by_type(search, type_var)
+
+
+def test_bulk_load_adds_to_existing_movies(in_memory_repo):
+    movie = Movie("Testing", 2020, 1001, "Testing description", "Ron Clements", [Actor("Testing Actor")],
+                  [Genre("Testing")])
+    in_memory_repo.add_movies([movie])
+
+    assert in_memory_repo.get_number_of_movies() == 1001
+    assert in_memory_repo.get_movie(1001) is movie
+    assert in_memory_repo.get_movie_by_type("testing actor", "actor") == [movie]
+    assert in_memory_repo.get_movie_page(PageQuery.by_year(2020), 0, 5).previous_year == 2016
+
+    # Movies can still be added one at a time after a bulk load.
+    in_memory_repo.add_movie(Movie("Another Test", 2020, 1002, "", "Ron Clements", [], []))
+    assert [movie.rank for movie in in_memory_repo.get_movies_by_date(2020)] == [1002, 1001]
+
+
+def test_repository_starts_from_snapshot_when_data_is_unchanged(tmp_path, monkeypatch):
+    snapshot_path = str(tmp_path / 'movies.snapshot')
+    repo = MemoryRepository()
+    memory_repository.load_movies(TEST_DATA_PATH, repo, snapshot_path)
+    assert os.path.exists(snapshot_path)
+
+    def fail_to_parse(reader):
+        raise AssertionError('CSV file parsed instead of loading the snapshot')
+    monkeypatch.setattr(MovieFileCSVReader, 'read_csv_file', fail_to_parse)
+
+    snapshot_repo = MemoryRepository()
+    memory_repository.load_movies(TEST_DATA_PATH, snapshot_repo, snapshot_path)
+
+    assert snapshot_repo.get_number_of_movies() == 1000
+    assert snapshot_repo.get_movie_page(PageQuery.by_year(2009), 0, 5).year_counts == \
+        repo.get_movie_page(PageQuery.by_year(2009), 0, 5).year_counts
+    for search, type_var in [("chris pratt", "actor"), ("Action, -Comedy", "genres"), ("guardians", "movie")]:
+        assert [movie.rank for movie in snapshot_repo.get_movie_by_type(search, type_var)] == \
+               [movie.rank for movie in repo.get_movie_by_type(search, type_var)]
+
+    # Indexes loaded from a snapshot keep working as movies are added.
+    movie = Movie("Testing", 2020, 1001, "", "Ron Clements", [], [Genre("Action")])
+    snapshot_repo.add_movie(movie)
+    assert movie in snapshot_repo.get_movie_by_type("Action", "genres")
+
+
+def test_repository_ignores_snapshot_of_other_data(tmp_path):
+    snapshot_path = str(tmp_path / 'movies.snapshot')
+    repo = MemoryRepository()
+    memory_repository.load_movies(TEST_DATA_PATH, repo, snapshot_path)
+
+    assert not MemoryRepository().load_snapshot(snapshot_path, 'hash of some other file')
+    assert MemoryRepository().load_snapshot(snapshot_path, catalog_snapshot.file_hash(
+        os.path.join(TEST_DATA_PATH, 'Data1000Movies.csv')))
+
+
+def test_repository_rebuilds_damaged_snapshot(tmp_path):
+    snapshot_path = tmp_path / 'movies.snapshot'
+    snapshot_path.write_bytes(b'not a snapshot')
+
+    repo = MemoryRepository()
+    memory_repository.load_movies(TEST_DATA_PATH, repo, str(snapshot_path))
+
+    assert repo.get_number_of_movies() == 1000
+    assert MemoryRepository().load_snapshot(str(snapshot_path), catalog_snapshot.file_hash(
+        os.path.join(TEST_DATA_PATH, 'Data1000Movies.csv')))
+
+
+def test_repository_loads_seed_users_without_hashing_in_lazy_mode(tmp_path):
+    password_hash = generate_password_hash('mvNNbc1eLA$i')
+    (tmp_path / 'users.csv').write_text('username,password\nella,cLQ^C#oFXloS\neggy,%s\n' % password_hash)
+
+    repo = MemoryRepository()
+    memory_repository.load_users(str(tmp_path), repo, 'lazy')
+
+    assert repo.get_user('ella').password == 'seed$cLQ^C#oFXloS'
+    assert repo.get_user('eggy').password == password_hash
+
+
+def test_populate_reports_load_timings():
+    timings = memory_repository.populate(TEST_DATA_PATH, MemoryRepository())
+
+    assert set(timings) == {'movies', 'completions', 'users'}
+    assert all(seconds >= 0 for seconds in timings.values())
+
+
+def test_repository_can_filter_movies_by_numeric_fields(in_memory_repo):
+    movie_filter = MovieFilter({'rating': (7.5, None), 'runtime': (90, 120)}, sort_by='votes', descending=True)
+
+    movies, total = in_memory_repo.get_movies_by_filter(movie_filter, 0, 3)
+
+    assert total == 108
+    assert [movie.title for movie in movies] == ['WALL·E', 'Up', 'Slumdog Millionaire']
+    assert all(movie.rating >= 7.5 and 90 <= movie.runtime_minutes <= 120 for movie in movies)
+
+
+def test_repository_lists_movies_without_the_sort_field_last(in_memory_repo):
+    movie_filter = MovieFilter(sort_by='metascore', descending=True)
+
+    movies, total = in_memory_repo.get_movies_by_filter(movie_filter, 0, 2)
+    assert total == 1000
+    assert [movie.title for movie in movies] == ['Boyhood', 'Moonlight']
+
+    movies, total = in_memory_repo.get_movies_by_filter(movie_filter, 936)
+    assert len(movies) == 64
+    assert all(movie.metascore is None for movie in movies)
+
+
+def test_repository_filters_movies_added_one_at_a_time(in_memory_repo):
+    movie = Movie('Moana', 2016, 1001, 'Description', 'Director', [], [])
+    movie.rating = 9.9
+    in_memory_repo.add_movie(movie)
+
+    movies, total = in_memory_repo.get_movies_by_filter(MovieFilter({'rating': (9.5, None)}))
+
+    assert total == 1
+    assert movies[0].rank == 1001
+
+
+def test_reader_reads_numeric_columns():
+    reader = MovieFileCSVReader(os.path.join(TEST_DATA_PATH, 'Data1000Movies.csv'))
+    reader.read_csv_file()
+    movie = reader.dataset_of_movies[0]
+
+    assert (movie.runtime_minutes, movie.rating, movie.votes, movie.revenue, movie.metascore) == \
+           (121, 8.1, 757074, 333.13, 76)
+
+    # Values marked N/A in the file are left unset.
+    assert any(movie.metascore is None for movie in reader.dataset_of_movies)
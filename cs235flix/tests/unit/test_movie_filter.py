@@ -0,0 +1,99 @@
+import math
+import random
+from array import array
+
+import pytest
+
+from cs235flix.adapters import movie_filter
+from cs235flix.adapters.movie_filter import MovieFilter, NumericColumns, MISSING
+from cs235flix.domain.model import Movie
+
+
+@pytest.fixture(params=['numpy', 'python'])
+def evaluation(request, monkeypatch):
+    # Filters give the same results whether or not NumPy is available.
+    if request.param == 'python':
+        monkeypatch.setattr(movie_filter, 'numpy', None)
+    elif movie_filter.numpy is None:
+        pytest.skip('NumPy is not installed')
+    return request.param
+
+
+def make_columns(ratings, runtimes, votes):
+    count = len(ratings)
+    return NumericColumns({
+        'rank': array('q', range(1, count + 1)),
+        'year': array('h', [2016] * count),
+        'runtime': array('i', runtimes),
+        'rating': array('d', ratings),
+        'votes': array('q', votes),
+        'revenue': array('d', [math.nan] * count),
+        'metascore': array('h', [MISSING] * count),
+    })
+
+
+def test_filter_rejects_unknown_fields():
+    with pytest.raises(ValueError):
+        MovieFilter({'popularity': (1, None)})
+    with pytest.raises(ValueError):
+        MovieFilter(sort_by='popularity')
+
+
+def test_select_applies_every_range(evaluation):
+    columns = make_columns([7.0, 7.5, 8.0, 9.0, math.nan], [100, 95, 130, 120, 100], [5, 4, 3, 2, 1])
+
+    positions, total = columns.select(MovieFilter({'rating': (7.5, None), 'runtime': (90, 120)}))
+
+    assert positions == [1, 3]
+    assert total == 2
+
+
+def test_select_skips_missing_values(evaluation):
+    columns = make_columns([7.0, math.nan, 8.0], [MISSING, 100, 130], [5, 4, MISSING])
+
+    assert columns.select(MovieFilter({'runtime': (None, 200)}))[0] == [1, 2]
+    assert columns.select(MovieFilter({'rating': (0, 10)}))[0] == [0, 2]
+
+    # Movies without a value for the sort field come last.
+    assert columns.select(MovieFilter(sort_by='votes', descending=True))[0] == [0, 1, 2]
+    assert columns.select(MovieFilter(sort_by='votes'))[0] == [1, 0, 2]
+
+
+def test_select_pages_through_sorted_movies(evaluation):
+    columns = make_columns([8.0, 7.0, 9.0, 7.0, 8.0, 6.0], [100] * 6, [1] * 6)
+    movie_filter = MovieFilter(sort_by='rating', descending=True)
+
+    # Movies with equal ratings stay in name order.
+    assert columns.select(movie_filter, 0, 4) == ([2, 0, 4, 1], 6)
+    assert columns.select(movie_filter, 2, 2) == ([4, 1], 6)
+    assert columns.select(movie_filter, 4, 10) == ([3, 5], 6)
+    assert columns.select(movie_filter, 6, 2) == ([], 6)
+
+
+def test_numpy_and_python_select_the_same_movies(monkeypatch):
+    if movie_filter.numpy is None:
+        pytest.skip('NumPy is not installed')
+
+    rng = random.Random(235)
+    count = 2000
+    columns = make_columns([rng.choice([math.nan, rng.randint(10, 99) / 10]) for i in range(count)],
+                           [rng.choice([MISSING, rng.randint(60, 180)]) for i in range(count)],
+                           [rng.randint(0, 50) for i in range(count)])
+    filters = [(MovieFilter({'rating': (7.5, None), 'runtime': (90, 120)}, 'votes', True), 0, 10),
+               (MovieFilter({'votes': (10, 20)}, 'rating'), 30, 15),
+               (MovieFilter(sort_by='runtime', descending=True), 1990, 20),
+               (MovieFilter({'rating': (None, 5)}), 0, None)]
+
+    with_numpy = [columns.select(*arguments) for arguments in filters]
+    monkeypatch.setattr(movie_filter, 'numpy', None)
+    assert [columns.select(*arguments) for arguments in filters] == with_numpy
+
+
+def test_columns_from_movies_treat_unknown_runtime_as_missing(evaluation):
+    movie = Movie('Moana', 2016, 1, 'Description', 'Director', [], [])
+    movie.rating = 7.7
+
+    columns = NumericColumns.from_movies([movie])
+
+    assert columns.select(MovieFilter({'rating': (7.7, 7.7)})) == ([0], 1)
+    assert columns.select(MovieFilter({'runtime': (None, 200)})) == ([], 0)
@@ -0,0 +1,175 @@
+import threading
+
+import pytest
+
+from cs235flix.adapters import omdb_client
+from cs235flix.adapters.omdb_client import OmdbException
+from cs235flix.adapters.poster_cache import PosterCache
+from cs235flix.adapters.poster_resolver import PosterResolver
+from cs235flix.adapters.resilience import CircuitBreaker, CircuitOpenException, SingleFlight
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def strict_breaker(monkeypatch):
+    breaker = CircuitBreaker(failure_rate=0.5, window=4, minimum_calls=2, reset_timeout=60)
+    monkeypatch.setattr(omdb_client, 'breaker', breaker)
+    return breaker
+
+
+def test_concurrent_lookups_for_the_same_movie_are_coalesced(omdb_stub):
+    omdb_stub.posters = {'Moana': 'http://posters/moana.jpg'}
+    omdb_stub.delay = 0.3
+    results = []
+
+    def lookup():
+        results.append(omdb_client.fetch_poster('Moana', 2016))
+
+    threads = [threading.Thread(target=lookup) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == ['http://posters/moana.jpg'] * 8
+    assert omdb_stub.request_count('Moana') == 1
+    assert omdb_client.single_flight.in_flight() == 0
+
+
+def test_single_flight_shares_errors_with_waiting_callers():
+    joined = threading.Event()
+    single_flight = SingleFlight(on_wait=lambda key: joined.set())
+    started = threading.Event()
+    release = threading.Event()
+    invocations = []
+    errors = []
+
+    def failing():
+        invocations.append(1)
+        started.set()
+        release.wait()
+        raise ValueError('boom')
+
+    def call():
+        try:
+            single_flight.do('key', failing)
+        except ValueError as e:
+            errors.append(e)
+
+    leader = threading.Thread(target=call)
+    leader.start()
+    started.wait()
+    follower = threading.Thread(target=call)
+    follower.start()
+    # Only let the leader fail once the follower is waiting on its call.
+    assert joined.wait(timeout=5)
+    release.set()
+    leader.join()
+    follower.join()
+
+    assert len(invocations) == 1
+    assert len(errors) == 2
+    assert errors[0] is errors[1]
+
+
+def test_breaker_opens_after_failures_and_fails_fast(omdb_stub, strict_breaker):
+    omdb_stub.status = 500
+
+    for title in ['Moana', 'Sing']:
+        with pytest.raises(OmdbException):
+            omdb_client.fetch_poster(title, 2016)
+
+    assert strict_breaker.state == CircuitBreaker.OPEN
+
+    # While the breaker is open, OMDb is not contacted at all.
+    with pytest.raises(OmdbException):
+        omdb_client.fetch_poster('Split', 2016)
+    assert omdb_stub.request_count() == 2
+    assert strict_breaker.stats()['rejected'] == 1
+
+
+def test_timeouts_count_as_failures(omdb_stub, strict_breaker, monkeypatch):
+    omdb_stub.delay = 0.5
+    monkeypatch.setitem(omdb_client.client.default_params, 'timeout', 0.1)
+
+    with pytest.raises(OmdbException):
+        omdb_client.fetch_poster('Moana', 2016)
+
+    assert strict_breaker.stats()['failures'] == 1
+
+
+def test_resolver_degrades_to_placeholder_while_breaker_is_open(omdb_stub, strict_breaker):
+    omdb_stub.posters = {'Moana': 'http://posters/moana.jpg'}
+    for i in range(2):
+        with pytest.raises(ValueError):
+            strict_breaker.call(int, 'not a number')
+
+    resolver = PosterResolver(deadline=5, placeholder='placeholder.svg', cache=PosterCache())
+    movies = resolver.resolve([{'title': 'Moana', 'year': '2016'}])
+
+    assert movies[0]['poster'] == 'placeholder.svg'
+    assert omdb_stub.request_count() == 0
+
+
+def test_breaker_counts_slow_calls_as_failures():
+    clock = FakeClock()
+    breaker = CircuitBreaker(minimum_calls=1, slow_call_timeout=1.0, clock=clock)
+
+    def slow_call():
+        clock.now += 2.0
+        return 'late'
+
+    assert breaker.call(slow_call) == 'late'
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def test_breaker_closes_after_successful_half_open_probe():
+    clock = FakeClock()
+    breaker = CircuitBreaker(minimum_calls=1, reset_timeout=30, clock=clock)
+    with pytest.raises(ValueError):
+        breaker.call(int, 'not a number')
+    assert breaker.state == CircuitBreaker.OPEN
+
+    clock.now += 30
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.call(int, '7') == 7
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_breaker_reopens_after_failed_half_open_probe():
+    clock = FakeClock()
+    breaker = CircuitBreaker(minimum_calls=1, reset_timeout=30, clock=clock)
+    with pytest.raises(ValueError):
+        breaker.call(int, 'not a number')
+
+    clock.now += 30
+    with pytest.raises(ValueError):
+        breaker.call(int, 'still not a number')
+    assert breaker.state == CircuitBreaker.OPEN
+
+    with pytest.raises(CircuitOpenException):
+        breaker.call(int, '7')
+
+
+def test_breaker_allows_one_probe_at_a_time():
+    clock = FakeClock()
+    breaker = CircuitBreaker(minimum_calls=1, reset_timeout=30, clock=clock)
+    with pytest.raises(ValueError):
+        breaker.call(int, 'not a number')
+    clock.now += 30
+
+    def probe():
+        # A second call made while the probe is still running is rejected.
+        with pytest.raises(CircuitOpenException):
+            breaker.call(int, '1')
+        return 'probed'
+
+    assert breaker.call(probe) == 'probed'
+    assert breaker.state == CircuitBreaker.CLOSED
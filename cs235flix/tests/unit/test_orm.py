@@ -0,0 +1,57 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker, clear_mappers
+
+from cs235flix.adapters.orm import metadata, map_model_to_tables
+from cs235flix.domain.model import Actor, Director, Genre, Movie, User, Review, make_review
+
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine('sqlite://')
+    metadata.create_all(engine)
+    map_model_to_tables()
+    yield sessionmaker(bind=engine)
+    clear_mappers()
+
+
+def test_movie_user_and_review_round_trip(session_factory):
+    movie = Movie("Moana", 2016, "14", "In Ancient Polynesia...", "Ron Clements",
+                  [Actor("Auli'i Cravalho"), Actor("Dwayne Johnson")], [Genre("Animation"), Genre("Adventure")])
+    movie.runtime_minutes = 107
+    movie.rating = 7.6
+    user = User("ella", "cLQ^C#oFXloS")
+    make_review("Great movie!", user, movie, 9, datetime.today())
+
+    session = session_factory()
+    session.add_all([user, movie])
+    session.commit()
+    session.close()
+
+    session = session_factory()
+    stored_movie = session.query(Movie).one()
+    assert (stored_movie.title, stored_movie.release_date, stored_movie.rank) == ("Moana", "2016", 14)
+    assert stored_movie.director == Director("Ron Clements")
+    assert stored_movie.actors == [Actor("Auli'i Cravalho"), Actor("Dwayne Johnson")]
+    assert stored_movie.genres == [Genre("Animation"), Genre("Adventure")]
+    assert (stored_movie.runtime_minutes, stored_movie.rating, stored_movie.votes) == (107, 7.6, None)
+
+    stored_user = session.query(User).one()
+    assert (stored_user.username, stored_user.password) == ("ella", "cLQ^C#oFXloS")
+
+    stored_review = session.query(Review).one()
+    assert (stored_review.review_text, stored_review.rating) == ("Great movie!", 9)
+    assert stored_review.user is stored_user
+    assert stored_review.movie is stored_movie
+    assert list(stored_user.reviews) == [stored_review]
+    assert list(stored_movie.reviews) == [stored_review]
+    session.close()
+
+
+def test_model_classes_are_unmapped_again_after_clearing_mappers(session_factory):
+    clear_mappers()
+
+    movie = Movie("Moana", 2016, "14", "In Ancient Polynesia...", "Ron Clements", [], [])
+    assert not hasattr(movie, '_sa_instance_state')
@@ -0,0 +1,116 @@
+import pytest
+
+from cs235flix.adapters.poster_cache import PosterCache, MISSING, normalize_key
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class CountingFetcher:
+    def __init__(self, posters):
+        self.posters = posters
+        self.calls = []
+
+    def __call__(self, title, year):
+        self.calls.append((title, year))
+        return self.posters.get(title)
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def fetcher():
+    return CountingFetcher({'Prometheus': 'http://posters/prometheus.jpg'})
+
+
+def test_normalize_key_ignores_case_and_whitespace():
+    assert normalize_key(' The  Matrix ', 1999) == normalize_key('the matrix', '1999')
+    assert normalize_key('The Matrix', 1999) != normalize_key('The Matrix', 2003)
+
+
+def test_cache_only_fetches_once(fetcher):
+    cache = PosterCache()
+
+    assert cache.get_or_fetch('Prometheus', 2012, fetcher) == 'http://posters/prometheus.jpg'
+    assert cache.get_or_fetch('prometheus', '2012', fetcher) == 'http://posters/prometheus.jpg'
+
+    assert len(fetcher.calls) == 1
+    stats = cache.stats()
+    assert stats['hits'] == 1
+    assert stats['misses'] == 1
+
+
+def test_cache_stores_negative_results(fetcher):
+    cache = PosterCache()
+
+    assert cache.get_or_fetch('Unknown Movie', 2001, fetcher) is None
+    assert cache.get_or_fetch('Unknown Movie', 2001, fetcher) is None
+
+    assert len(fetcher.calls) == 1
+    assert cache.stats()['negative_hits'] == 1
+
+
+def test_cache_expires_entries(clock, fetcher):
+    cache = PosterCache(ttl=100, negative_ttl=10, clock=clock)
+    cache.get_or_fetch('Prometheus', 2012, fetcher)
+    cache.get_or_fetch('Unknown Movie', 2001, fetcher)
+
+    # The negative result expires first.
+    clock.now += 50
+    assert cache.lookup('Unknown Movie', 2001) is MISSING
+    assert cache.lookup('Prometheus', 2012) == 'http://posters/prometheus.jpg'
+
+    clock.now += 100
+    assert cache.lookup('Prometheus', 2012) is MISSING
+    assert cache.stats()['expired'] == 2
+
+
+def test_cache_evicts_least_recently_used_entry():
+    cache = PosterCache(max_entries=2)
+    cache.store('A', 2000, 'a.jpg')
+    cache.store('B', 2000, 'b.jpg')
+
+    # Touch A so that B becomes the least recently used entry.
+    cache.lookup('A', 2000)
+    cache.store('C', 2000, 'c.jpg')
+
+    assert len(cache) == 2
+    assert cache.lookup('B', 2000) is MISSING
+    assert cache.lookup('A', 2000) == 'a.jpg'
+    assert cache.stats()['evictions'] == 1
+
+
+def test_disk_tier_survives_restart(tmp_path, fetcher):
+    path = str(tmp_path / 'posters.db')
+    cache = PosterCache(path)
+    cache.get_or_fetch('Prometheus', 2012, fetcher)
+    cache.close()
+
+    restarted = PosterCache(path)
+    assert restarted.get_or_fetch('Prometheus', 2012, fetcher) == 'http://posters/prometheus.jpg'
+
+    assert len(fetcher.calls) == 1
+    assert restarted.stats()['disk_hits'] == 1
+
+
+def test_repository_resolves_posters_through_cache(in_memory_repo, monkeypatch):
+    import cs235flix.adapters.poster_cache as poster_cache
+
+    fetcher = CountingFetcher({'Prometheus': 'http://posters/prometheus.jpg'})
+    monkeypatch.setattr(poster_cache, 'cache_instance', PosterCache())
+    monkeypatch.setattr(poster_cache.omdb_client, 'fetch_poster', fetcher)
+
+    movies = [{'title': 'Prometheus', 'year': '2012'}]
+    in_memory_repo.get_posters_by_movies(movies)
+    in_memory_repo.get_posters_by_movies(movies)
+
+    assert movies[0]['poster'] == 'http://posters/prometheus.jpg'
+    assert len(fetcher.calls) == 1
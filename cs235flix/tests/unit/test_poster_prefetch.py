@@ -0,0 +1,130 @@
+import json
+import time
+
+import cs235flix.adapters.omdb_client as omdb_client
+from cs235flix.adapters.poster_cache import PosterCache
+from cs235flix.adapters.poster_prefetch import PosterPrefetcher, RateLimiter
+from cs235flix.domain.model import Movie
+
+
+def make_movies(titles):
+    return [Movie(title, 2016, rank, "", "", [], []) for rank, title in enumerate(titles, start=1)]
+
+
+TITLES = ['Moana', 'Sing', 'Split', 'Arrival', 'Passengers', 'Lion']
+
+
+def test_prefetch_fills_cache_for_every_movie(omdb_stub):
+    omdb_stub.posters = {'Moana': 'http://posters/moana.jpg', 'Split': 'http://posters/split.jpg'}
+    cache = PosterCache()
+    prefetcher = PosterPrefetcher(make_movies(TITLES), cache=cache, max_workers=3, rate_limit=None)
+
+    prefetcher.run()
+
+    status = prefetcher.status()
+    assert status['finished'] is True
+    assert status['completed'] == len(TITLES)
+    assert status['fetched'] == len(TITLES)
+
+    # Page views after the warm-up are answered entirely from the cache, including movies without a poster.
+    assert cache.get_or_fetch('Moana', '2016') == 'http://posters/moana.jpg'
+    assert cache.get_or_fetch('Lion', '2016') is None
+    assert omdb_stub.request_count() == len(TITLES)
+
+
+def test_prefetch_skips_movies_already_cached(omdb_stub):
+    cache = PosterCache()
+    cache.store('Moana', '2016', 'http://posters/moana.jpg')
+    prefetcher = PosterPrefetcher(make_movies(TITLES), cache=cache, rate_limit=None)
+
+    prefetcher.run()
+
+    assert prefetcher.status()['cached'] == 1
+    assert omdb_stub.request_count('Moana') == 0
+
+
+def test_prefetch_resumes_from_checkpoint(omdb_stub, tmp_path):
+    checkpoint_path = str(tmp_path / 'prefetch.json')
+    with open(checkpoint_path, 'w') as outfile:
+        json.dump({'version': 1, 'total': len(TITLES), 'next_index': 4}, outfile)
+
+    cache = PosterCache(str(tmp_path / 'posters.db'))
+    prefetcher = PosterPrefetcher(make_movies(TITLES), cache=cache, checkpoint_path=checkpoint_path, rate_limit=None)
+    prefetcher.run()
+
+    # Only the movies after the checkpoint are looked up.
+    assert sorted(omdb_stub.requests) == ['Lion', 'Passengers']
+    assert prefetcher.status()['resumed_from'] == 4
+
+    with open(checkpoint_path) as infile:
+        assert json.load(infile)['next_index'] == len(TITLES)
+
+
+def test_prefetch_ignores_checkpoint_for_memory_only_cache(omdb_stub, tmp_path, caplog):
+    checkpoint_path = str(tmp_path / 'prefetch.json')
+    with open(checkpoint_path, 'w') as outfile:
+        json.dump({'version': 1, 'total': len(TITLES), 'next_index': 4}, outfile)
+
+    prefetcher = PosterPrefetcher(make_movies(TITLES), cache=PosterCache(), checkpoint_path=checkpoint_path,
+                                  rate_limit=None)
+    prefetcher.run()
+
+    # The restarted process has an empty cache, so every movie is looked up again.
+    assert omdb_stub.request_count() == len(TITLES)
+    assert prefetcher.status()['resumed_from'] == 0
+    assert 'only held in memory' in caplog.text
+
+
+def test_prefetch_warns_when_catalog_outgrows_memory_only_cache(omdb_stub, caplog):
+    prefetcher = PosterPrefetcher(make_movies(TITLES), cache=PosterCache(max_entries=4), rate_limit=None)
+    prefetcher.run()
+
+    assert 'fewer than the 6 movies' in caplog.text
+
+
+def test_failed_lookups_hold_back_checkpoint(omdb_stub, tmp_path):
+    checkpoint_path = str(tmp_path / 'prefetch.json')
+    cache = PosterCache(str(tmp_path / 'posters.db'))
+    omdb_stub.status = 500
+    prefetcher = PosterPrefetcher(make_movies(TITLES), cache=cache, checkpoint_path=checkpoint_path, rate_limit=None)
+    prefetcher.run()
+
+    status = prefetcher.status()
+    assert status['failed'] == len(TITLES)
+    assert (status['completed'], status['checkpoint'], status['finished']) == (0, 0, False)
+    with open(checkpoint_path) as infile:
+        assert json.load(infile)['next_index'] == 0
+
+    # Once OMDb recovers, a restarted job retries every failed movie.
+    omdb_stub.status = 200
+    omdb_client.breaker.reset()
+    prefetcher = PosterPrefetcher(make_movies(TITLES), cache=cache, checkpoint_path=checkpoint_path, rate_limit=None)
+    prefetcher.run()
+
+    assert prefetcher.status()['finished'] is True
+    assert prefetcher.status()['fetched'] == len(TITLES)
+
+
+def test_prefetch_respects_rate_limit(omdb_stub):
+    prefetcher = PosterPrefetcher(make_movies(TITLES[:4]), cache=PosterCache(), max_workers=4, rate_limit=20)
+
+    start = time.perf_counter()
+    prefetcher.run()
+
+    # Four requests at 20 per second need at least three 50ms gaps, however many workers there are.
+    assert time.perf_counter() - start >= 0.15
+
+
+def test_rate_limiter_spaces_out_calls():
+    now = [0.0]
+    sleeps = []
+
+    def sleep(seconds):
+        sleeps.append(seconds)
+        now[0] += seconds
+
+    limiter = RateLimiter(4, clock=lambda: now[0], sleep=sleep)
+    for i in range(3):
+        limiter.acquire()
+
+    assert sleeps == [0.25, 0.25]
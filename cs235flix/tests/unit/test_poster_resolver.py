@@ -0,0 +1,76 @@
+import time
+
+from cs235flix.adapters import omdb_client
+from cs235flix.adapters.poster_cache import PosterCache
+from cs235flix.adapters.poster_resolver import PosterResolver
+
+PLACEHOLDER = '/static/images/poster_placeholder.svg'
+
+
+def make_page(titles):
+    return [{'title': title, 'year': '2016', 'poster': None} for title in titles]
+
+
+def test_resolver_looks_up_posters_concurrently(omdb_stub):
+    titles = ['Moana', 'Sing', 'Split', 'Arrival', 'Passengers']
+    omdb_stub.posters = {title: 'http://posters/%s.jpg' % title for title in titles}
+    omdb_stub.delay = 0.3
+    resolver = PosterResolver(max_workers=5, deadline=5, placeholder=PLACEHOLDER, cache=PosterCache())
+
+    start = time.perf_counter()
+    movies = resolver.resolve(make_page(titles))
+    elapsed = time.perf_counter() - start
+
+    # Five sequential lookups would take at least 1.5 seconds.
+    assert elapsed < 1.0
+    assert [movie['poster'] for movie in movies] == ['http://posters/%s.jpg' % title for title in titles]
+
+
+def test_resolver_uses_placeholder_after_deadline(omdb_stub):
+    omdb_stub.posters = {'Moana': 'http://posters/moana.jpg', 'Sing': 'http://posters/sing.jpg'}
+    omdb_stub.delays['Sing'] = 1.0
+    cache = PosterCache()
+    resolver = PosterResolver(max_workers=2, deadline=0.3, placeholder=PLACEHOLDER, cache=cache)
+
+    movies = resolver.resolve(make_page(['Moana', 'Sing']))
+
+    assert movies[0]['poster'] == 'http://posters/moana.jpg'
+    assert movies[1]['poster'] == PLACEHOLDER
+    assert [movie['poster_resolved'] for movie in movies] == [True, False]
+
+    # The slow lookup finishes in the background and is served from the cache next time.
+    resolver.shutdown()
+    assert resolver.resolve(make_page(['Sing']))[0]['poster'] == 'http://posters/sing.jpg'
+    assert omdb_stub.request_count('Sing') == 1
+
+
+def test_resolver_fetches_each_movie_once(omdb_stub):
+    omdb_stub.posters = {'Moana': 'http://posters/moana.jpg'}
+    cache = PosterCache()
+    cache.store('Sing', '2016', 'http://posters/sing.jpg')
+    resolver = PosterResolver(placeholder=PLACEHOLDER, cache=cache)
+
+    movies = resolver.resolve(make_page(['Moana', 'Sing', 'Moana', 'Unknown']))
+
+    assert [movie['poster'] for movie in movies] == [
+        'http://posters/moana.jpg', 'http://posters/sing.jpg', 'http://posters/moana.jpg', PLACEHOLDER]
+    # A movie OMDb has no poster for is resolved; it just has no poster to show.
+    assert all(movie['poster_resolved'] for movie in movies)
+    assert omdb_stub.request_count('Moana') == 1
+    assert omdb_stub.request_count('Sing') == 0
+
+
+def test_resolver_uses_placeholder_when_lookup_fails(monkeypatch):
+    def failing_fetch(title, year):
+        raise ConnectionError('OMDb is unreachable')
+
+    monkeypatch.setattr(omdb_client, 'fetch_poster', failing_fetch)
+    cache = PosterCache()
+    resolver = PosterResolver(placeholder=PLACEHOLDER, cache=cache)
+
+    movies = resolver.resolve(make_page(['Moana']))
+
+    assert movies[0]['poster'] == PLACEHOLDER
+    assert not movies[0]['poster_resolved']
+    # Failures are not cached, so the lookup is retried on the next page view.
+    assert cache.stats()['stores'] == 0
@@ -0,0 +1,62 @@
+import pytest
+
+from cs235flix.adapters import prefix_index
+from cs235flix.adapters.prefix_index import Completions, PrefixIndex
+
+NAMES = [('Chris Pratt', 1), ('Zoe Saldana', 1), ('Chris Pine', 49), ('Christian Bale', 55), ('Bradley Cooper', 1),
+         ('Chris Pratt', 12)]
+
+
+def test_complete_ranks_names_by_their_best_movie():
+    index = PrefixIndex(NAMES)
+
+    assert len(index) == 5
+    assert index.complete('chris') == [('Chris Pratt', 1), ('Chris Pine', 49), ('Christian Bale', 55)]
+    assert index.complete('Chris  P') == [('Chris Pratt', 1), ('Chris Pine', 49)]
+    assert index.complete('chris', limit=1) == [('Chris Pratt', 1)]
+
+
+def test_complete_matches_the_start_of_any_word():
+    index = PrefixIndex(NAMES)
+
+    assert index.complete('sal') == [('Zoe Saldana', 1)]
+    assert index.complete('ale') == []
+
+
+def test_complete_without_a_prefix_is_empty():
+    index = PrefixIndex(NAMES)
+
+    assert index.complete('') == []
+    assert index.complete('   ') == []
+    assert index.complete('zz') == []
+
+
+def test_precomputed_completions_match_ranking_every_name(monkeypatch):
+    # A small range forces most prefixes to be ranked when the index is built.
+    monkeypatch.setattr(prefix_index, '_PRECOMPUTED_RANGE', 2)
+    index = PrefixIndex([('ab', 5), ('abc cab', 2), ('abb', 9), ('ba ab', 4), ('bab', 1), ('cab', 7), ('abc', 3),
+                         ('ab', 8), ('ca b', 6)], limit=3)
+
+    assert len(index._best) > 0
+    assert index.complete('a') == [('abc cab', 2), ('abc', 3), ('ba ab', 4)]
+    assert index.complete('ab') == [('abc cab', 2), ('abc', 3), ('ba ab', 4)]
+    assert index.complete('abc') == [('abc cab', 2), ('abc', 3)]
+    assert index.complete('abb') == [('abb', 9)]
+    assert index.complete('b') == [('bab', 1), ('ba ab', 4), ('ca b', 6)]
+    assert index.complete('ba') == [('bab', 1), ('ba ab', 4)]
+    assert index.complete('c') == [('abc cab', 2), ('ca b', 6), ('cab', 7)]
+    assert index.complete('ca b') == [('ca b', 6)]
+    assert index.complete('d') == []
+
+
+def test_completions_merge_search_types_by_rank():
+    completions = Completions([('Guardians of the Galaxy', 1), ('The Great Wall', 6)], [('James Gunn', 1)],
+                              [('Ryan Gosling', 7)])
+
+    assert completions.complete('g') == [('movie', 'Guardians of the Galaxy', 1), ('director', 'James Gunn', 1),
+                                         ('movie', 'The Great Wall', 6), ('actor', 'Ryan Gosling', 7)]
+    assert completions.complete('g', 'actor') == [('actor', 'Ryan Gosling', 7)]
+    assert completions.complete('g', limit=2) == [('movie', 'Guardians of the Galaxy', 1),
+                                                  ('director', 'James Gunn', 1)]
+    with pytest.raises(ValueError):
+        completions.complete('g', 'genre')
@@ -0,0 +1,103 @@
+import cs235flix.adapters.result_cache as result_cache
+import cs235flix.search.services as search_services
+
+from cs235flix.adapters.result_cache import SearchResultCache
+
+
+class CountingSearch:
+    def __init__(self, repo):
+        self.repo = repo
+        self.calls = []
+
+    def __call__(self, cache, search, search_type):
+        def search_ranks():
+            self.calls.append(search)
+            return self.repo.get_movie_ranks_for_type(self.repo.get_movie_by_type(search, search_type))
+        return cache.ranks(search, search_type, self.repo.get_catalog_version(), search_ranks)
+
+
+def test_results_are_cached_by_normalized_search(in_memory_repo):
+    cache = SearchResultCache()
+    search = CountingSearch(in_memory_repo)
+
+    ranks = search(cache, 'Chris', 'actor')
+    assert list(ranks) == [movie.rank for movie in in_memory_repo.get_movie_by_type('Chris', 'actor')]
+    assert search(cache, '  chris ', 'actor') is ranks
+    assert search(cache, 'chris', 'director') is not ranks
+
+    assert search.calls == ['Chris', 'chris']
+    assert cache.stats() == {'hits': 1, 'misses': 2, 'evictions': 0}
+    assert cache.size == len(ranks) + len(in_memory_repo.get_movie_by_type('chris', 'director'))
+
+
+def test_results_are_dropped_when_the_catalog_changes(in_memory_repo):
+    cache = SearchResultCache()
+    search = CountingSearch(in_memory_repo)
+
+    version = in_memory_repo.get_catalog_version()
+    search(cache, 'chris', 'actor')
+    in_memory_repo.add_movie(in_memory_repo.get_movie(1))
+    assert in_memory_repo.get_catalog_version() != version
+    search(cache, 'chris', 'actor')
+
+    assert search.calls == ['chris', 'chris']
+
+
+def test_least_recently_used_results_are_evicted():
+    cache = SearchResultCache(max_ranks=4)
+    calls = []
+
+    def search(text):
+        return cache.ranks(text, 'actor', 0, lambda: calls.append(text) or [1, 2])
+
+    search('first')
+    search('second')
+    search('first')
+    search('third')
+
+    assert cache.size == 4
+    assert cache.stats()['evictions'] == 1
+    search('first')
+    search('second')
+    assert calls == ['first', 'second', 'third', 'second']
+
+
+def test_results_with_too_many_ranks_are_not_kept(in_memory_repo):
+    cache = SearchResultCache(max_ranks=1)
+    search = CountingSearch(in_memory_repo)
+
+    search(cache, 'chris', 'actor')
+
+    assert len(cache) == 0
+    assert cache.size == 0
+
+
+def test_can_get_search_ranks(in_memory_repo, monkeypatch):
+    monkeypatch.setattr(result_cache, 'cache_instance', SearchResultCache())
+    ranks = search_services.search_ranks('Chris Pratt', 'actor', in_memory_repo)
+
+    assert list(ranks) == [movie.rank for movie in in_memory_repo.get_movie_by_type('Chris Pratt', 'actor')]
+    assert search_services.search_ranks('chris pratt', 'actor', in_memory_repo) is ranks
+
+
+def test_genre_searches_are_cached_by_their_terms(in_memory_repo):
+    cache = SearchResultCache()
+    search = CountingSearch(in_memory_repo)
+
+    ranks = search(cache, 'Action, Comedy|Drama, -Horror', 'genres')
+    assert search(cache, '-horror,drama | comedy,  ACTION', 'genres') is ranks
+    assert search(cache, 'Action, Comedy|Drama, Horror', 'genres') is not ranks
+    assert search(cache, 'Action Comedy', 'genres') is not ranks
+
+    assert search.calls == ['Action, Comedy|Drama, -Horror', 'Action, Comedy|Drama, Horror', 'Action Comedy']
+
+
+def test_description_searches_are_cached_by_their_words(in_memory_repo):
+    cache = SearchResultCache()
+    search = CountingSearch(in_memory_repo)
+
+    ranks = search(cache, 'Intergalactic criminals', 'description')
+    assert search(cache, 'the CRIMINALS of  intergalactic', 'description') is ranks
+    assert search(cache, 'Intergalactic criminal', 'description') is not ranks
+
+    assert search.calls == ['Intergalactic criminals', 'Intergalactic criminal']
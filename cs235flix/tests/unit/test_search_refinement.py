@@ -0,0 +1,100 @@
+import pytest
+
+from cs235flix.adapters.search_refinement import SearchRefinementCache
+
+
+class CountingSearch:
+    def __init__(self, repo):
+        self.repo = repo
+        self.calls = []
+
+    def __call__(self, cache, session_id, search, search_type):
+        def search_catalog():
+            self.calls.append(search)
+            return self.repo.get_movie_by_type(search, search_type)
+        return cache.search(session_id, search, search_type, self.repo.get_catalog_version(), search_catalog)
+
+
+@pytest.mark.parametrize('search_type, searches', [
+    ('actor', ['c', 'ch', 'chr', 'chri', 'chris', 'christ', 'christi', 'christian']),
+    ('actor', ['pr', 'pra', 'prat', 'pratt']),
+    ('director', ['gu', 'gun', 'gunn']),
+    ('movie', ['th', 'the', 'the ', 'the d', 'the da', 'the dark', 'the dark knight']),
+    ('movie', ['gu', 'gua', 'guardians of the galaxy']),
+])
+def test_refined_searches_match_searching_the_catalog(in_memory_repo, search_type, searches):
+    cache = SearchRefinementCache()
+    search = CountingSearch(in_memory_repo)
+
+    for text in searches:
+        movies = search(cache, 'session', text, search_type)
+        assert [movie.rank for movie in movies] == \
+               [movie.rank for movie in in_memory_repo.get_movie_by_type(text, search_type)]
+
+    # Only the first search ran over the whole catalog.
+    assert search.calls == searches[:1]
+    assert cache.stats()['refinements'] == len(searches) - 1
+
+
+def test_searches_are_not_refined_from_exact_or_word_matches(in_memory_repo):
+    cache = SearchRefinementCache()
+    search = CountingSearch(in_memory_repo)
+
+    # "chris pratt" is an exact name and "pratt" a whole word, so neither finds every name containing it.
+    search(cache, 'session', 'Chris Pratt', 'actor')
+    search(cache, 'session', 'pratt', 'actor')
+    search(cache, 'session', 'pratts', 'actor')
+
+    assert search.calls == ['Chris Pratt', 'pratt', 'pratts']
+    assert len(cache) == 0
+
+
+def test_searches_are_refined_per_session_and_search_type(in_memory_repo):
+    cache = SearchRefinementCache()
+    search = CountingSearch(in_memory_repo)
+
+    search(cache, 'first', 'chr', 'actor')
+    search(cache, 'second', 'chri', 'actor')
+    search(cache, 'first', 'chri', 'director')
+    search(cache, 'first', 'ch', 'actor')
+    assert len(search.calls) == 4
+
+    search(cache, 'second', 'chris', 'actor')
+    assert len(search.calls) == 4
+
+
+def test_candidates_are_dropped_when_the_catalog_changes(in_memory_repo):
+    cache = SearchRefinementCache()
+    search = CountingSearch(in_memory_repo)
+
+    search(cache, 'session', 'chr', 'actor')
+    in_memory_repo.add_movie(in_memory_repo.get_movie(1))
+    search(cache, 'session', 'chri', 'actor')
+
+    assert search.calls == ['chr', 'chri']
+
+
+def test_least_recently_used_sessions_are_evicted(in_memory_repo):
+    size = len(in_memory_repo.get_movie_by_type('chr', 'actor'))
+    cache = SearchRefinementCache(max_candidates=2 * size)
+    search = CountingSearch(in_memory_repo)
+
+    search(cache, 'first', 'chr', 'actor')
+    search(cache, 'second', 'chr', 'actor')
+    search(cache, 'first', 'chr', 'actor')
+    search(cache, 'third', 'chr', 'actor')
+
+    assert cache.size <= 2 * size
+    assert cache.stats()['evictions'] == 1
+    search(cache, 'second', 'chri', 'actor')
+    assert search.calls == ['chr', 'chr', 'chr', 'chri']
+
+
+def test_searches_with_too_many_candidates_are_not_kept(in_memory_repo):
+    cache = SearchRefinementCache(max_candidates=1)
+    search = CountingSearch(in_memory_repo)
+
+    search(cache, 'session', 'chr', 'actor')
+
+    assert len(cache) == 0
+    assert cache.size == 0
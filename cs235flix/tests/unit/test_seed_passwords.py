@@ -0,0 +1,37 @@
+import pytest
+
+from werkzeug.security import generate_password_hash
+
+from cs235flix.adapters.seed_passwords import seed_password, check_password, is_password_hash, is_seed_plaintext
+
+
+def test_seed_password_is_hashed_by_default():
+    password = seed_password('cLQ^C#oFXloS')
+
+    assert is_password_hash(password)
+    assert check_password(password, 'cLQ^C#oFXloS')
+    assert not check_password(password, 'wrong')
+
+
+def test_lazy_seed_password_is_kept_until_login():
+    password = seed_password('cLQ^C#oFXloS', 'lazy')
+
+    assert is_seed_plaintext(password)
+    assert not is_password_hash(password)
+    assert check_password(password, 'cLQ^C#oFXloS')
+    assert not check_password(password, 'cLQ^C#oFXlo')
+
+
+def test_hashed_seed_password_is_used_as_it_is():
+    password_hash = generate_password_hash('mvNNbc1eLA$i')
+
+    assert seed_password(password_hash) == password_hash
+    assert seed_password(password_hash, 'lazy') == password_hash
+
+    # A plaintext password that merely contains "$" is not mistaken for a hash.
+    assert not is_password_hash('mvNNbc1eLA$i')
+
+
+def test_seed_password_rejects_unknown_mode():
+    with pytest.raises(ValueError):
+        seed_password('password', 'later')
@@ -1,8 +1,12 @@
 import pytest
 
 from cs235flix.movies import services as movies_services
+from cs235flix.utilities import services as util_services
 from cs235flix.authentication import services as auth_services
 from cs235flix.authentication.services import AuthenticationException
+from cs235flix.adapters.page_query import PageQuery
+from cs235flix.adapters.seed_passwords import seed_password
+from cs235flix.domain.model import User
 
 
 def test_can_add_user(in_memory_repo):
@@ -30,6 +34,13 @@ def test_cannot_add_user_with_existing_name(in_memory_repo):
         auth_services.add_user(username, password, in_memory_repo)
 
 
+def test_cannot_add_user_with_existing_name_in_another_case(in_memory_repo):
+    auth_services.add_user('eb', 'abcd1A23', in_memory_repo)
+
+    with pytest.raises(auth_services.NameNotUniqueException):
+        auth_services.add_user('EB', 'abcd1A23', in_memory_repo)
+
+
 def test_authentication_with_valid_credentials(in_memory_repo):
     new_username = 'pmccartney'
     new_password = 'abcd1A23'
@@ -42,6 +53,20 @@ def test_authentication_with_valid_credentials(in_memory_repo):
         assert False
 
 
+def test_lazy_seed_password_is_hashed_on_first_login(in_memory_repo):
+    in_memory_repo.add_user(User('seeded', seed_password('abcd1A23', 'lazy')))
+
+    with pytest.raises(AuthenticationException):
+        auth_services.authenticate_user('seeded', 'wrong', in_memory_repo)
+    assert in_memory_repo.get_user('seeded').password == 'seed$abcd1A23'
+
+    auth_services.authenticate_user('seeded', 'abcd1A23', in_memory_repo)
+    assert in_memory_repo.get_user('seeded').password.startswith('pbkdf2:sha256:')
+
+    # The user can still log in with the hashed password.
+    auth_services.authenticate_user('seeded', 'abcd1A23', in_memory_repo)
+
+
 def test_can_add_review(in_memory_repo):
     # Add user to repository first.
     new_username = 'eb'
@@ -163,4 +188,21 @@ def test_get_movies_by_rank(in_memory_repo):
 
     # Check that the movie ranks returned were 999 and 1000.
     movie_ranks = [movie['rank'] for movie in movies_as_dict]
-    assert set([999, 1000]).issubset(movie_ranks)
\ No newline at end of file
+    assert set([999, 1000]).issubset(movie_ranks)
+
+
+def test_get_last_cursor():
+    assert movies_services.get_last_cursor(51, 10) == 50
+    assert movies_services.get_last_cursor(50, 10) == 40
+    assert movies_services.get_last_cursor(0, 10) == 0
+
+
+def test_can_get_movie_page(in_memory_repo):
+    in_memory_repo.add_to_watchlist('thorke', in_memory_repo.get_movie(7))
+
+    movies_as_dict, page = util_services.get_movie_page(PageQuery.by_ranks([1, 7, 2]), 0, 2, 'thorke',
+                                                        movies_services.movies_to_dict, in_memory_repo)
+
+    assert [(movie['rank'], movie['watchlist']) for movie in movies_as_dict] == [(1, False), (7, True)]
+    assert page.total == 3
+    assert page.next_cursor == 2
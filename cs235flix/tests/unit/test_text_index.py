@@ -0,0 +1,104 @@
+import random
+
+import pytest
+
+from cs235flix.adapters import text_index
+from cs235flix.adapters.text_index import MovieTextIndex, TextIndex, stem, tokenize
+from cs235flix.domain.model import Movie
+
+
+@pytest.fixture(params=['numpy', 'python'])
+def evaluation(request, monkeypatch):
+    # Searches give the same results whether or not NumPy is available.
+    if request.param == 'python':
+        monkeypatch.setattr(text_index, 'numpy', None)
+    elif text_index.numpy is None:
+        pytest.skip('NumPy is not installed')
+    return request.param
+
+
+@pytest.mark.parametrize('word, expected', [
+    ('hunting', 'hunt'), ('hunted', 'hunt'), ('hunts', 'hunt'), ('ponies', 'poni'), ('caresses', 'caress'),
+    ('hopping', 'hop'), ('hoping', 'hope'), ('agreed', 'agre'), ('happy', 'happi'), ('relational', 'relat'),
+    ('zombies', 'zombi'), ('zombie', 'zombi'), ('the', 'the'), ('2049', '2049'),
+])
+def test_stem_removes_suffixes(word, expected):
+    assert stem(word) == expected
+
+
+def test_tokenize_drops_stop_words_and_punctuation():
+    assert tokenize("The Hunters, and their HUNT!") == ['hunter', 'hunt']
+    assert tokenize("Amélie's café") == ['améli', 's', 'café']
+    assert tokenize("") == []
+
+
+def test_search_ranks_rarer_terms_higher(evaluation):
+    index = TextIndex()
+    index.add_many([
+        ("Space", "A crew travels through space."),
+        ("Robots", "Robots on a space station."),
+        ("Ocean", "A submarine crew dives."),
+    ])
+
+    # Of the two descriptions with "crew", the shorter one ranks higher.
+    results = index.search("robot crew")
+    assert [document for document, score in results] == [1, 2, 0]
+    assert results[0][1] > results[1][1] > 0
+
+
+def test_search_weights_titles_above_descriptions(evaluation):
+    index = TextIndex()
+    index.add_many([("Heist", "Friends plan a bank job."), ("Bank", "Friends plan a heist.")])
+
+    assert [document for document, score in index.search("heist")] == [0, 1]
+
+
+def test_search_without_matching_terms_is_empty(evaluation):
+    index = TextIndex()
+    assert index.search("space") == []
+
+    index.add("Space", "A crew travels through space.")
+    assert index.search("submarine") == []
+    assert index.search("the of and") == []
+
+
+def test_search_keeps_the_best_matches(evaluation):
+    generator = random.Random(7)
+    words = ['alien', 'heist', 'love', 'war', 'robot', 'ocean', 'city', 'ghost']
+    index = TextIndex()
+    for number in range(500):
+        index.add("Movie %d" % number, " ".join(generator.choice(words) for _ in range(generator.randint(3, 30))))
+
+    results = index.search("alien robot", limit=20)
+    everything = index.search("alien robot", limit=len(index))
+    assert len(results) == 20
+    assert results == everything[:20]
+    assert all(first[1] >= second[1] for first, second in zip(everything, everything[1:]))
+
+
+def test_searches_agree_with_and_without_numpy(monkeypatch):
+    if text_index.numpy is None:
+        pytest.skip('NumPy is not installed')
+
+    generator = random.Random(11)
+    words = ['alien', 'heist', 'love', 'war', 'robot', 'ocean', 'city', 'ghost']
+    index = TextIndex()
+    for number in range(300):
+        index.add(generator.choice(words), " ".join(generator.choice(words) for _ in range(generator.randint(1, 20))))
+
+    with_numpy = index.search("ghost city war", limit=50)
+    monkeypatch.setattr(text_index, 'numpy', None)
+    without_numpy = index.search("ghost city war", limit=50)
+
+    assert [document for document, score in with_numpy] == [document for document, score in without_numpy]
+    assert [score for document, score in with_numpy] == pytest.approx([score for document, score in without_numpy])
+
+
+def test_movie_text_index_returns_movies():
+    first = Movie("Alien", 1979, 1, "A crew meets a creature in space.", "Ridley Scott", [], [])
+    second = Movie("Aliens", 1986, 2, "Marines return to the planet.", "James Cameron", [], [])
+    index = MovieTextIndex()
+    index.add_movies([first, second])
+
+    assert [movie.rank for movie in index.movies("marines")] == [2]
+    assert sorted(movie.rank for movie in index.movies("aliens")) == [1, 2]
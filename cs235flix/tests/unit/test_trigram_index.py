@@ -0,0 +1,55 @@
+from cs235flix.adapters.trigram_index import TrigramIndex, normalize_name
+
+
+def make_index(names):
+    index = TrigramIndex()
+    for name in names:
+        index.add(normalize_name(name))
+    return index
+
+
+NAMES = ['Chris Pratt', 'Chris Pine', 'Christian Bale', 'Zoe Saldana', 'Bradley Cooper']
+
+
+def test_substring_finds_names_containing_query():
+    index = make_index(NAMES)
+
+    assert index.substring('chris') == ['chris pratt', 'chris pine', 'christian bale']
+    assert index.substring('ale') == ['christian bale']
+    assert index.substring('pratts') == []
+
+
+def test_substring_handles_short_queries():
+    index = make_index(NAMES)
+
+    assert index.substring('zo') == ['zoe saldana']
+    assert len(index.substring('')) == len(NAMES)
+
+
+def test_substring_confirms_trigram_order():
+    index = make_index(['abcab'])
+
+    # "cabc" shares all its trigrams with "abcab" but is not a substring of it.
+    assert index.substring('cabc') == []
+
+
+def test_fuzzy_ranks_names_by_similarity():
+    index = make_index(NAMES)
+
+    matches = index.fuzzy('chirs prat')
+    assert matches[0][0] == 'chris pratt'
+    assert [similarity for name, similarity in matches] == sorted((s for n, s in matches), reverse=True)
+
+
+def test_fuzzy_drops_names_below_threshold():
+    index = make_index(NAMES)
+
+    assert index.fuzzy('xyz') == []
+    assert len(index.fuzzy('chris', limit=1)) == 1
+
+
+def test_add_ignores_duplicates():
+    index = make_index(NAMES + ['Chris Pratt'])
+
+    assert len(index) == len(NAMES)
+    assert 'chris pratt' in index
@@ -0,0 +1,52 @@
+from cs235flix.adapters.watchlist_store import WatchlistStore
+
+
+def test_watchlists_are_kept_per_user():
+    store = WatchlistStore()
+    store.add('ella', 1)
+    store.add('eggy', 2)
+
+    assert store.contains('ella', 1)
+    assert not store.contains('ella', 2)
+    assert store.ranks('eggy') == [2]
+    assert store.ranks('nobody') == []
+
+
+def test_watchlist_keeps_order_and_ignores_duplicates():
+    store = WatchlistStore()
+    for rank in [5, 3, 5, 9]:
+        store.add('ella', rank)
+
+    assert store.ranks('ella') == [5, 3, 9]
+    assert store.size('ella') == 3
+
+
+def test_can_remove_from_watchlist():
+    store = WatchlistStore()
+    store.add('ella', 5)
+    store.add('ella', 3)
+
+    store.remove('ella', 5)
+    store.remove('ella', 42)
+    store.remove('nobody', 5)
+
+    assert store.ranks('ella') == [3]
+
+
+def test_contains_many_returns_ranks_in_watchlist():
+    store = WatchlistStore()
+    store.add('ella', 5)
+    store.add('ella', 3)
+
+    assert store.contains_many('ella', [1, 3, 5, 7]) == {3, 5}
+    assert store.contains_many('eggy', [1, 3]) == set()
+
+
+def test_watchlist_can_be_paged():
+    store = WatchlistStore()
+    for rank in range(1, 13):
+        store.add('ella', rank)
+
+    assert store.ranks('ella', 0, 5) == [1, 2, 3, 4, 5]
+    assert store.ranks('ella', 10, 5) == [11, 12]
+    assert store.ranks('ella', 5) == list(range(6, 13))
@@ -1,7 +1,7 @@
 from typing import Iterable
 import random
-import omdb
 
+from cs235flix.adapters.page_query import PageQuery
 from cs235flix.adapters.repository import AbstractRepository
 from cs235flix.domain.model import Movie
 
@@ -20,17 +20,15 @@ def get_random_movies(quantity, repo: AbstractRepository):
     return movies_to_dict(movies)
 
 
-def get_poster(movie: str):
-    # Set OMDB API key
-    omdb.set_default("apikey", "1454b6c1")
-    movies_list = omdb.search_movie(movie)
+def get_movie_page(query: PageQuery, cursor: int, count: int, username: str, to_dict, repo: AbstractRepository):
+    # Get a page of the movies listed by query, converted to dicts by to_dict and flagged if in the user's watchlist,
+    # together with the MoviePage they came from, with a single repository call.
+    page = repo.get_movie_page(query, cursor, count, username)
 
-    # Get poster
-    if len(movies_list) != 0:
-        poster = movies_list[0]["poster"]
-        return poster
-    else:
-        return None
+    movies = to_dict(page.movies)
+    for movie in movies:
+        movie['watchlist'] = movie['rank'] in page.watchlisted
+    return movies, page
 
 
 # ============================================
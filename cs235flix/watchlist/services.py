@@ -7,18 +7,18 @@ class NonExistentMovieException(Exception):
     pass
 
 
-def add_to_watchlist(movie_rank: int, repo: AbstractRepository):
+def add_to_watchlist(movie_rank: int, username: str, repo: AbstractRepository):
     # Check that the movie exists
     movie = repo.get_movie(movie_rank)
     if movie is None:
         raise NonExistentMovieException
 
     # Update the repository
-    repo.add_to_watchlist(movie)
+    repo.add_to_watchlist(username, movie)
 
 
-def get_watchlist(repo: AbstractRepository):
-    watchlist = repo.get_movie_watchlist()
+def get_watchlist(username: str, repo: AbstractRepository, cursor: int = 0, count: int = None):
+    watchlist = repo.get_movie_watchlist(username, cursor, count)
 
     return watchlist
 
@@ -17,8 +17,10 @@ watchlist_blueprint = Blueprint(
 @watchlist_blueprint.route('/watchlist', methods=['GET'])
 # @login_required
 def watchlist():
+    # Obtain the username of the currently logged in user.
+    username = session.get('username')
 
-    watch_list = services.get_watchlist(repo.repo_instance)
+    watch_list = services.get_watchlist(username, repo.repo_instance)
 
     return render_template(
         'watchlist/watchlist.html',
@@ -31,7 +33,7 @@ def watchlist():
 # @login_required
 def add_to_watchlist():
     # Obtain the username of the currently logged in user.
-    # username = session['username']
+    username = session.get('username')
 
     movie_rank = request.args.get('movie')
     search_page = request.args.get('search_page')
@@ -40,11 +42,10 @@ def add_to_watchlist():
     name = request.args.get('name')
     movie_plural = request.args.get('movie_plural')
     count = request.args.get('count')
-    search_movie_poster = request.args.get('search_movie_poster')
     search_text = request.args.get('search_text')
     show_reviews_for_movies = request.args.get('show_reviews_for_movies')
 
-    services.add_to_watchlist(int(movie_rank), repo.repo_instance)
+    services.add_to_watchlist(int(movie_rank), username, repo.repo_instance)
 
     movies_list = services.search_for_type(search_text, search_type, repo.repo_instance)
     movie_ranks = services.get_movie_ranks(movies_list, repo.repo_instance)
@@ -63,7 +64,6 @@ def add_to_watchlist():
         movie_plural=movie_plural,
         page="search",
         search_type=search_type,
-        search_movie_poster=search_movie_poster,
         search_text=search_text,
         show_reviews_for_movies=show_reviews_for_movies
     )
\ No newline at end of file